@@ -0,0 +1,211 @@
+#! /usr/bin/env python3
+
+#  A pool of barber processes kept from one run of the multiprocessing barber's shop to the next, cf.
+#  http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  multipleBarbers_multiprocessing.py starts a shop process and a process for every barber for each run and
+#  joins them all at the end of the day, so a short run is mostly spent starting processes and a sweep of
+#  short runs even more so.  A BarberPool starts the processes once, from a forkserver with the simulation
+#  modules preloaded so that no process imports anything itself, and leases them to each run in turn:
+#
+#    startup -- the forkserver is started with preload imported, by default the multiprocessing variant and
+#      the time sources, and forks the shop process and barberCount barber processes, each of which is
+#      given the shop's queue, the results queue, the waiting seats, its own lease queue and the ready
+#      queue.  All of these are made once and inherited, nothing but the lease is sent for a run.
+#    lease -- runSimulation puts a lease on the lease queue of the shop and of each of the first
+#      numberOfBarbers barbers, the log, the number of barbers and seats for the shop and the log and trim
+#      times for a barber, and waits for each to say it is ready.  The trim times of run n are the 'run n'
+#      stream of hairTrimTime, see randomStreams.substream, as a seeded time source pickled afresh for each
+#      run would otherwise give every run the same trims.  The time from the start of the run to every
+#      leased process being ready is the setup time of the run, recorded in the ShopStatistics and in
+#      setupTimes.
+#    run -- the shop runs shopDay and the leased barbers barberDay, see multipleBarbers_multiprocessing.py,
+#      exactly as fresh processes would, with the world in the calling process.
+#    reset -- the end of day protocol of messages.py leaves the seats empty, the seats' semaphore at zero
+#      and every queue drained, so there is nothing to undo.  Each process goes back to waiting on its
+#      lease queue with its per run state, the log buffer and trim times, dropped with the lease.
+#
+#  The waiting seats are SharedMemorySeats, see sharedMemorySeats.py, with maximumSeats seats of which
+#  only the number leased are used, so any number of seats up to maximumSeats can be run without making
+#  new seats.  Since the lease is pickled the time sources must be instances of classes defined at module
+#  level rather than lambdas, as with parameterSweep.py.  A Metrics, see liveMetrics.py, can be given when
+#  the pool is made, its counters being shared by every run.  close, or leaving a with statement, sends
+#  every process home and releases the seats.  Where there is no forkserver, as on Windows, pass another
+#  start method as context, the pool still saving the start up of every run after the first.  Should a
+#  process of the pool die, waiting for it to be ready or for the results raises RuntimeError rather than
+#  waiting for ever, and the pool cannot be used again but for close, which then terminates the rest.
+
+import multiprocessing
+import queue
+import sys
+import time
+
+import eventLog
+import liveMetrics
+import messages
+import multipleBarbers_multiprocessing
+import randomStreams
+from sharedMemorySeats import SharedMemorySeats
+
+_preload = ('multipleBarbers_multiprocessing', 'barberPool', 'randomStreams', 'distributions')
+
+#  How often, in seconds, to check that the processes of the pool are alive whilst waiting for them.
+_pollInterval = 1.0
+
+class _LeasedSeats(SharedMemorySeats):
+    '''Shared memory seats of which only the first limit are used, the limit being set by the shop for each run.'''
+    def __init__(self, capacity, context):
+        super().__init__(capacity, context)
+        self.limit = capacity
+
+    def put_nowait(self, customerId):
+        if self.qsize() >= self.limit:
+            raise queue.Full
+        super().put_nowait(customerId)
+
+class _Shop(object):
+    '''What shopDay and barberDay need of a shop, shared by all the processes of the pool.'''
+    def __init__(self, context, maximumSeats, barberCount, metrics):
+        self.queue = context.Queue()
+        self.results = context.Queue()
+        self.waitingSeats = _LeasedSeats(maximumSeats, context)
+        self.metrics = metrics
+        self.barberCount = barberCount
+        self.log = None
+
+def _shopProcess(shop, leases, ready):
+    ready.put(eventLog.shop)
+    while True:
+        lease = leases.get()
+        if lease is None:
+            shop.waitingSeats.close()
+            return
+        shop.log, shop.barberCount, shop.waitingSeats.limit = lease
+        ready.put(eventLog.shop)
+        multipleBarbers_multiprocessing.shopDay(shop)
+        shop.log = None
+
+def _barberProcess(shop, identity, leases, ready):
+    ready.put(identity)
+    while True:
+        lease = leases.get()
+        if lease is None:
+            shop.waitingSeats.close()
+            return
+        shop.log, hairTrimTime = lease
+        ready.put(identity)
+        multipleBarbers_multiprocessing.barberDay(shop, identity, hairTrimTime)
+        shop.log = None
+
+class BarberPool(object):
+    def __init__(self, barberCount, maximumSeats=64, preload=_preload, metrics=None, context='forkserver'):
+        assert barberCount > 0, 'Must have some barbers'
+        startTime = time.time()
+        self.barberCount = barberCount
+        self.maximumSeats = maximumSeats
+        self.context = multiprocessing.get_context(context)
+        if context == 'forkserver':
+            self.context.set_forkserver_preload(list(preload))
+        self.metrics = metrics
+        self.shop = _Shop(self.context, maximumSeats, barberCount, metrics)
+        if metrics is not None:
+            multipleBarbers_multiprocessing._registerGauges(metrics, self.shop)
+        self._ready = self.context.Queue()
+        self._leases = [self.context.SimpleQueue() for _ in range(barberCount + 1)]
+        self.processes = [self.context.Process(target=_shopProcess, args=(self.shop, self._leases[0], self._ready), daemon=True)]
+        self.processes += [self.context.Process(target=_barberProcess, args=(self.shop, barber, self._leases[barber + 1], self._ready), daemon=True)
+                           for barber in range(barberCount)]
+        for process in self.processes:
+            process.start()
+        for _ in self.processes:
+            self._get(self._ready)
+        self.startupTime = time.time() - startTime
+        self.setupTimes = []
+        self.runs = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *arguments):
+        self.close()
+
+    def _get(self, results):
+        '''The next item from results, raising RuntimeError if a process of the pool has died rather than waiting for ever.'''
+        while True:
+            try:
+                return results.get(timeout=_pollInterval)
+            except queue.Empty:
+                dead = [process.name for process in self.processes if not process.is_alive()]
+                if dead:
+                    raise RuntimeError('Pool processes died: ' + ', '.join(dead))
+
+    def runSimulation(self, numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, log=None):
+        '''Run a day of a shop with the first numberOfBarbers barbers of the pool, returning its ShopStatistics.'''
+        assert 0 < numberOfWaitingSeats <= self.maximumSeats, 'Must have some waiting seats and no more than the pool has'
+        assert 0 < numberOfBarbers <= self.barberCount, 'Must have some barbers and no more than the pool has'
+        startTime = time.time()
+        log = eventLog.TextLog() if log is None else log
+        hairTrimTime = randomStreams.substream(hairTrimTime, 'run ' + str(self.runs))
+        self.runs += 1
+        self._leases[0].put((log, numberOfBarbers, numberOfWaitingSeats))
+        for barber in range(numberOfBarbers):
+            self._leases[barber + 1].put((log, hairTrimTime))
+        for _ in range(numberOfBarbers + 1):
+            self._get(self._ready)
+        setupTime = time.time() - startTime
+        self.setupTimes.append(setupTime)
+        counters = None
+        if self.metrics is not None:
+            counters = self.metrics.counters
+            base = self.metrics.offset('world')
+        shopQueue = self.shop.queue
+        for i in range(numberOfCustomers):
+            time.sleep(nextCustomerWaitTime())
+            log.event(eventLog.world, i, eventLog.enters)
+            shopQueue.put((messages.arrives, i))
+            if counters is not None:
+                counters[base + liveMetrics.eventsOut] += 1
+        shopQueue.put(messages.closingMessage)
+        log.flush()
+        statistics = self._get(self.shop.results)
+        statistics.setupTime = setupTime
+        return statistics
+
+    def close(self):
+        '''Send every process of the pool home and release the seats.'''
+        for leases in self._leases:
+            leases.put(None)
+        if not all(process.is_alive() for process in self.processes):
+            #  The rest of the day will never end for processes left waiting on the one that died.
+            for process in self.processes:
+                process.terminate()
+        for process in self.processes:
+            process.join()
+        self.shop.waitingSeats.unlink()
+
+if __name__ == '__main__':
+    #  Back to back short days, first each with fresh processes forked by multipleBarbers_multiprocessing.py
+    #  and then with the processes of a pool, comparing the time each takes beyond the customers' time.  An
+    #  optional command line argument is the number of days.
+    from randomStreams import SeededUniform
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    numberOfCustomers = 20
+    arrivals = SeededUniform(0.0001, 0.0002, 1, 'arrivals')
+    trims = SeededUniform(0.0001, 0.0004, 1, 'trims')
+    freshTimes = []
+    for day in range(days):
+        startTime = time.time()
+        multipleBarbers_multiprocessing.runSimulation(numberOfCustomers, 8, 4, arrivals.forStream(str(day)), trims.forStream(str(day)),
+                                                      sharedMemorySeats=True, log=eventLog.NullLog())
+        freshTimes.append(time.time() - startTime)
+    pooledTimes = []
+    with BarberPool(4, maximumSeats=8) as pool:
+        for day in range(days):
+            startTime = time.time()
+            pool.runSimulation(numberOfCustomers, 8, 4, arrivals.forStream(str(day)), trims.forStream(str(day)), log=eventLog.NullLog())
+            pooledTimes.append(time.time() - startTime)
+    print('Pool startup: ' + str(pool.startupTime) + 's, setup per run: mean ' + str(sum(pool.setupTimes) / days) + 's, max ' + str(max(pool.setupTimes)) + 's.')
+    print('Fresh processes: mean ' + str(sum(freshTimes) / days) + 's per day of ' + str(numberOfCustomers) + ' customers.')
+    print('Pooled processes: mean ' + str(sum(pooledTimes) / days) + 's per day of ' + str(numberOfCustomers) + ' customers.')
@@ -0,0 +1,95 @@
+#  A queue for use between processes that sends items in batches rather than one at a time.
+#
+#  Copyright © 2026  Russel Winder
+
+#  Every put on a multiprocessing.Queue pickles the item, writes it down a pipe and wakes the queue's feeder
+#  thread.  When events are small and frequent that overhead dominates.  A BatchingQueue collects the items
+#  put into it in a per-process buffer and sends the buffer as a single list when either it holds
+#  maxBatchSize items or the first item in it has been waiting for maxLinger seconds, whichever happens
+#  first.  The receiving end unpacks the lists and hands out the items one at a time, so readers see the
+#  same interface as a multiprocessing.Queue.  The items from any one process arrive in the order they were
+#  put, which is all that multiprocessing.Queue guarantees anyway.
+#
+#  The buffers have to belong to a single process, so all the per-process state is (re)created the first
+#  time the queue is used in a process other than the one that created it, whether that process was forked
+#  or spawned.  A daemon thread in each sending process takes care of the linger time.  Anything still
+#  buffered when a process exits is lost so a process must call flush after sending its last item.
+
+import collections
+import multiprocessing
+import os
+import threading
+import time
+
+class BatchingQueue(object):
+    def __init__(self, maxBatchSize=64, maxLinger=0.001):
+        assert maxBatchSize > 0, 'Batches must be able to hold at least one item.'
+        assert maxLinger >= 0, 'Cannot linger for a negative time.'
+        self.queue = multiprocessing.Queue()
+        self.maxBatchSize = maxBatchSize
+        self.maxLinger = maxLinger
+        self._initialiseProcessState()
+
+    def __getstate__(self):
+        return {'queue': self.queue, 'maxBatchSize': self.maxBatchSize, 'maxLinger': self.maxLinger}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._initialiseProcessState()
+
+    def _initialiseProcessState(self):
+        self._pid = os.getpid()
+        self._condition = threading.Condition()
+        self._outgoing = []
+        self._batchStarted = 0.0
+        self._incoming = collections.deque()
+        self._flusher = None
+
+    def _checkProcess(self):
+        if self._pid != os.getpid():
+            self._initialiseProcessState()
+
+    def _flushLocked(self):
+        if self._outgoing:
+            self.queue.put(self._outgoing)
+            self._outgoing = []
+
+    def _lingerFlush(self):
+        with self._condition:
+            while True:
+                while not self._outgoing:
+                    self._condition.wait()
+                remaining = self._batchStarted + self.maxLinger - time.monotonic()
+                if remaining > 0:
+                    #  The batch may be sent or replaced by a new one whilst waiting, so check again.
+                    self._condition.wait(remaining)
+                else:
+                    self._flushLocked()
+
+    def put(self, item):
+        self._checkProcess()
+        with self._condition:
+            if not self._outgoing:
+                self._batchStarted = time.monotonic()
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._lingerFlush, daemon=True)
+                    self._flusher.start()
+                self._condition.notify()
+            self._outgoing.append(item)
+            if len(self._outgoing) >= self.maxBatchSize:
+                self._flushLocked()
+
+    def flush(self):
+        self._checkProcess()
+        with self._condition:
+            self._flushLocked()
+
+    def get(self):
+        self._checkProcess()
+        if not self._incoming:
+            self._incoming.extend(self.queue.get())
+        return self._incoming.popleft()
+
+    def empty(self):
+        self._checkProcess()
+        return not self._incoming and self.queue.empty()
@@ -0,0 +1,234 @@
+#! /usr/bin/env python3
+
+#  Benchmarking the various Python barber's shop variants against each other, cf.
+#  http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  Each variant is run in a child process of its own so that its start up time and peak memory use can be
+#  measured separately from every other variant, and so that a variant that crashes or blocks, some of the
+#  CSP variants are known to, does not take the whole benchmark with it.  Every variant is given the same
+#  workload: the same number of customers, seats and barbers and the same seeded streams of arrival and
+#  trim times, see randomStreams.py, or the same trace, see traces.py.  The trim time can be set to zero to
+#  measure nothing but the overhead of passing customers around.  Where a variant's runSimulation takes an
+#  event log it is given a SummaryLog so that the benchmark is not just a measure of writing to the
+#  terminal, otherwise its output goes to a temporary file.
+#
+#  For each variant the results are:
+#
+#    startupSeconds -- from starting the child process to having imported the variant, ready to run.
+#    runSeconds -- the time spent in runSimulation.
+#    eventsPerSecond -- arrivals plus trims completed per second of runSeconds.
+#    handOffLatencyP50, handOffLatencyP99 -- quantiles of the time from a customer taking a seat to a
+#      barber starting their trim, only for the variants returning a ShopStatistics, None otherwise.  For
+#      the discrete event simulation these are virtual times so they are not a measure of overhead.
+#    shutdownSeconds -- the time from the last customer leaving to the last barber clocking off, only for
+#      the variants recording it in their ShopStatistics, None otherwise.
+#    peakRSSKiB, childrenPeakRSSKiB -- the peak resident set size of the child process and of the largest
+#      of its own child processes that have finished.
+#
+#  Several barber counts and seating strategies can be given, each variant being run for every combination
+#  so that hand-off latency can be compared against barber count.  The seating strategies are shared, all
+#  the barbers taking customers from one queue, and workStealing, each barber having their own queue and
+#  stealing from the others when it is empty, see workStealingSeats.py.  Only variants whose runSimulation,
+#  or main, takes a workStealing argument are run with workStealing seating, and single barber variants
+#  are only run for the first barber count.
+#
+#  With --metrics the variants whose runSimulation takes a metrics argument are given a Metrics, see
+#  liveMetrics.py, so comparing runs with and without it gives the cost of keeping live metrics.
+#
+#  The results are printed and appended as JSON objects, one per line, to a results file along with the
+#  workload and the git commit of the tree, so that runs of different versions can be compared.
+
+import argparse
+import contextlib
+import datetime
+import importlib
+import inspect
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+def _multiple(backend, numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, **keywords):
+    return backend.runSimulation(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, **keywords)
+
+def _single(backend, numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, **keywords):
+    return backend.runSimulation(numberOfCustomers, numberOfWaitingSeats, nextCustomerWaitTime, hairTrimTime, **keywords)
+
+def _pykkaGevent(backend, numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, **keywords):
+    return backend.runSimulation(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, actorKind='gevent', **keywords)
+
+def _pycspMain(backend, numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, **keywords):
+    return backend.main(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, **keywords)
+
+def _pythonCSPMain(backend, numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, **keywords):
+    return backend.main(numberOfWaitingSeats, numberOfBarbers, numberOfCustomers, nextCustomerWaitTime, hairTrimTime, **keywords)
+
+#  Variant name: (module name, function to call it, whether it has more than one barber).
+backends = {
+    'multiprocessing': ('multipleBarbers_multiprocessing', _multiple, True),
+    'multiprocessing-single': ('singleBarber_multiprocessing', _single, False),
+    'pycsp': ('multipleBarbers_pycsp', _pycspMain, True),
+    'pycsp-single': ('singleBarber_pycsp', _single, False),
+    'python-csp': ('multipleBarbers_python-csp', _pythonCSPMain, True),
+    'python-csp-single': ('singleBarber_python-csp', _single, False),
+    'pykka': ('multipleBarbers_pykka', _multiple, True),
+    'pykka-gevent': ('multipleBarbers_pykka', _pykkaGevent, True),
+    'pykka-single': ('singleBarber_pykka', _single, False),
+    'asyncio': ('multipleBarbers_asyncio', _multiple, True),
+    'threading': ('multipleBarbers_threading', _multiple, True),
+    'threading-single': ('singleBarber_threading', _single, False),
+    'discreteEvent': ('multipleBarbers_discreteEvent', _multiple, True),
+}
+
+_summary = re.compile(r'Trimmed (\d+) and turned ?away (\d+)', re.IGNORECASE)
+
+def _runChild(name, workload, launchTime):
+    '''Run a variant in this process, which is a child of the benchmark, returning its results.'''
+    moduleName, call, isMultiple = backends[name]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    backend = importlib.import_module(moduleName)
+    import eventLog
+    import randomStreams
+    import traces
+    startupSeconds = time.time() - launchTime
+    keywords = {}
+    parameters = inspect.signature(backend.main if call in (_pycspMain, _pythonCSPMain) else backend.runSimulation).parameters
+    if 'log' in parameters:
+        keywords['log'] = eventLog.SummaryLog()
+    if workload['seating'] == 'workStealing':
+        keywords['workStealing'] = True
+    numberOfBarbers = workload['numberOfBarbers'] if isMultiple else 1
+    if workload.get('metrics') and 'metrics' in parameters:
+        import liveMetrics
+        keywords['metrics'] = liveMetrics.Metrics.forShop(numberOfBarbers)
+    if workload['trace'] is not None:
+        trace = traces.Trace(workload['trace'])
+        workload['numberOfCustomers'] = trace.numberOfCustomers
+        nextCustomerWaitTime, hairTrimTime = trace.nextCustomerWaitTime, trace.hairTrimTime
+    else:
+        nextCustomerWaitTime = randomStreams.SeededUniform(workload['arrivalLow'], workload['arrivalHigh'], workload['seed'], 'arrivals')
+        hairTrimTime = randomStreams.SeededUniform(workload['trimLow'], workload['trimHigh'], workload['seed'], 'trims')
+    with tempfile.TemporaryFile() as output:
+        #  Redirect at the file descriptor level so that output from the variant's own child processes is
+        #  captured as well.
+        sys.stdout.flush()
+        savedStdout = os.dup(1)
+        os.dup2(output.fileno(), 1)
+        try:
+            startTime = time.time()
+            statistics = call(backend, workload['numberOfCustomers'], workload['numberOfWaitingSeats'], numberOfBarbers, nextCustomerWaitTime, hairTrimTime, **keywords)
+            runSeconds = time.time() - startTime
+            sys.stdout.flush()
+        finally:
+            os.dup2(savedStdout, 1)
+            os.close(savedStdout)
+        output.seek(0)
+        text = output.read().decode(errors='replace')
+    if hasattr(statistics, 'customersTrimmed'):
+        customersTrimmed, customersTurnedAway = statistics.customersTrimmed, statistics.customersTurnedAway
+    else:
+        counts = _summary.findall(text)
+        customersTrimmed, customersTurnedAway = (int(counts[-1][0]), int(counts[-1][1])) if counts else (None, None)
+    waitingTime = getattr(statistics, 'waitingTime', None)
+    return {
+        'startupSeconds': startupSeconds,
+        'runSeconds': runSeconds,
+        'customersTrimmed': customersTrimmed,
+        'customersTurnedAway': customersTurnedAway,
+        'eventsPerSecond': (workload['numberOfCustomers'] + customersTrimmed) / runSeconds if customersTrimmed is not None else None,
+        'handOffLatencyP50': waitingTime.quantile(0.5) if waitingTime is not None else None,
+        'handOffLatencyP99': waitingTime.quantile(0.99) if waitingTime is not None else None,
+        'shutdownSeconds': getattr(statistics, 'shutdownTime', None),
+        'peakRSSKiB': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'childrenPeakRSSKiB': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+def hasSeating(name, seating):
+    '''Whether the named variant can be run with the seating strategy.'''
+    if seating == 'shared':
+        return True
+    moduleName, call, isMultiple = backends[name]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), moduleName + '.py')
+    with open(path) as source:
+        return re.search(r'def (runSimulation|main)\([^)]*\b' + seating + r'\b', source.read()) is not None
+
+def benchmark(name, workload, timeout=300):
+    '''Run the named variant on the workload in a child process, returning its results.'''
+    launchTime = time.time()
+    command = [sys.executable, os.path.abspath(__file__), '--child', name, '--workload', json.dumps(workload), '--launch-time', repr(launchTime)]
+    try:
+        completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'error': 'Timed out after ' + str(timeout) + 's.'}
+    if completed.returncode != 0:
+        lines = completed.stderr.decode(errors='replace').strip().splitlines()
+        return {'error': lines[-1] if lines else 'Exit code ' + str(completed.returncode)}
+    return json.loads(completed.stdout.decode().strip().splitlines()[-1])
+
+def _gitCommit():
+    with contextlib.suppress(Exception):
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout.decode().strip()
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Python barber\'s shop variants on identical workloads.')
+    parser.add_argument('--backends', nargs='*', default=sorted(backends), choices=sorted(backends))
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--seats', type=int, default=8)
+    parser.add_argument('--barbers', type=int, nargs='+', default=[4], help='run each variant with each of these numbers of barbers')
+    parser.add_argument('--seating', nargs='+', default=['shared'], choices=('shared', 'workStealing'), help='run each variant with each of these seating strategies')
+    parser.add_argument('--arrival', type=float, nargs=2, default=(0.001, 0.003), metavar=('LOW', 'HIGH'))
+    parser.add_argument('--trim', type=float, nargs=2, default=(0.001, 0.009), metavar=('LOW', 'HIGH'), help='use 0 0 to measure just the messaging overhead')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--trace', help='replay this trace file rather than drawing times, overrides --customers, --arrival and --trim')
+    parser.add_argument('--metrics', action='store_true', help='keep live metrics in the variants that support them')
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--results', default='benchmarkResults.jsonl')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--workload', help=argparse.SUPPRESS)
+    parser.add_argument('--launch-time', type=float, help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.child:
+        results = _runChild(arguments.child, json.loads(arguments.workload), arguments.launch_time)
+        print(json.dumps(results))
+        return
+    workload = {
+        'numberOfCustomers': arguments.customers,
+        'numberOfWaitingSeats': arguments.seats,
+        'numberOfBarbers': arguments.barbers[0],
+        'arrivalLow': arguments.arrival[0],
+        'arrivalHigh': arguments.arrival[1],
+        'trimLow': arguments.trim[0],
+        'trimHigh': arguments.trim[1],
+        'seed': arguments.seed,
+        'trace': os.path.abspath(arguments.trace) if arguments.trace else None,
+        'seating': 'shared',
+        'metrics': arguments.metrics,
+    }
+    run = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': _gitCommit(),
+        'python': platform.python_version(),
+    }
+    with open(arguments.results, 'a') as resultsFile:
+        for numberOfBarbers in arguments.barbers:
+            for seating in arguments.seating:
+                for name in arguments.backends:
+                    if not hasSeating(name, seating) or (not backends[name][2] and numberOfBarbers != arguments.barbers[0]):
+                        continue
+                    workload = dict(workload, numberOfBarbers=numberOfBarbers, seating=seating)
+                    results = benchmark(name, workload, arguments.timeout)
+                    print(name + ', ' + str(numberOfBarbers) + ' barbers, ' + seating + ' seating: ' + json.dumps(results))
+                    resultsFile.write(json.dumps(dict(run, workload=workload, backend=name, results=results)) + '\n')
+                    resultsFile.flush()
+
+if __name__ == '__main__':
+    main()
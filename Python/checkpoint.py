@@ -0,0 +1,144 @@
+#  Checkpointing long running simulations so they can be resumed after a crash or pre-emption.
+#
+#  Copyright © 2026  Russel Winder
+
+#  A day of 10^8 customers takes long enough that losing it to a crash or to the machine being taken away
+#  is worth guarding against.  A Checkpointer appends the state of a simulation to a journal file every
+#  interval customers, and load reads back the state of the last checkpoint to resume from, see
+#  multipleBarbers_discreteEvent.py for what the state of a shop is.
+#
+#  The journal is the magic bytes SBCHECK1 followed by records, each a little-endian 64-bit length and then
+#  that many bytes of zlib compressed pickle.  Writing is incremental: a record only holds what a shop has
+#  added since the previous record to what grows through the day, the batch snapshots, as well as all the
+#  rest of the state, which is small however long the day, so each checkpoint costs the same however many
+#  there have been.  load merges the records back together.  Records are only ever appended and each is
+#  flushed to disk before the next, so a crash part way through writing one leaves a torn last record,
+#  which load ignores, and the checkpoint before it intact.  A Checkpointer resuming a journal cuts off a
+#  torn record before appending, so the records of the resumed run can be read back.
+#
+#  Writing is off the hot path: the simulation pickles its state, which is its snapshot of itself and is
+#  quick as the state is small, and hands the bytes to a writer thread that compresses, writes and syncs
+#  them whilst the simulation carries on.  Both zlib and writing release the GIL so the simulation loses
+#  very little time to a checkpoint.
+
+import os
+import pickle
+import queue
+import struct
+import threading
+import zlib
+
+_magic = b'SBCHECK1'
+_length = struct.Struct('<Q')
+
+class Checkpointer(object):
+    def __init__(self, path, interval=1000000, resume=False, compressionLevel=1):
+        '''A journal at path written every interval customers, started afresh unless resuming from it.'''
+        assert interval > 0, 'Must checkpoint every 1 or more customers'
+        self.path = path
+        self.interval = interval
+        self.compressionLevel = compressionLevel
+        self.count = 0
+        if resume:
+            #  Records appended after a torn record could never be read back so the torn record goes.
+            os.truncate(path, _completeLength(path))
+        else:
+            with open(path, 'wb') as f:
+                f.write(_magic)
+        self._records = queue.Queue()
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+
+    def _write(self):
+        descriptor = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        try:
+            while True:
+                data = self._records.get()
+                if data is None:
+                    return
+                data = zlib.compress(data, self.compressionLevel)
+                os.write(descriptor, _length.pack(len(data)) + data)
+                os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def write(self, state):
+        '''Queue a record of state, a dictionary, to be appended to the journal.'''
+        self.count += 1
+        self._records.put(pickle.dumps(state, pickle.HIGHEST_PROTOCOL))
+
+    def close(self):
+        '''Wait for every queued record to be written.'''
+        self._records.put(None)
+        self._writer.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *arguments):
+        self.close()
+
+def _frames(path):
+    '''The pickled data of each complete record of the journal at path and the offset of the end of the record.'''
+    with open(path, 'rb') as f:
+        assert f.read(len(_magic)) == _magic, path + ' is not a checkpoint journal.'
+        while True:
+            header = f.read(_length.size)
+            if len(header) < _length.size:
+                return
+            length = _length.unpack(header)[0]
+            data = f.read(length)
+            if len(data) < length:
+                return  # A torn record written as the process died.
+            try:
+                data = zlib.decompress(data)
+            except zlib.error:
+                return
+            yield data, f.tell()
+
+def _completeLength(path):
+    '''The length of the journal at path up to the end of its last complete record.'''
+    end = len(_magic)
+    for _, end in _frames(path):
+        pass
+    return end
+
+def records(path):
+    '''The complete records of the journal at path, in the order they were written.'''
+    for data, _ in _frames(path):
+        yield pickle.loads(data)
+
+def load(path, incremental=('snapshots',)):
+    '''The state of the last complete checkpoint in the journal at path, the incremental items of every record concatenated.
+
+    Returns None if there is no complete checkpoint.'''
+    state = None
+    for record in records(path):
+        if state is not None:
+            for name in incremental:
+                record[name] = state[name] + record[name]
+        state = record
+    return state
+
+if __name__ == '__main__':
+    #  Check that a run resumed from a journal torn part way through a record, as a crash leaves it, ends
+    #  with the statistics and the last checkpoint of the run that was not interrupted.
+    import tempfile
+    import multipleBarbers_discreteEvent
+    from distributions import Exponential, Lognormal
+
+    def timeSources():
+        return Exponential(0.002, 1, 'arrivals', blockSize=1000), Lognormal(0.007, 0.004, 1, 'trims', blockSize=777)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'shop.journal')
+        statistics = multipleBarbers_discreteEvent.runSimulation(100000, 8, 4, *timeSources(), checkpointPath=path, checkpointInterval=10000)
+        final = load(path)
+        ends = [end for _, end in _frames(path)]
+        with open(path, 'r+b') as f:
+            f.truncate(ends[3] + (ends[4] - ends[3]) // 2)
+        resumed = multipleBarbers_discreteEvent.resumeSimulation(path, *timeSources())
+        assert str(resumed) == str(statistics), 'The resumed run ended differently.'
+        assert len(list(records(path))) == len(ends), 'Records written after the resume cannot be read.'
+        assert pickle.dumps(load(path)) == pickle.dumps(final), 'The last checkpoint is not that of the run that was not interrupted.'
+        print('Resumed after a torn record with the same results and last checkpoint.')
@@ -0,0 +1,249 @@
+#  Distributions of arrival and trim times for the barber's shop simulations, sampled in NumPy blocks.
+#
+#  Copyright © 2026  Russel Winder
+
+#  A time source such as lambda: random.random() * 0.002 + 0.001 costs a Python function call and a call
+#  into the random module for every customer, and exponential or lognormal times cost several times that.
+#  The distributions here draw their times from a numpy.random.Generator a block at a time, each block
+#  being a single vectorized call, and serve them from the block.  Each distribution is still a zero argument
+#  callable so it can be used anywhere a lambda can, but sampler returns a callable with no Python code in
+#  it at all, the next item of an iterator over the blocks, which is what randomStreams.sampler gives the
+#  simulations whose speed depends on it, see multipleBarbers_discreteEvent.py.  sample(count) returns the
+#  next count times as an array, which is what randomStreams.bulk gives singleBarber_numpy.py.
+#
+#  Each distribution is seeded from a seed and a stream name as are the distributions in randomStreams.py,
+#  and has the same forStream and forBarber methods, so every barber and every shop gets an independent
+#  stream and a run is determined by its seed.  Each also has mean and scv, the squared coefficient of
+#  variation, so queueingTheory.py can solve for shops using them.  The distributions are:
+#
+#    Exponential(mean) -- the times between arrivals of a Poisson process.
+#    Uniform(low, high) -- as used by the scripts.
+#    Lognormal(mean, standardDeviation) -- the usual shape of real service times, a long tail of slow trims.
+#    Empirical(times) -- resampling, with replacement, real times, such as trim durations read from a CSV
+#      file using Empirical.fromCSV.
+#    TimeOfDayPoisson(rates, period) -- the times between arrivals of a Poisson process whose rate changes
+#      through the day, rates being the arrival rates of equal slots of each period, e.g. 24 hourly rates
+#      for a period of a day.  The arrival times are found by inverting the cumulative rate, so a whole
+#      block is still a handful of array operations.  Its mean and scv are those of a Poisson process with
+#      the average rate, so queueingTheory.py gives the average day, not the busiest hour.
+#
+#  getState and setState save and restore the position of a stream, the state of the generator before the
+#  block being served was drawn and how many of its times have been used, setState drawing the block again
+#  and skipping those, so a checkpointed simulation carries on with exactly the times it would have had, see
+#  checkpoint.py.
+
+import abc
+import csv
+import functools
+import itertools
+import operator
+
+import numpy
+
+import randomStreams
+
+class Distribution(abc.ABC):
+    '''The base of the distributions, subclasses define _block to return an array of count times.'''
+    def __init__(self, seed=0, streamName='times', blockSize=4096):
+        self.seed = seed
+        self.streamName = streamName
+        self.blockSize = blockSize
+        self.generator = numpy.random.default_rng(randomStreams.streamSeed(seed, streamName))
+        self._next = None
+        self._current = None
+        self._skip = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_next'] = None
+        state['_current'] = None
+        return state
+
+    @abc.abstractmethod
+    def _block(self, count):
+        '''An array of the next count times.'''
+
+    @abc.abstractmethod
+    def _derived(self, streamName):
+        '''A distribution with the same parameters and seed drawing from the named stream.'''
+
+    def forStream(self, streamName):
+        return self._derived(self.streamName + '/' + streamName)
+
+    def forBarber(self, barber):
+        return self.forStream('barber ' + str(barber))
+
+    def _streamState(self):
+        return {'generator': self.generator.bit_generator.state}
+
+    def _setStreamState(self, state):
+        self.generator.bit_generator.state = state['generator']
+
+    def _blocks(self):
+        #  Each block is yielded as an iterator, which chain takes its items from, and kept along with the
+        #  state of the stream before the block was drawn so that getState can see how far through which
+        #  block the stream is.
+        while True:
+            streamState = self._streamState()
+            block = self._block(self.blockSize).tolist()[self._skip:]
+            skipped = self.blockSize - len(block)
+            self._skip = 0
+            items = iter(block)
+            self._current = (streamState, skipped, block, items)
+            yield items
+
+    def getState(self):
+        '''The state of the stream, the state before the current block was drawn and how many of its times have been used.'''
+        if self._current is None:
+            return {'stream': self._streamState(), 'used': self._skip}
+        streamState, skipped, block, items = self._current
+        return {'stream': streamState, 'used': skipped + len(block) - operator.length_hint(items)}
+
+    def setState(self, state):
+        '''Continue the stream from state, samplers got before this do not see the change.'''
+        self._setStreamState(state['stream'])
+        self._skip = state['used']
+        self._current = None
+        self._next = None
+
+    def sampler(self):
+        '''A zero argument callable returning the next time, without any Python code per call.'''
+        if self._next is None:
+            self._next = functools.partial(next, itertools.chain.from_iterable(self._blocks()))
+        return self._next
+
+    def __call__(self):
+        return self.sampler()()
+
+    def sample(self, count):
+        '''The next count times as an array, drawn directly rather than from the blocks sampler serves.'''
+        return self._block(count)
+
+class Exponential(Distribution):
+    def __init__(self, mean, seed=0, streamName='times', blockSize=4096):
+        super().__init__(seed, streamName, blockSize)
+        self.mean = mean
+        self.scv = 1.0
+
+    def _derived(self, streamName):
+        return Exponential(self.mean, self.seed, streamName, self.blockSize)
+
+    def _block(self, count):
+        return self.generator.exponential(self.mean, count)
+
+    def __str__(self):
+        return 'Exponential(' + str(self.mean) + ')'
+
+class Uniform(Distribution):
+    def __init__(self, low, high, seed=0, streamName='times', blockSize=4096):
+        super().__init__(seed, streamName, blockSize)
+        self.low = low
+        self.high = high
+        self.mean = (low + high) / 2
+        self.scv = ((high - low) ** 2 / 12) / self.mean ** 2 if self.mean else 0.0
+
+    def _derived(self, streamName):
+        return Uniform(self.low, self.high, self.seed, streamName, self.blockSize)
+
+    def _block(self, count):
+        return self.generator.uniform(self.low, self.high, count)
+
+    def __str__(self):
+        return 'Uniform(' + str(self.low) + ', ' + str(self.high) + ')'
+
+class Lognormal(Distribution):
+    def __init__(self, mean, standardDeviation, seed=0, streamName='times', blockSize=4096):
+        assert mean > 0, 'A lognormal distribution must have a positive mean.'
+        super().__init__(seed, streamName, blockSize)
+        self.mean = mean
+        self.standardDeviation = standardDeviation
+        self.scv = (standardDeviation / mean) ** 2
+        self._sigma = numpy.sqrt(numpy.log1p(self.scv))
+        self._mu = numpy.log(mean) - self._sigma ** 2 / 2
+
+    def _derived(self, streamName):
+        return Lognormal(self.mean, self.standardDeviation, self.seed, streamName, self.blockSize)
+
+    def _block(self, count):
+        return self.generator.lognormal(self._mu, self._sigma, count)
+
+    def __str__(self):
+        return 'Lognormal(' + str(self.mean) + ', ' + str(self.standardDeviation) + ')'
+
+class Empirical(Distribution):
+    def __init__(self, times, seed=0, streamName='times', blockSize=4096):
+        super().__init__(seed, streamName, blockSize)
+        self.times = numpy.asarray(times, dtype=numpy.float64)
+        assert len(self.times) > 0, 'An empirical distribution needs some times.'
+        self.mean = float(self.times.mean())
+        self.scv = float(self.times.var() / self.mean ** 2) if self.mean else 0.0
+
+    @classmethod
+    def fromCSV(cls, path, column=0, scale=1.0, seed=0, streamName='times', blockSize=4096):
+        '''The times in a column, by index or header name, of a CSV file, multiplied by scale, e.g. 1/60 for minutes to hours.'''
+        with open(path, newline='') as f:
+            rows = list(csv.reader(f))
+        if isinstance(column, str):
+            column = rows.pop(0).index(column)
+        times = []
+        for row in rows:
+            try:
+                times.append(float(row[column]) * scale)
+            except (IndexError, ValueError):
+                pass  # Headers, blank lines and notes are not times.
+        return cls(times, seed, streamName, blockSize)
+
+    def _derived(self, streamName):
+        derived = Empirical.__new__(Empirical)
+        derived.__dict__.update(self.__dict__)
+        Distribution.__init__(derived, self.seed, streamName, self.blockSize)
+        return derived
+
+    def _block(self, count):
+        return self.generator.choice(self.times, count)
+
+    def __str__(self):
+        return 'Empirical(' + str(len(self.times)) + ' times)'
+
+class TimeOfDayPoisson(Distribution):
+    def __init__(self, rates, period=24.0, seed=0, streamName='times', blockSize=4096):
+        super().__init__(seed, streamName, blockSize)
+        self.rates = numpy.asarray(rates, dtype=numpy.float64)
+        assert len(self.rates) > 0 and (self.rates >= 0).all(), 'Rates must be non-negative.'
+        self.period = period
+        self.slotLength = period / len(self.rates)
+        self.cumulativeRate = numpy.concatenate(([0.0], numpy.cumsum(self.rates * self.slotLength)))
+        self.arrivalsPerPeriod = self.cumulativeRate[-1]
+        assert self.arrivalsPerPeriod > 0, 'There must be some arrivals.'
+        self.mean = period / self.arrivalsPerPeriod
+        self.scv = 1.0
+        self.clock = 0.0
+
+    def _derived(self, streamName):
+        return TimeOfDayPoisson(self.rates, self.period, self.seed, streamName, self.blockSize)
+
+    def _streamState(self):
+        state = super()._streamState()
+        state['clock'] = self.clock
+        return state
+
+    def _setStreamState(self, state):
+        super()._setStreamState(state)
+        self.clock = state['clock']
+
+    def _cumulative(self, time):
+        periods, offset = divmod(time, self.period)
+        slot = min(int(offset // self.slotLength), len(self.rates) - 1)
+        return periods * self.arrivalsPerPeriod + self.cumulativeRate[slot] + self.rates[slot] * (offset - slot * self.slotLength)
+
+    def _block(self, count):
+        targets = self._cumulative(self.clock) + numpy.cumsum(self.generator.exponential(1.0, count))
+        periods, remainders = numpy.divmod(targets, self.arrivalsPerPeriod)
+        slots = numpy.clip(numpy.searchsorted(self.cumulativeRate, remainders, 'right') - 1, 0, len(self.rates) - 1)
+        times = periods * self.period + slots * self.slotLength + (remainders - self.cumulativeRate[slots]) / self.rates[slots]
+        waits = numpy.diff(times, prepend=self.clock)
+        self.clock = times[-1]
+        return waits
+
+    def __str__(self):
+        return 'TimeOfDayPoisson(' + str(self.rates.tolist()) + ', ' + str(self.period) + ')'
@@ -0,0 +1,175 @@
+#  Logging the events of a barber's shop simulation.
+#
+#  Copyright © 2026  Russel Winder
+
+#  Originally every event in every variant was a print of a concatenated string, which with several
+#  processes writing to the same terminal means the simulation spends most of its time formatting strings
+#  and contending for stdout.  Instead actors record each event with a log as a (timestamp, actor,
+#  customerId, kind, value) record, where actor is world, shop or the barber number, kind is one of the
+#  event kinds below and value is extra information for the event, the number of seats in use when a
+#  customer takes a seat and the number of customers trimmed when the shop closes.  Records are buffered and
+#  written in bulk when the buffer is full and when flush is called.  The buffer belongs to a process, it is
+#  recreated the first time a log is used in a process other than the one that created it, so a process
+#  must flush its log before it finishes or its last records are lost.  The threads of a process share its
+#  buffer, a lock guarding it, so that a log can be used by the threading variants, even on free-threaded
+#  builds.  The end of day summary lines are not events, they are written by summary.
+#
+#  The logs are:
+#
+#    NullLog -- throws everything away, including the summary, for benchmarking.
+#    SummaryLog -- throws the events away but prints the summary.
+#    TextLog -- the human readable lines printed originally, to stdout or a file.
+#    NDJSONLog -- one JSON object per line per event, to a file.
+#    BinaryLog -- fixed size packed records, to a file, which readBinaryLog reads back.
+#
+#  Several processes may write to the same file, each bulk write is a single write to a file opened for
+#  appending so records from different processes do not get mixed up with each other.
+
+import json
+import os
+import struct
+import sys
+import threading
+import time
+
+#  Actors other than barbers, barbers are identified by their number.
+world = -2
+shop = -1
+
+#  Event kinds.
+enters = 0
+seated = 1
+turnedAway = 2
+refused = 3
+startsTrim = 4
+finishesTrim = 5
+leavesTrimmed = 6
+exitsTurnedAway = 7
+exitsTrimmed = 8
+closes = 9
+
+kindNames = ('enters', 'seated', 'turnedAway', 'refused', 'startsTrim', 'finishesTrim', 'leavesTrimmed', 'exitsTurnedAway', 'exitsTrimmed', 'closes')
+
+def actorName(actor):
+    if actor == world:
+        return 'World'
+    if actor == shop:
+        return 'Shop'
+    return 'Barber ' + str(actor)
+
+_formats = {
+    enters: '{0}: Customer {1} enters the shop.',
+    seated: '{0}: Customer {1} takes a seat. {2} in use.',
+    turnedAway: '{0}: Customer {1} turned away.',
+    refused: '{0}: Sorry we are closed. Customer {1}',
+    startsTrim: '{0}: Starting Customer {1}',
+    finishesTrim: '{0}: Finished Customer {1}',
+    leavesTrimmed: '{0}: Customer {1} leaving trimmed.',
+    exitsTurnedAway: '{0}: Customer {1} exiting the shop, turned away.',
+    exitsTrimmed: '{0}: Customer {1} exiting the shop, trimmed.',
+    closes: '{0}: Closed with {2} customers trimmed.',
+}
+
+def formatEvent(record):
+    '''The human readable line for an event record, as originally printed by the variants.'''
+    timestamp, actor, customerId, kind, value = record
+    return _formats[kind].format(actorName(actor), customerId, value)
+
+class NullLog(object):
+    def event(self, actor, customerId, kind, value=0, timestamp=None):
+        pass
+
+    def summary(self, line):
+        pass
+
+    def flush(self):
+        pass
+
+class SummaryLog(NullLog):
+    def summary(self, line):
+        print(line)
+
+class EventLog(SummaryLog):
+    '''The base of the logs that buffer records, subclasses define _write to write a list of records.'''
+    def __init__(self, bufferSize=4096):
+        self.bufferSize = bufferSize
+        self._initialiseProcessState()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_pid'], state['_buffer'], state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._initialiseProcessState()
+
+    def _initialiseProcessState(self):
+        self._pid = os.getpid()
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def event(self, actor, customerId, kind, value=0, timestamp=None):
+        if self._pid != os.getpid():
+            self._initialiseProcessState()
+        with self._lock:
+            self._buffer.append((time.time() if timestamp is None else timestamp, actor, customerId, kind, value))
+            isFull = len(self._buffer) >= self.bufferSize
+        if isFull:
+            self.flush()
+
+    def summary(self, line):
+        self.flush()
+        super().summary(line)
+        sys.stdout.flush()
+
+    def flush(self):
+        if self._pid != os.getpid():
+            self._initialiseProcessState()
+        with self._lock:
+            records = self._buffer
+            self._buffer = []
+        if records:
+            self._write(records)
+
+class _FileLog(EventLog):
+    def __init__(self, path, bufferSize=4096):
+        super().__init__(bufferSize)
+        self.path = path
+        if path is not None:
+            open(path, 'wb').close()
+
+    def _append(self, data):
+        if self.path is None:
+            sys.stdout.write(data.decode())
+            sys.stdout.flush()
+        else:
+            descriptor = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+            try:
+                os.write(descriptor, data)
+            finally:
+                os.close(descriptor)
+
+class TextLog(_FileLog):
+    def __init__(self, path=None, bufferSize=4096):
+        super().__init__(path, bufferSize)
+
+    def _write(self, records):
+        self._append(''.join(formatEvent(record) + '\n' for record in records).encode())
+
+class NDJSONLog(_FileLog):
+    def _write(self, records):
+        self._append(''.join(json.dumps({'timestamp': timestamp, 'actor': actor, 'customer': customerId, 'kind': kindNames[kind], 'value': value}) + '\n'
+                             for timestamp, actor, customerId, kind, value in records).encode())
+
+_binaryRecord = struct.Struct('<diqBi')
+
+class BinaryLog(_FileLog):
+    def _write(self, records):
+        self._append(b''.join(_binaryRecord.pack(*record) for record in records))
+
+def readBinaryLog(path):
+    '''Iterate over the (timestamp, actor, customerId, kind, value) records in a file written by a BinaryLog.'''
+    with open(path, 'rb') as f:
+        data = f.read()
+    return _binaryRecord.iter_unpack(data)
@@ -0,0 +1,163 @@
+#  Live metrics of a running barber's shop, readable from outside whilst the shop is open.
+#
+#  Copyright © 2026  Russel Winder
+
+#  The only sign of life from a running simulation is its event log, and qsize is only ever looked at when
+#  a customer is seated.  A Metrics holds a block of counters for each actor, the world, the shop and each
+#  barber, in a multiprocessing.RawArray of doubles, so the counters are shared by all the processes of a
+#  simulation without being sent anywhere:
+#
+#    eventsIn, eventsOut -- messages taken and sent, the hand-offs of customers between actors.
+#    busySeconds, idleSeconds -- time spent trimming and time spent waiting for a customer.
+#    customersTrimmed, customersTurnedAway -- kept by the shop.
+#
+#  There are no locks so each counter must have exactly one writer, its own actor: counters[i] += x is a
+#  read, an add and a write, and two writers of one counter would lose updates.  A counter that more than
+#  one actor has to add to needs a multiprocessing.Value with its lock instead.  Readers do not write, so
+#  with one writer a reader just sees a value a moment out of date.  Gauges, such as the depth of the shop's
+#  queue and the number of seats occupied, are functions registered with gauge and only called when the
+#  metrics are read, so they cost the actors nothing at all.  Gauges stay in the process that registered
+#  them, the one reading the metrics, and are not pickled with the counters.
+#
+#  The metrics are read with snapshot, as text in the Prometheus exposition format with render, over HTTP
+#  from the local endpoint started by serve, e.g. curl http://127.0.0.1:port/metrics, or written every so
+#  often, with the rate of each counter since the last time, by report.  Variants that support metrics take
+#  a Metrics as the metrics argument of runSimulation, see multipleBarbers_multiprocessing.py and
+#  multipleBarbers_threading.py, and create it with forShop.
+
+import http.server
+import multiprocessing
+import threading
+import time
+
+eventsIn = 0
+eventsOut = 1
+busySeconds = 2
+idleSeconds = 3
+customersTrimmed = 4
+customersTurnedAway = 5
+fieldCount = 6
+
+_counters = (
+    (eventsIn, 'barbershop_events_in_total', 'Messages taken by the actor.'),
+    (eventsOut, 'barbershop_events_out_total', 'Messages sent by the actor.'),
+    (busySeconds, 'barbershop_busy_seconds_total', 'Time spent trimming.'),
+    (idleSeconds, 'barbershop_idle_seconds_total', 'Time spent waiting for a customer.'),
+    (customersTrimmed, 'barbershop_customers_trimmed_total', 'Customers leaving trimmed.'),
+    (customersTurnedAway, 'barbershop_customers_turned_away_total', 'Customers turned away.'),
+)
+
+class Metrics(object):
+    def __init__(self, actors):
+        self.actors = list(actors)
+        self.counters = multiprocessing.RawArray('d', len(self.actors) * fieldCount)
+        self.gauges = []
+        self._stop = threading.Event()
+
+    @classmethod
+    def forShop(cls, barberCount):
+        return cls(['world', 'shop'] + ['barber ' + str(barber) for barber in range(barberCount)])
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['gauges'] = []
+        del state['_stop']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stop = threading.Event()
+
+    def offset(self, actor):
+        '''The index of the first counter of the named actor, the counters being counters[offset + field].
+
+        Only the named actor may write them.'''
+        return self.actors.index(actor) * fieldCount
+
+    def gauge(self, name, help, actor, function):
+        '''Register a gauge, function being called to get its value whenever the metrics are read.'''
+        self.gauges.append((name, help, actor, function))
+
+    def snapshot(self):
+        '''The current value of every metric as a dictionary from (metric name, actor) to value.'''
+        values = {}
+        counters = self.counters[:]
+        for index, actor in enumerate(self.actors):
+            for field, name, _ in _counters:
+                values[(name, actor)] = counters[index * fieldCount + field]
+        for name, _, actor, function in self.gauges:
+            try:
+                values[(name, actor)] = function()
+            except (NotImplementedError, OSError, ValueError):
+                pass  # qsize is not implemented everywhere and a closed queue has no size.
+        return values
+
+    def render(self):
+        '''The metrics in the Prometheus text exposition format.'''
+        values = self.snapshot()
+        lines = []
+        described = set()
+        metrics = [(name, help, 'counter') for _, name, help in _counters] + [(name, help, 'gauge') for name, help, _, _ in self.gauges]
+        for name, help, kind in metrics:
+            if name in described:
+                continue
+            described.add(name)
+            lines.append('# HELP ' + name + ' ' + help)
+            lines.append('# TYPE ' + name + ' ' + kind)
+            for (valueName, actor), value in values.items():
+                if valueName == name:
+                    lines.append(name + '{actor="' + actor + '"} ' + repr(float(value)))
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=0, host='127.0.0.1'):
+        '''Serve the metrics at http://host:port/metrics from a daemon thread, returning the server.
+
+        With port 0 a free port is chosen, server.server_address says which.'''
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def describe(self, values, previous=None, interval=None):
+        '''A one line summary of the non-zero values of a snapshot, with the rates of the counters since a previous one.'''
+        parts = []
+        for (name, actor), value in values.items():
+            if not value and not (previous or {}).get((name, actor)):
+                continue
+            part = actor + ' ' + name.replace('barbershop_', '') + ' ' + str(value)
+            if previous is not None and interval and name.endswith('_total'):
+                part += ' (' + str((value - previous.get((name, actor), 0.0)) / interval) + '/s)'
+            parts.append(part)
+        return 'Metrics: ' + ', '.join(parts)
+
+    def report(self, interval=1.0, write=print):
+        '''Write a summary of the metrics every interval seconds from a daemon thread until stop is called.'''
+        def reporter():
+            previous = self.snapshot()
+            lastTime = time.time()
+            while not self._stop.wait(interval):
+                values = self.snapshot()
+                now = time.time()
+                write(self.describe(values, previous, now - lastTime))
+                previous = values
+                lastTime = now
+        threading.Thread(target=reporter, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
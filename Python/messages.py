@@ -0,0 +1,42 @@
+#  The messages passed between the processes of the barber's shop variants.
+#
+#  Copyright © 2026  Russel Winder
+
+#  Every message crossing a process boundary is pickled, and a Customer or SuccessfulCustomer case class
+#  instance pickles as its class name, its module name and its attribute dictionary, well over a hundred
+#  bytes for a SuccessfulCustomer carrying a Customer.  The receiver then dispatches on isinstance and on
+#  string comparisons against sentinels.  Instead messages are tuples whose first item is a small integer
+#  tag saying what the message is, followed by the customer id and any other data:
+#
+#    (arrives, customerId) -- a customer arriving at the shop, or seated waiting for a barber.
+#    (trimmed, customerId) or (trimmed, customerId, barber, startTime, finishTime) -- a trimmed customer.
+#    (turnedAway, customerId) -- a customer turned away by the shop.
+#    (ready,) -- a barber with nothing to do, for shops that hand customers to barbers only when asked.
+#    (closing,), (clockedOff,), (closed,) -- the end of day sequence.
+#
+#  A tuple of small ints pickles to around twenty bytes and the receiver switches on message[0] with integer
+#  comparisons.  Where a channel or queue only ever carries customers, as with the shared memory seats and
+#  the channels of the PyCSP variants, the customer id alone is sent.
+#
+#  The end of the day is the same for every variant.  Once the shop is closed to new customers it carries on
+#  until every seated customer has been trimmed and only then sends each barber home, one goHome per barber,
+#  put where the barber gets customers from so it can only be taken by an idle barber.  A barber clocks off
+#  on getting it, telling the shop, and the day is over when all the barbers have clocked off.  No process is
+#  terminated and no-one polls with a timeout, so no customer is lost and the time taken to send everyone
+#  home is the time for each barber to take one message, however many seats there are.  goHome is a
+#  customer id, rather than a tag, so that it can be put in seats that only hold customer ids.
+
+arrives = 0
+trimmed = 1
+turnedAway = 2
+closing = 3
+clockedOff = 4
+closed = 5
+ready = 6
+
+goHome = -1
+
+closingMessage = (closing,)
+clockedOffMessage = (clockedOff,)
+closedMessage = (closed,)
+readyMessage = (ready,)
@@ -0,0 +1,154 @@
+#! /usr/bin/env python3
+
+#  This is a model of the "The Sleeping Barber" problem using Python (http://www.python.org) and the
+#  asyncio package, cf. http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  This is the same architecture as the multiprocessing variant but with everything in a single process.
+#  The barber's shop is a coroutine with a queue, it receives events from the outside world (new customers
+#  arriving) and from the barbers (customers with fully trimmed barnets).  The waiting chairs are modelled
+#  as a bounded queue to which all the barbers have shared access: put_nowait raising QueueFull is the
+#  shop being full and a customer being turned away.  Barbers are coroutines getting clients from the queue
+#  – awaiting on an empty queue models being asleep in the cutting chair.  As all the coroutines share one
+#  thread and one event loop nothing gets pickled or sent down a pipe, and a barber costs a task not a
+#  process, so thousands of barbers are not a problem.  Events are recorded with an event log, see
+#  eventLog.py, by default a TextLog writing the lines the other variants print.  runSimulation returns the
+#  waiting, service and sojourn times and barber utilisation as a ShopStatistics, see shopStatistics.py.
+#  Each barber gets their trim times using randomStreams.trimTimes, see randomStreams.py.  The day ends with
+#  the protocol in messages.py: once closed and with every seated customer trimmed the shop puts a
+#  messages.goHome in the waiting seats for each barber and waits for the barber tasks to finish, rather than
+#  cancelling them, reporting the time this takes as the shutdown time.
+#
+#  asyncio.sleep on Linux waits in epoll_wait, whose timeout is a whole number of milliseconds rounded up,
+#  so every sleep overruns by about half a millisecond.  With waits and trims of a few milliseconds,
+#  sleeping for each of them slowed the arrivals and lengthened the trims by a quarter and a tenth, and the
+#  shop trimmed many more customers than the other variants given the same seeded times.  So the world
+#  sleeps until each customer's arrival time, the sum of the waits so far, and a barber's trim starts when
+#  they finished their last trim or when the customer arrived, whichever is later, and finishes the trim
+#  time after that.  The overruns then delay events a little but do not accumulate, and a seeded day
+#  matches that of multipleBarbers_discreteEvent.py.
+
+#  This is Python 3 only, asyncio does not exist in Python 2.
+
+import asyncio
+import random
+import time
+
+import eventLog
+import messages
+import randomStreams
+from shopStatistics import ShopStatistics
+
+class Customer(object):
+    __slots__ = ('id',)
+
+    def __init__(self, id):
+        self.id = id
+
+class SuccessfulCustomer(object):
+    __slots__ = ('customer', 'barber', 'startTime', 'finishTime')
+
+    def __init__(self, customer, barber, startTime, finishTime):
+        self.customer = customer
+        self.barber = barber
+        self.startTime = startTime
+        self.finishTime = finishTime
+
+class Barber(object):
+    def __init__(self, shop, identity, hairTrimTime):
+        self.shop = shop
+        self.identity = identity
+        self.hairTrimTime = hairTrimTime
+
+    async def run(self):
+        log = self.shop.log
+        trimTime = randomStreams.trimTimes(self.hairTrimTime, self.identity)
+        finishTime = time.time()
+        while True:
+            customer = await self.shop.waitingSeats.get()
+            if customer == messages.goHome:
+                return
+            assert isinstance(customer, Customer)
+            startTime = max(finishTime, self.shop.arrivalTimes[customer.id])
+            log.event(self.identity, customer.id, eventLog.startsTrim, timestamp=startTime)
+            finishTime = startTime + trimTime(customer.id)
+            await asyncio.sleep(finishTime - time.time())
+            log.event(self.identity, customer.id, eventLog.finishesTrim, timestamp=finishTime)
+            self.shop.queue.put_nowait(SuccessfulCustomer(customer, self.identity, startTime, finishTime))
+
+class BarbersShop(object):
+    def __init__(self, waitingSeatCount, barberCount, hairTrimTime, log):
+        assert waitingSeatCount > 0, 'Cannot have 0 or less waiting seats'
+        assert barberCount > 0, 'Must have some barbers'
+        self.queue = asyncio.Queue()
+        self.waitingSeats = asyncio.Queue(waitingSeatCount)
+        self.log = log
+        self.customersArrived = 0
+        self.customersTrimmed = 0
+        self.customersTurnedAway = 0
+        self.isOpen = True
+        self.arrivalTimes = {}
+        self.statistics = ShopStatistics(barberCount, time.time())
+        self.barbers = [asyncio.ensure_future(Barber(self, i, hairTrimTime).run()) for i in range(barberCount)]
+
+    async def run(self):
+        log = self.log
+        while True:
+            event = await self.queue.get()
+            if isinstance(event, Customer):
+                if not self.isOpen:
+                    log.event(eventLog.shop, event.id, eventLog.refused)
+                else:
+                    self.customersArrived += 1
+                    arrivalTime = time.time()
+                    try:
+                        self.waitingSeats.put_nowait(event)
+                        self.arrivalTimes[event.id] = arrivalTime
+                        log.event(eventLog.shop, event.id, eventLog.seated, self.waitingSeats.qsize())
+                    except asyncio.QueueFull:
+                        self.customersTurnedAway += 1
+                        log.event(eventLog.shop, event.id, eventLog.turnedAway)
+            elif isinstance(event, SuccessfulCustomer):
+                customer = event.customer
+                assert isinstance(customer, Customer)
+                self.customersTrimmed += 1
+                self.statistics.trimmed(event.barber, self.arrivalTimes.pop(customer.id), event.startTime, event.finishTime)
+                log.event(eventLog.shop, customer.id, eventLog.leavesTrimmed)
+            elif isinstance(event, str):
+                self.isOpen = False
+            else:
+                raise ValueError('Object of unexpected type received.')
+            if not self.isOpen and self.customersTurnedAway + self.customersTrimmed == self.customersArrived:
+                assert self.queue.empty()
+                closedTime = time.time()
+                for _ in self.barbers:
+                    await self.waitingSeats.put(messages.goHome)
+                await asyncio.gather(*self.barbers)
+                self.statistics.customersArrived = self.customersArrived
+                self.statistics.customersTurnedAway = self.customersTurnedAway
+                self.statistics.close(closedTime)
+                self.statistics.shutdownTime = time.time() - closedTime
+                log.summary('Shop: All barbers clocked off ' + str(self.statistics.shutdownTime) + 's after the last customer left.')
+                log.summary('\nTrimmed ' + str(self.customersTrimmed) + ' and turned away ' + str(self.customersTurnedAway) + ' today.')
+                return self.statistics
+
+async def _world(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, log):
+    shop = BarbersShop(numberOfWaitingSeats, numberOfBarbers, hairTrimTime, log)
+    shopTask = asyncio.ensure_future(shop.run())
+    arrivalTime = time.time()
+    for i in range(numberOfCustomers):
+        arrivalTime += nextCustomerWaitTime()
+        await asyncio.sleep(arrivalTime - time.time())
+        log.event(eventLog.world, i, eventLog.enters)
+        shop.queue.put_nowait(Customer(i))
+    shop.queue.put_nowait('')
+    return await shopTask
+
+def runSimulation(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, log=None):
+    if log is None:
+        log = eventLog.TextLog()
+    return asyncio.run(_world(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, log))
+
+if __name__ == '__main__':
+    runSimulation(1000, 8, 4, lambda: random.random() * 0.002 + 0.001, lambda: random.random() * 0.008 + 0.001)
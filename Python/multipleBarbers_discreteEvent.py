@@ -0,0 +1,319 @@
+#! /usr/bin/env python3
+
+#  This is a model of the "The Sleeping Barber" problem using Python (http://www.python.org) as a discrete
+#  event simulation, cf. http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  All the other Python variants model the passage of time by actually passing time: the world sleeps
+#  between customer arrivals and barbers sleep whilst trimming.  Here time is virtual.  The shop holds an
+#  event calendar, a heap of (time, sequence, kind, data) tuples, and a clock which jumps straight to the
+#  time of the next event whenever one is taken from the calendar.  The sequence number breaks ties so that
+#  events at the same instant are handled in the order they were scheduled.  There are only ever at most
+#  barberCount + 1 events in the calendar, the next arrival and the end of each trim in progress, since each
+#  arrival schedules the next one rather than the whole day being scheduled up front.
+#
+#  The waiting seats are a FIFO queue shared by all the barbers, exactly as in the multiprocessing variant:
+#  an arriving customer goes straight to an idle barber if there is one, otherwise takes a seat if there is
+#  one free, otherwise is turned away.  Customers are represented just by their integer id, there are no
+#  messages being passed so there is no need for case classes.  By default nothing is recorded per event,
+#  a day with millions of customers would be dominated by the output, only the end of day summary is
+#  printed.  Passing an event log, see eventLog.py, records every event with its virtual time.  Waiting,
+#  service and sojourn times and barber utilisation are collected in a ShopStatistics, see
+#  shopStatistics.py, which is what runSimulation returns.  Collecting them costs several times as much as
+#  the rest of the simulation so collectStatistics=False turns it off leaving just the counts of customers.
+#
+#  For estimating the behaviour of a shop in the long run, see replication.py, runSimulation takes a warmUp
+#  number of customers: when customer warmUp arrives the statistics are started afresh, so the start of the
+#  day with an empty shop is left out.  Given a batchSize it also records a Snapshot of the running totals as
+#  every batchSize-th customer after the warm up arrives, and at the end of the day, in shop.snapshots, from
+#  which the statistics of each batch of customers are the differences between successive snapshots.  Both
+#  cost one integer comparison per arrival.
+#
+#  A long day can be checkpointed, see checkpoint.py, by passing a checkpoint path to runSimulation: every
+#  checkpointInterval customers the shop saves its state as that customer arrives, the clock, the counts
+#  of customers, the customers in the seats, the calendar, which has the end of each trim in progress and
+#  the next arrival, the statistics and snapshots so far and the state of the random number generators,
+#  see randomStreams.getState.  resumeSimulation carries on from the last checkpoint saved, given the same
+#  time sources as the original run, and with seeded time sources finishes with exactly the results the
+#  run would have had without stopping.  Checkpoints share the one integer comparison per arrival with the
+#  warm up and batches so they cost nothing in between.  An event log is not checkpointed, a resumed run
+#  logging only what it does.
+#
+#  To embed the simulation in something else, events is a generator of the events of a day, each an Event
+#  with the same fields as the records of an event log: the customer arriving, being seated, starting and
+#  finishing a trim, leaving trimmed or being turned away, and finally the shop closing, with the day's
+#  ShopStatistics being the value the generator returns.  The simulation only advances as events are
+#  taken, so nothing is buffered beyond the event being yielded however long the day and a consumer that
+#  stops taking events stops the simulation.  Filters and aggregations over a day are then just generator
+#  expressions and itertools, e.g. the waiting times of the first hundred customers turned away, without
+#  the events of the day ever being held in memory.  BarbersShop.run is the same generator,
+#  BarbersShop.events, run to the end with every event passed to the event log, or with nothing yielded
+#  when there is no log.
+#
+#  nextCustomerWaitTime and hairTrimTime have the same meaning as in the other variants, but the times they
+#  return are virtual so the simulation takes only as long as the event processing.  Each barber gets their
+#  trim times using randomStreams.trimTimes, so with seeded time sources, see randomStreams.py, or a
+#  replayed trace, see traces.py, a run is reproducible.
+
+import collections
+import heapq
+import itertools
+import random
+
+import checkpoint
+import eventLog
+import randomStreams
+from shopStatistics import ShopStatistics
+
+_arrival = 0
+_trimFinished = 1
+
+Event = collections.namedtuple('Event', ('time', 'actor', 'customer', 'kind', 'value'))
+
+def _nextBoundary(customer, warmUp, batchSize, checkpointInterval):
+    '''The id of the first customer after customer whose arrival ends the warm up or a batch or is checkpointed, -1 if none.'''
+    boundaries = []
+    if customer < warmUp:
+        boundaries.append(warmUp)
+    elif batchSize > 0:
+        boundaries.append(warmUp + ((customer - warmUp) // batchSize + 1) * batchSize)
+    if checkpointInterval > 0:
+        boundaries.append((customer // checkpointInterval + 1) * checkpointInterval)
+    return min(boundaries) if boundaries else -1
+
+Snapshot = collections.namedtuple('Snapshot', ('time', 'customersArrived', 'customersTrimmed', 'customersTurnedAway', 'totalWaitingTime',
+                                               'totalSojournTime', 'totalBusyTime'))
+
+class BarbersShop(object):
+    def __init__(self, waitingSeatCount, barberCount, hairTrimTime, log=None, collectStatistics=True):
+        assert waitingSeatCount > 0, 'Cannot have 0 or less waiting seats'
+        assert barberCount > 0, 'Must have some barbers'
+        self.waitingSeatCount = waitingSeatCount
+        self.barberCount = barberCount
+        self.hairTrimTime = hairTrimTime
+        self.trimSources = [randomStreams.barberTimes(hairTrimTime, barber) for barber in range(barberCount)]
+        self.trimTimes = [randomStreams.customerTimes(source) for source in self.trimSources]
+        self.log = log
+        self.clock = 0.0
+        self.calendar = []
+        self.sequence = 0
+        self.waitingSeats = collections.deque()
+        self.idleBarbers = list(range(barberCount))
+        self.customersArrived = 0
+        self.customersTrimmed = 0
+        self.customersTurnedAway = 0
+        self.collectStatistics = collectStatistics
+        self.statistics = ShopStatistics(barberCount)
+        self.snapshots = []
+        self.checkpointedSnapshots = 0
+        self.resumedCustomer = -1
+
+    def snapshot(self, time, customersArrived, customersTrimmed, customersTurnedAway):
+        statistics = self.statistics
+        self.snapshots.append(Snapshot(time, customersArrived, customersTrimmed, customersTurnedAway, statistics.waitingTime.total,
+                                       statistics.sojournTime.total, sum(statistics.barberBusyTime)))
+
+    def checkpointState(self, numberOfCustomers, nextCustomerWaitTime, warmUp, batchSize, checkpointInterval, event):
+        '''The state of the shop as event, the arrival being handled, is taken from the calendar, see checkpoint.py.'''
+        snapshots = self.snapshots[self.checkpointedSnapshots:]
+        self.checkpointedSnapshots = len(self.snapshots)
+        return {
+            'numberOfCustomers': numberOfCustomers,
+            'warmUp': warmUp,
+            'batchSize': batchSize,
+            'checkpointInterval': checkpointInterval,
+            'waitingSeatCount': self.waitingSeatCount,
+            'barberCount': self.barberCount,
+            'collectStatistics': self.collectStatistics,
+            'clock': self.clock,
+            'sequence': self.sequence,
+            'calendar': self.calendar + [event],
+            'waitingSeats': list(self.waitingSeats),
+            'idleBarbers': list(self.idleBarbers),
+            'customersArrived': self.customersArrived,
+            'customersTrimmed': self.customersTrimmed,
+            'customersTurnedAway': self.customersTurnedAway,
+            'statistics': self.statistics,
+            'snapshots': snapshots,
+            'arrivalState': randomStreams.getState(nextCustomerWaitTime),
+            'trimStates': [randomStreams.getState(source) for source in self.trimSources],
+            'randomState': random.getstate(),
+        }
+
+    @classmethod
+    def fromCheckpoint(cls, state, nextCustomerWaitTime, hairTrimTime, log=None):
+        '''The shop of a checkpoint state, with the time sources, which must be made as for the original run, restored to their state then.'''
+        shop = cls(state['waitingSeatCount'], state['barberCount'], hairTrimTime, log, state['collectStatistics'])
+        randomStreams.setState(nextCustomerWaitTime, state['arrivalState'])
+        for source, trimState in zip(shop.trimSources, state['trimStates']):
+            randomStreams.setState(source, trimState)
+        shop.trimTimes = [randomStreams.customerTimes(source) for source in shop.trimSources]
+        random.setstate(state['randomState'])
+        shop.clock = state['clock']
+        shop.sequence = state['sequence']
+        shop.calendar = state['calendar']
+        heapq.heapify(shop.calendar)
+        shop.waitingSeats.extend(state['waitingSeats'])
+        shop.idleBarbers[:] = state['idleBarbers']
+        shop.customersArrived = state['customersArrived']
+        shop.customersTrimmed = state['customersTrimmed']
+        shop.customersTurnedAway = state['customersTurnedAway']
+        shop.statistics = state['statistics']
+        shop.snapshots = state['snapshots']
+        shop.checkpointedSnapshots = len(shop.snapshots)
+        shop.resumedCustomer = min(data for _, _, kind, data in shop.calendar if kind == _arrival)
+        return shop
+
+    def schedule(self, delay, kind, data):
+        self.sequence += 1
+        heapq.heappush(self.calendar, (self.clock + delay, self.sequence, kind, data))
+
+    def run(self, numberOfCustomers, nextCustomerWaitTime, warmUp=0, batchSize=0, checkpointer=None):
+        '''Run a day with numberOfCustomers customers, returning the statistics of the day after the first warmUp customers.
+
+        A shop made by fromCheckpoint carries on with the day it was checkpointed in.'''
+        log = self.log
+        for event in self.events(numberOfCustomers, nextCustomerWaitTime, warmUp, batchSize, checkpointer, log is not None):
+            log.event(event.actor, event.customer, event.kind, event.value, event.time)
+        if log is not None:
+            log.flush()
+        return self.statistics
+
+    def events(self, numberOfCustomers, nextCustomerWaitTime, warmUp=0, batchSize=0, checkpointer=None, emit=True):
+        '''Generate the Events of the day as run does it, returning the statistics of the day after the first warmUp customers.
+
+        With emit False nothing is yielded, the whole day being run by the first next.'''
+        #  This is the hot loop so everything used per event is held in a local variable.  boundary is the id
+        #  of the next customer whose arrival ends the warm up or a batch or is checkpointed, -1 if there are
+        #  none.  run drives it with emit False when there is no event log, so a day that is not being
+        #  watched costs nothing for the yields.
+        calendar = self.calendar
+        waitingSeats = self.waitingSeats
+        idleBarbers = self.idleBarbers
+        waitingSeatCount = self.waitingSeatCount
+        trimTimes = self.trimTimes
+        trimmed = self.statistics.trimmed if self.collectStatistics else None
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        arrivals = nextCustomerWaitTime
+        nextCustomerWaitTime = randomStreams.sampler(nextCustomerWaitTime)
+        if numberOfCustomers > 0 and self.sequence == 0:
+            self.schedule(nextCustomerWaitTime(), _arrival, 0)
+        clock = self.clock
+        sequence = self.sequence
+        customersArrived = self.customersArrived
+        customersTrimmed = self.customersTrimmed
+        customersTurnedAway = self.customersTurnedAway
+        checkpointInterval = 0 if checkpointer is None else checkpointer.interval
+        resumedCustomer = self.resumedCustomer
+        boundary = _nextBoundary(resumedCustomer - 1 if resumedCustomer >= 0 else 0, warmUp, batchSize, checkpointInterval)
+        while calendar:
+            clock, eventSequence, kind, data = heappop(calendar)
+            if kind == _arrival:
+                if data == boundary:
+                    if checkpointInterval > 0 and data % checkpointInterval == 0 and data != resumedCustomer:
+                        self.clock = clock
+                        self.sequence = sequence
+                        self.customersArrived = customersArrived
+                        self.customersTrimmed = customersTrimmed
+                        self.customersTurnedAway = customersTurnedAway
+                        checkpointer.write(self.checkpointState(numberOfCustomers, arrivals, warmUp, batchSize, checkpointInterval,
+                                                                (clock, eventSequence, kind, data)))
+                    if data == warmUp:
+                        self.statistics = ShopStatistics(self.barberCount, clock)
+                        trimmed = self.statistics.trimmed if self.collectStatistics else None
+                        customersArrived = customersTrimmed = customersTurnedAway = 0
+                    if batchSize > 0 and data >= warmUp and (data - warmUp) % batchSize == 0:
+                        self.snapshot(clock, customersArrived, customersTrimmed, customersTurnedAway)
+                    boundary = _nextBoundary(data, warmUp, batchSize, checkpointInterval)
+                customersArrived += 1
+                if emit:
+                    yield Event(clock, eventLog.world, data, eventLog.enters, 0)
+                if data + 1 < numberOfCustomers:
+                    sequence += 1
+                    heappush(calendar, (clock + nextCustomerWaitTime(), sequence, _arrival, data + 1))
+                if idleBarbers:
+                    barber = idleBarbers.pop()
+                    sequence += 1
+                    heappush(calendar, (clock + trimTimes[barber](data), sequence, _trimFinished, (barber, data, clock, clock)))
+                    if emit:
+                        yield Event(clock, barber, data, eventLog.startsTrim, 0)
+                elif len(waitingSeats) < waitingSeatCount:
+                    waitingSeats.append((data, clock))
+                    if emit:
+                        yield Event(clock, eventLog.shop, data, eventLog.seated, len(waitingSeats))
+                else:
+                    customersTurnedAway += 1
+                    if emit:
+                        yield Event(clock, eventLog.shop, data, eventLog.turnedAway, 0)
+            elif kind == _trimFinished:
+                customersTrimmed += 1
+                barber, customer, arrivalTime, startTime = data
+                if trimmed is not None:
+                    trimmed(barber, arrivalTime, startTime, clock)
+                if emit:
+                    yield Event(clock, barber, customer, eventLog.finishesTrim, 0)
+                    yield Event(clock, eventLog.shop, customer, eventLog.leavesTrimmed, 0)
+                if waitingSeats:
+                    customer, arrivalTime = waitingSeats.popleft()
+                    sequence += 1
+                    heappush(calendar, (clock + trimTimes[barber](customer), sequence, _trimFinished, (barber, customer, arrivalTime, clock)))
+                    if emit:
+                        yield Event(clock, barber, customer, eventLog.startsTrim, 0)
+                else:
+                    idleBarbers.append(barber)
+            else:
+                raise ValueError('Event of unexpected kind in the calendar.')
+        self.clock = clock
+        self.sequence = sequence
+        self.customersArrived = customersArrived
+        self.customersTrimmed = customersTrimmed
+        self.customersTurnedAway = customersTurnedAway
+        self.statistics.customersArrived = customersArrived
+        self.statistics.customersTrimmed = customersTrimmed
+        self.statistics.customersTurnedAway = customersTurnedAway
+        self.statistics.close(clock)
+        if batchSize > 0:
+            self.snapshot(clock, customersArrived, customersTrimmed, customersTurnedAway)
+        return self.statistics
+
+def events(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, collectStatistics=True):
+    '''Generate the Events of a day as the simulation advances, returning the day's ShopStatistics.'''
+    statistics = yield from BarbersShop(numberOfWaitingSeats, numberOfBarbers, hairTrimTime, None, collectStatistics).events(numberOfCustomers, nextCustomerWaitTime)
+    yield Event(statistics.endTime, eventLog.shop, -1, eventLog.closes, statistics.customersTrimmed)
+    return statistics
+
+def runSimulation(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, log=None, collectStatistics=True, warmUp=0,
+                  checkpointPath=None, checkpointInterval=1000000):
+    shop = BarbersShop(numberOfWaitingSeats, numberOfBarbers, hairTrimTime, log, collectStatistics)
+    if checkpointPath is None:
+        statistics = shop.run(numberOfCustomers, nextCustomerWaitTime, warmUp)
+    else:
+        with checkpoint.Checkpointer(checkpointPath, checkpointInterval) as checkpointer:
+            statistics = shop.run(numberOfCustomers, nextCustomerWaitTime, warmUp, checkpointer=checkpointer)
+    (eventLog.SummaryLog() if log is None else log).summary('\nTrimmed ' + str(statistics.customersTrimmed) + ' and turned away ' + str(statistics.customersTurnedAway) + ' today.')
+    return statistics
+
+def resumeSimulation(checkpointPath, nextCustomerWaitTime, hairTrimTime, log=None, checkpointInterval=None):
+    '''Carry on the run checkpointed at checkpointPath from its last checkpoint, carrying on checkpointing to the same file.
+
+    Checkpoints are taken every checkpointInterval customers, by default as often as in the original run.'''
+    state = checkpoint.load(checkpointPath)
+    assert state is not None, checkpointPath + ' has no complete checkpoint.'
+    if checkpointInterval is None:
+        checkpointInterval = state['checkpointInterval']
+    shop = BarbersShop.fromCheckpoint(state, nextCustomerWaitTime, hairTrimTime, log)
+    with checkpoint.Checkpointer(checkpointPath, checkpointInterval, resume=True) as checkpointer:
+        statistics = shop.run(state['numberOfCustomers'], nextCustomerWaitTime, state['warmUp'], state['batchSize'], checkpointer)
+    (eventLog.SummaryLog() if log is None else log).summary('\nTrimmed ' + str(statistics.customersTrimmed) + ' and turned away ' + str(statistics.customersTurnedAway) + ' today.')
+    return statistics
+
+if __name__ == '__main__':
+    print(runSimulation(1000, 8, 4, lambda: random.random() * 0.002 + 0.001, lambda: random.random() * 0.008 + 0.001))
+    #  A day of events as a pipeline: the mean time between the first 100 customers turned away in a
+    #  day of a million, the simulation stopping as soon as the hundredth is.
+    turnedAway = (event.time for event in events(1000000, 2, 2, lambda: random.random() * 0.002 + 0.001, lambda: random.random() * 0.008 + 0.001)
+                  if event.kind == eventLog.turnedAway)
+    times = list(itertools.islice(turnedAway, 100))
+    print('Mean time between the first 100 customers turned away: ' + str((times[-1] - times[0]) / (len(times) - 1)))
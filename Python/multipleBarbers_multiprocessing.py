@@ -11,33 +11,189 @@
 #  process getting clients from the queue – a blocking read models being asleep in the cutting chair when
 #  not actively processing a customer. In effect this is an Actor Model reactor approach with each process
 #  using a blocking read on its event queue but with barbers sharing a queue.  Because we are using what is
-#  effectively an Actor Model approach we have to use case classes so as to carry appropriate infomration in
-#  the messages sent to the shop process.
+#  effectively an Actor Model approach the messages sent to the shop process have to say what they are, they
+#  are tuples tagged with a small integer, see messages.py, the shop switching on the tag.  The waiting seats
+#  only ever hold customers so just the customer id is put in a seat.
+
+#  Each arrival and each trimmed customer is a separate put on the shop's queue by default.  Passing a
+#  maxBatchSize to runSimulation replaces the shop's queue with a BatchingQueue that sends events in
+#  batches, see batchingQueue.py.  The shop reports the rate at which it handled events either way, so the
+#  two can be compared.  Batching is only applied to the shop's queue, the waiting seats have to stay a
+#  bounded multiprocessing.Queue as put_nowait failing is how the shop knows it is full.
+
+#  Passing sharedMemorySeats=True to runSimulation replaces the waiting seats queue with a ring buffer of
+#  customer ids in shared memory, see sharedMemorySeats.py, so nothing is pickled and the number of seats in
+#  use is exact.  Passing workStealing=True instead gives each barber their own queue of customer ids in
+#  shared memory, the queues sharing the seats, with barbers whose queue is empty stealing from the longest
+#  queue, see workStealingSeats.py, so that barbers do not all contend for a single queue.  Barbers get the
+#  waiting seats they use with forBarber where the seats have it.
+
+#  The working days of the shop and of a barber are the functions shopDay and barberDay, the BarbersShop
+#  and Barber processes each running one day, so that the pooled processes of barberPool.py can run a day
+#  for each run they are leased to.
+
+#  Events are recorded with an event log, see eventLog.py, rather than printed as they happen.  By default
+#  this is a TextLog giving the same lines as were originally printed but written in bulk.  Barbers flush
+#  their log whenever the waiting seats are empty, as that is when they may be about to sleep, and when they
+#  clock off.  The shop collects waiting, service and sojourn times and barber utilisation in a ShopStatistics,
+#  see shopStatistics.py, timing everything with the wall clock, and sends it back to be the return value
+#  of runSimulation.  Each barber gets their trim times using randomStreams.trimTimes so that seeded time
+#  sources give each barber process its own stream, and a replayed trace gives each customer their own trim
+#  time, see randomStreams.py and traces.py.
+
+#  The day ends with the protocol in messages.py: once closed and with every seated customer trimmed the shop
+#  puts a messages.goHome in the waiting seats for each barber, or has the shared memory seats wake each
+#  barber with one, and each barber clocks off by sending (clockedOff, barber) to the shop.  The shop reports
+#  the time from the last customer leaving to the last barber clocking off as the shutdown time.
+
+#  Passing a Metrics, see liveMetrics.py, to runSimulation has the world, the shop and the barbers keep
+#  counts of the messages they take and send, and the barbers their busy and idle time, in shared memory,
+#  with the depth of the shop's queue and the number of seats occupied as gauges read by whoever reads the
+#  metrics.  Without one the only cost is a test per event.
 
 #  This should work with both Python 2 and Python 3.  Use range everywhere, even where with Python 2 xrange
 #  would be preferred so as to ensure it all works with both versions.
 
 import multiprocessing
 import random
+import sys
 import time
 
+import eventLog
+import liveMetrics
+import messages
+import randomStreams
+from batchingQueue import BatchingQueue
+from sharedMemorySeats import SharedMemorySeats
+from workStealingSeats import WorkStealingSeats
+from shopStatistics import ShopStatistics
+
 #  Must get the Full and Empty symbols as multiprocessing does not define them but does use them.
 try:
     import queue  # Python 3
 except:
     import Queue as queue  # Python 2
 
-class Customer(object):
-    def __init__(self, id):
-        self.id = id
+def _flushLogIfIdle(log, waitingSeats):
+    if waitingSeats.empty():
+        log.flush()
 
-class SuccessfulCustomer(object):
-    def __init__(self, customer):
-        self.customer = customer
+def barberDay(shop, identity, hairTrimTime):
+    '''The working day of a barber of shop, taking customers from its waiting seats until sent home.'''
+    log = shop.log
+    trimTime = randomStreams.trimTimes(hairTrimTime, identity)
+    waitingSeats = shop.waitingSeats
+    if hasattr(waitingSeats, 'forBarber'):
+        waitingSeats = waitingSeats.forBarber(identity)
+    counters = None if shop.metrics is None else shop.metrics.counters
+    if counters is not None:
+        base = shop.metrics.offset('barber ' + str(identity))
+    while True:
+        _flushLogIfIdle(log, waitingSeats)
+        if counters is not None:
+            waitStartTime = time.time()
+        customer = waitingSeats.get()
+        if counters is not None:
+            counters[base + liveMetrics.eventsIn] += 1
+            counters[base + liveMetrics.idleSeconds] += time.time() - waitStartTime
+        if customer == messages.goHome:
+            log.flush()
+            shop.queue.put((messages.clockedOff, identity))
+            if hasattr(shop.queue, 'flush'):
+                shop.queue.flush()
+            return
+        startTime = time.time()
+        log.event(identity, customer, eventLog.startsTrim, timestamp=startTime)
+        time.sleep(trimTime(customer))
+        finishTime = time.time()
+        log.event(identity, customer, eventLog.finishesTrim, timestamp=finishTime)
+        _flushLogIfIdle(log, waitingSeats)
+        shop.queue.put((messages.trimmed, customer, identity, startTime, finishTime))
+        if counters is not None:
+            counters[base + liveMetrics.eventsOut] += 1
+            counters[base + liveMetrics.busySeconds] += finishTime - startTime
 
-_closing = 'closing'
-_clockedOff = 'clockedOff'
-_closed = 'closed'
+def _sendBarbersHome(shop):
+    if isinstance(shop.waitingSeats, WorkStealingSeats):
+        shop.waitingSeats.sendHome()
+    elif hasattr(shop.waitingSeats, 'sendHome'):
+        shop.waitingSeats.sendHome(shop.barberCount)
+    else:
+        for _ in range(shop.barberCount):
+            shop.waitingSeats.put(messages.goHome)
+
+def shopDay(shop):
+    '''The day of shop, from the first event on its queue to all its barbers having clocked off.
+
+    The statistics of the day are put on shop.results.'''
+    log = shop.log
+    waitingSeats = shop.waitingSeats
+    eventCount = 0
+    customersArrived = 0
+    customersTrimmed = 0
+    customersTurnedAway = 0
+    isOpen = True
+    arrivalTimes = {}
+    startTime = None
+    closedTime = None
+    barbersAtWork = shop.barberCount
+    counters = None if shop.metrics is None else shop.metrics.counters
+    if counters is not None:
+        base = shop.metrics.offset('shop')
+    while True:
+        event = shop.queue.get()
+        eventCount += 1
+        if counters is not None:
+            counters[base + liveMetrics.eventsIn] += 1
+        if startTime is None:
+            startTime = time.time()
+            statistics = ShopStatistics(shop.barberCount, startTime)
+        tag = event[0]
+        if tag == messages.arrives:
+            customer = event[1]
+            if not isOpen:
+                log.event(eventLog.shop, customer, eventLog.refused)
+            else:
+                customersArrived += 1
+                arrivalTime = time.time()
+                try:
+                    waitingSeats.put_nowait(customer)
+                    arrivalTimes[customer] = arrivalTime
+                    log.event(eventLog.shop, customer, eventLog.seated, waitingSeats.qsize())
+                    if counters is not None:
+                        counters[base + liveMetrics.eventsOut] += 1
+                except queue.Full:
+                    customersTurnedAway += 1
+                    log.event(eventLog.shop, customer, eventLog.turnedAway)
+                    if counters is not None:
+                        counters[base + liveMetrics.customersTurnedAway] += 1
+        elif tag == messages.trimmed:
+            _, customer, barber, trimStartTime, trimFinishTime = event
+            customersTrimmed += 1
+            statistics.trimmed(barber, arrivalTimes.pop(customer), trimStartTime, trimFinishTime)
+            log.event(eventLog.shop, customer, eventLog.leavesTrimmed)
+            if counters is not None:
+                counters[base + liveMetrics.customersTrimmed] += 1
+        elif tag == messages.closing:
+            isOpen = False
+        elif tag == messages.clockedOff:
+            barbersAtWork -= 1
+            if barbersAtWork == 0:
+                statistics.customersArrived = customersArrived
+                statistics.customersTurnedAway = customersTurnedAway
+                statistics.close(closedTime)
+                statistics.shutdownTime = time.time() - closedTime
+                elapsed = statistics.duration
+                log.summary('Shop: Handled ' + str(eventCount) + ' events in ' + str(elapsed) + 's, ' + str(eventCount / elapsed) + ' events/s.')
+                log.summary('Shop: All barbers clocked off ' + str(statistics.shutdownTime) + 's after the last customer left.')
+                log.summary('\nTrimmed ' + str(customersTrimmed) + ' and turned away ' + str(customersTurnedAway) + ' today.')
+                shop.results.put(statistics)
+                return
+        else:
+            raise ValueError('Message with unexpected tag received.')
+        if closedTime is None and not isOpen and customersTurnedAway + customersTrimmed == customersArrived:
+            closedTime = time.time()
+            _sendBarbersHome(shop)
 
 class Barber(multiprocessing.Process):
     def __init__(self, shop, identity, hairTrimTime):
@@ -47,71 +203,68 @@ class Barber(multiprocessing.Process):
         self.hairTrimTime = hairTrimTime
         self.start()
 
-    def _message(self, message):
-        print ('Barber ' + str(self.identity) + ': ' + str(message))
-
     def run(self):
-        while True:
-            customer = self.shop.waitingSeats.get()
-            assert isinstance(customer, Customer)
-            self._message('Starting Customer ' + str(customer.id))
-            time.sleep(self.hairTrimTime())
-            self._message('Finished Customer ' + str(customer.id))
-            self.shop.queue.put(SuccessfulCustomer(customer))
+        barberDay(self.shop, self.identity, self.hairTrimTime)
 
 class BarbersShop(multiprocessing.Process):
-    def __init__(self, waitingSeatCount, barberCount, hairTrimTime):
+    def __init__(self, waitingSeatCount, barberCount, hairTrimTime, maxBatchSize=None, maxLinger=0.001, sharedMemorySeats=False, log=None, workStealing=False, metrics=None):
         assert waitingSeatCount > 0, 'Cannot have 0 or less waiting seats'
         assert barberCount > 0, 'Must have some barbers"'
         super().__init__()
-        self.queue = multiprocessing.Queue()
-        self.waitingSeats = multiprocessing.Queue(waitingSeatCount)
-        self.customersArrived = 0
-        self.customersTrimmed = 0
-        self.customersTurnedAway = 0
-        self.isOpen = True
+        self.results = multiprocessing.Queue()
+        self.queue = multiprocessing.Queue() if maxBatchSize is None else BatchingQueue(maxBatchSize, maxLinger)
+        self.seatsInSharedMemory = sharedMemorySeats or workStealing
+        if workStealing:
+            self.waitingSeats = WorkStealingSeats(waitingSeatCount, barberCount)
+        elif sharedMemorySeats:
+            self.waitingSeats = SharedMemorySeats(waitingSeatCount)
+        else:
+            self.waitingSeats = multiprocessing.Queue(waitingSeatCount)
+        self.log = eventLog.TextLog() if log is None else log
+        self.metrics = metrics
+        self.barberCount = barberCount
         self.barbers = [Barber(self, i, hairTrimTime) for i in range(barberCount)]
         self.start()
 
     def run(self):
-        while True:
-            event = self.queue.get()
-            if isinstance(event, Customer):
-                if not self.isOpen:
-                    print('Shop: Sorry we are closed. Customer' + str(event.id))
-                else:
-                    self.customersArrived += 1
-                    try:
-                        self.waitingSeats.put_nowait(event)
-                        print('Shop: Customer ' + str(event.id) + ' takes a seat. ' + str(self.waitingSeats.qsize()) + ' in use.')
-                    except queue.Full:
-                        self.customersTurnedAway += 1
-                        print('Shop: Customer ' + str(event.id) + ' turned away.')
-            elif isinstance(event, SuccessfulCustomer):
-                customer = event.customer
-                assert isinstance(customer, Customer)
-                self.customersTrimmed += 1
-                print('Shop: Customer ' + str(customer.id) + ' leaving trimmed.')
-                if not self.isOpen and self.customersTurnedAway + self.customersTrimmed == self.customersArrived:
-                    assert self.queue.empty()
-                    for barber in self.barbers:
-                        barber.terminate()
-                    print('\nTrimmed ' + str(self.customersTrimmed) + ' and turned away ' + str(self.customersTurnedAway) + ' today.')
-                    return
-            elif isinstance(event, str):
-                self.isOpen = False
-            else:
-                raise ValueError('Object of unexpected type received.')
+        shopDay(self)
+
+def _registerGauges(metrics, shop):
+    if hasattr(shop.queue, 'qsize'):
+        metrics.gauge('barbershop_mailbox_depth', 'Messages waiting to be taken.', 'shop', shop.queue.qsize)
+    metrics.gauge('barbershop_seats_occupied', 'Customers seated waiting for a barber.', 'shop', shop.waitingSeats.qsize)
+    if hasattr(shop.waitingSeats, 'forBarber'):
+        for barber in range(shop.barberCount):
+            metrics.gauge('barbershop_mailbox_depth', 'Messages waiting to be taken.', 'barber ' + str(barber), shop.waitingSeats.forBarber(barber).qsize)
 
-def runSimulation(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime):
-    shop = BarbersShop(numberOfWaitingSeats, numberOfBarbers, hairTrimTime)
+def runSimulation(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, maxBatchSize=None, maxLinger=0.001, sharedMemorySeats=False, log=None, workStealing=False,
+                  metrics=None):
+    shop = BarbersShop(numberOfWaitingSeats, numberOfBarbers, hairTrimTime, maxBatchSize, maxLinger, sharedMemorySeats, log, workStealing, metrics)
+    counters = None
+    if metrics is not None:
+        _registerGauges(metrics, shop)
+        counters = metrics.counters
+        base = metrics.offset('world')
     for i in range(numberOfCustomers):
         time.sleep(nextCustomerWaitTime())
-        print('World: Customer ' + str(i) + ' enters the shop.')
-        shop.queue.put(Customer(i))
-    shop.queue.put('')
+        shop.log.event(eventLog.world, i, eventLog.enters)
+        shop.queue.put((messages.arrives, i))
+        if counters is not None:
+            counters[base + liveMetrics.eventsOut] += 1
+    shop.queue.put(messages.closingMessage)
+    shop.log.flush()
+    if maxBatchSize is not None:
+        shop.queue.flush()
+    statistics = shop.results.get()
     shop.join()
+    for barber in shop.barbers:
+        barber.join()
+    if shop.seatsInSharedMemory:
+        shop.waitingSeats.unlink()
+    return statistics
 
 if __name__ == '__main__':
-    #  If waiting seat count is 0 then it all goes wrong.
-    runSimulation(1000, 8, 4, lambda: random.random() * 0.002 + 0.001, lambda: random.random() * 0.008 + 0.001)
+    #  If waiting seat count is 0 then it all goes wrong.  An optional command line argument switches on
+    #  batching of events sent to the shop using that as the maximum batch size.
+    maxBatchSize = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    runSimulation(1000, 8, 4, lambda: random.random() * 0.002 + 0.001, lambda: random.random() * 0.008 + 0.001, maxBatchSize)
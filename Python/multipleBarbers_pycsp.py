@@ -6,110 +6,161 @@
 #
 #  Copyright © 2009–2012 Russel Winder
 
-#  The barber's shop and the barber are modelled with processes.  Channels are used to pass customer objects
-#  from the shop to the barber.  The current arrangement assumes there is only one barber.
+#  The barber's shop and the barber are modelled with processes.  Channels are used to pass customers from
+#  the shop to the barber.  The current arrangement assumes there is only one barber.  Each channel only
+#  ever carries customers so just the customer id is sent, see messages.py.
+#
+#  The shop entrance holds the waiting seats and selects between a customer arriving and a barber being
+#  ready to take the customer in the seat occupied longest, so hand-offs happen as soon as a barber is free
+#  rather than on a timeout.  The day ends with the protocol in messages.py: the world sends goHome, the
+#  entrance hands every seated customer to a barber and then sends each barber goHome, each barber passes
+#  goHome on to the shop exit as they clock off, and once all the barbers have the exit sends goHome to the
+#  accounts, who report the day once both the entrance and the exit have.  The time from the last customer
+#  leaving to the last barber clocking off is reported as the shutdown time.  Events are recorded with an
+#  event log, see eventLog.py, by default a TextLog writing the lines that used to be printed, each process
+#  flushing its log when it finishes.
+#
+#  Passing workStealing=True replaces the entrance's seats and the channel to the barbers with the per-barber
+#  queues of workStealingSeats.py, the entrance seating each customer in the shortest queue and each barber
+#  taking from their own queue or stealing from the longest.  At the end of the day the entrance calls
+#  sendHome and each barber gets goHome once every queue is empty, the rest of the protocol being unchanged.
 
 #  This should work with both Python 2 and Python 3.  Use range everywhere, even where with Python 2 xrange
-#  would be preferred so as to ensure it all works with both versions.
+#  would be preferred so as to ensure it all works with both versions.  Work stealing seats need Python 3.
 
+import collections
 import time
 import random
 
-from pycsp.processes import (process, retire, poison, Channel, Parallel, AltSelect,
-                              InputGuard, OutputGuard, TimeoutGuard, ChannelPoisonException)
+from pycsp.processes import process, Channel, Parallel, AltSelect, InputGuard, OutputGuard
 
-class Customer(object):
-    def __init__(self, id):
-        self.id = id
+import eventLog
+import messages
+
+#  Must get the Full symbol as multiprocessing does not define it but does use it.
+import queue
 
 @process
-def barber(identity, hairTrimTime, fromShopIn, toShopOut):
-    def _message(message):
-        print ('Barber ' + str(identity) + ': ' + str(message))
+def barber(identity, hairTrimTime, fromShopIn, toShopOut, log):
     while True:
         customer = fromShopIn()
-        assert isinstance(customer, Customer)
-        _message('Barber: Starting Customer ' + str(customer.id))
+        if customer == messages.goHome:
+            log.summary('Barber ' + str(identity) + ': Clocking off.')
+            toShopOut(customer)
+            return
+        log.event(identity, customer, eventLog.startsTrim)
         time.sleep(hairTrimTime())
-        _message('Barber: Finished Customer ' + str(customer.id))
+        log.event(identity, customer, eventLog.finishesTrim)
         toShopOut(customer)
 
 @process
-def shopIn(numberOfWaitingSeats, fromWorld, toBarber, toAccounts):
-    seats = []
-
-    def trySendingToBarber(customer):
-        channel, message = AltSelect(OutputGuard(toBarber, msg=seats[0]), TimeoutGuard(seconds=0.1))
+def shopIn(numberOfWaitingSeats, numberOfBarbers, fromWorld, toBarber, toAccounts, log):
+    seats = collections.deque()
+    while True:
+        if seats:
+            channel, customer = AltSelect(InputGuard(fromWorld), OutputGuard(toBarber, msg=seats[0]))
+        else:
+            channel, customer = fromWorld, fromWorld()
         if channel == toBarber:
-            del customer
-    try:
-        while True:
-            customer = fromWorld()
-            assert isinstance(customer, Customer)
-            if len(seats) < numberOfWaitingSeats:
-                seats.append(customer)
-                print('Shop: Customer ' + str(customer.id) + ' takes a seat. ' + str(len(seats)) + ' in use.')
-                channel, message = AltSelect(OutputGuard(toBarber, msg=seats[0]), TimeoutGuard(seconds=0.1))
-                if channel == toBarber:
-                    seats = seats[1:]
-            else:
-                if len(seats) > 0:
-                    channel, message = AltSelect(OutputGuard(toBarber, msg=seats[0]), TimeoutGuard(seconds=0.1))
-                    if channel == toBarber:
-                        seats = seats[1:]
-                print('Shop: Customer ' + str(customer.id) + ' turned away.')
-                toAccounts(customer)
-    except ChannelPoisonException:
-        while(len(seats) > 0):
-            toBarber(seats[0])
-            seats = seats[1:]
-        poison(toBarber)
+            seats.popleft()
+        elif customer == messages.goHome:
+            break
+        elif len(seats) < numberOfWaitingSeats:
+            seats.append(customer)
+            log.event(eventLog.shop, customer, eventLog.seated, len(seats))
+        else:
+            log.event(eventLog.shop, customer, eventLog.turnedAway)
+            toAccounts(customer)
+    while seats:
+        toBarber(seats.popleft())
+    for _ in range(numberOfBarbers):
+        toBarber(messages.goHome)
+    toAccounts(messages.goHome)
+    log.flush()
 
 @process
-def shopOut(fromBarber, toAccounts):
+def workStealingShopIn(fromWorld, waitingSeats, toAccounts, log):
     while True:
+        customer = fromWorld()
+        if customer == messages.goHome:
+            break
+        try:
+            waitingSeats.put_nowait(customer)
+            log.event(eventLog.shop, customer, eventLog.seated, waitingSeats.qsize())
+        except queue.Full:
+            log.event(eventLog.shop, customer, eventLog.turnedAway)
+            toAccounts(customer)
+    waitingSeats.sendHome()
+    toAccounts(messages.goHome)
+    log.flush()
+
+@process
+def shopOut(numberOfBarbers, fromBarber, toAccounts, log):
+    barbersAtWork = numberOfBarbers
+    lastLeftTime = time.time()
+    while barbersAtWork > 0:
         customer = fromBarber()
-        assert isinstance(customer, Customer)
-        print('Shop: Customer ' + str(customer.id) + ' leaving trimmed.')
-        toAccounts(customer)
+        if customer == messages.goHome:
+            barbersAtWork -= 1
+        else:
+            lastLeftTime = time.time()
+            log.event(eventLog.shop, customer, eventLog.leavesTrimmed)
+            toAccounts(customer)
+    log.summary('Shop: All barbers clocked off ' + str(time.time() - lastLeftTime) + 's after the last customer left.')
+    toAccounts(messages.goHome)
 
 @process
-def accounts(fromShopIn, fromShopOut):
+def accounts(fromShopIn, fromShopOut, log):
     customersTurnedAway = 0
     customersTrimmed = 0
-    try:
-        while True:
-            channel, customer = AltSelect(InputGuard(fromShopIn), InputGuard(fromShopOut))
-            if channel == fromShopIn:
-                customersTurnedAway += 1
-            elif channel == fromShopOut:
-                customersTrimmed += 1
-            else:
-                raise ValueError('Incorrect return from AltSelect.')
-    except ChannelPoisonException:
-        print('\nTrimmed ' + str(customersTrimmed) + ' and turnedAway ' + str(customersTurnedAway) + ' today.')
+    openChannels = [fromShopIn, fromShopOut]
+    while openChannels:
+        channel, customer = AltSelect(*[InputGuard(c) for c in openChannels])
+        if customer == messages.goHome:
+            openChannels.remove(channel)
+        elif channel == fromShopIn:
+            customersTurnedAway += 1
+        elif channel == fromShopOut:
+            customersTrimmed += 1
+        else:
+            raise ValueError('Incorrect return from AltSelect.')
+    log.summary('\nTrimmed ' + str(customersTrimmed) + ' and turnedAway ' + str(customersTurnedAway) + ' today.')
 
 @process
-def world(numberOfCustomers, nextCustomerWaitTime, toShopIn):
+def world(numberOfCustomers, nextCustomerWaitTime, toShopIn, log):
     for i in range(numberOfCustomers):
         time.sleep(nextCustomerWaitTime())
-        toShopIn(Customer(i))
-    poison(toShopIn)
+        log.event(eventLog.world, i, eventLog.enters)
+        toShopIn(i)
+    toShopIn(messages.goHome)
+    log.flush()
 
-def main(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime):
+def main(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, log=None, workStealing=False):
+    if log is None:
+        log = eventLog.TextLog()
     worldToShopIn = Channel()
     shopOutToShopIn = Channel()
-    toBarber = Channel()
     toShopOut = Channel()
     shopInToAccounts = Channel()
     shopOutToAccounts = Channel()
+    if workStealing:
+        from workStealingSeats import WorkStealingSeats
+        waitingSeats = WorkStealingSeats(numberOfWaitingSeats, numberOfBarbers)
+        entrance = workStealingShopIn(worldToShopIn.reader(), waitingSeats, shopInToAccounts.writer(), log)
+        fromShopIn = [waitingSeats.forBarber(i).get for i in range(numberOfBarbers)]
+    else:
+        toBarber = Channel()
+        entrance = shopIn(numberOfWaitingSeats, numberOfBarbers, worldToShopIn.reader(), toBarber.writer(), shopInToAccounts.writer(), log)
+        fromShopIn = [toBarber.reader() for _ in range(numberOfBarbers)]
     Parallel(
-        shopIn(numberOfWaitingSeats, worldToShopIn.reader(), toBarber.writer(), shopInToAccounts.writer()),
-        shopOut(toShopOut.reader(), shopOutToAccounts.writer()),
-        accounts(shopInToAccounts.reader(), shopOutToAccounts.reader()),
-        world(numberOfCustomers, nextCustomerWaitTime, worldToShopIn.writer()),
-        *[barber(i, hairTrimTime, toBarber.reader(), toShopOut.writer()) for i in range(numberOfBarbers)]
+        entrance,
+        shopOut(numberOfBarbers, toShopOut.reader(), shopOutToAccounts.writer(), log),
+        accounts(shopInToAccounts.reader(), shopOutToAccounts.reader(), log),
+        world(numberOfCustomers, nextCustomerWaitTime, worldToShopIn.writer(), log),
+        *[barber(i, hairTrimTime, fromShopIn[i], toShopOut.writer(), log) for i in range(numberOfBarbers)]
        )
+    if workStealing:
+        waitingSeats.unlink()
 
 if __name__ == '__main__':
     main(1000, 8, 4,  lambda: random.random() * 0.002 + 0.001, lambda: random.random() * 0.008 + 0.001)
@@ -0,0 +1,237 @@
+#! /usr/bin/env python3
+
+#  This is a model of the "The Sleeping Barber" problem using Python (http://www.python.org) and Pykka
+#  (http://www.pykka.org) actors, cf. http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  singleBarber_pykka.py has the shop send every customer straight to its one barber and decides whether a
+#  customer can sit down from a count of seats taken that it keeps itself.  Here the shop has a pool of
+#  barber actors with a router actor in front of them.  The shop records when each customer arrives and
+#  passes them on to the router, which decides whether they can be seated and which barber gets them:
+#
+#    leastBusy -- the barber with the fewest customers, waiting for them or in their chair, so an idle
+#      barber always gets the customer if there is one.
+#    roundRobin -- each barber in turn, however busy, so a customer may wait for a busy barber whilst
+#      another barber is idle, as happens with a pool whose router does not look at the barbers.
+#
+#  The router tracks how many customers each barber has, up by one as it sends them a customer and down by
+#  one as they report the customer trimmed, so it knows the real backlog: a barber's mailbox holds all their
+#  customers but the one being trimmed, and the number of customers waiting is the total over all barbers
+#  of the mailbox sizes.  A customer is turned away when that is numberOfWaitingSeats, rather than when a
+#  count of seats taken kept by the shop says the seats are full.  Barbers report to the router, which
+#  passes the reports on to the shop, so no barber needs to know about the shop.
+#
+#  The actors are either all ThreadingActors, each with its own thread, or all GeventActors, each a
+#  greenlet, selected by actorKind.  With gevent all the waiting, the world between arrivals and the barbers
+#  trimming, is gevent.sleep so the greenlets run whilst one waits.  The messages are the tagged tuples of
+#  messages.py, which needs Pykka 2 or later as Pykka 1 messages have to be dicts, and the day ends with the
+#  protocol there: the shop closes, and once every customer has been trimmed or turned away the router puts
+#  a messages.goHome in every barber's mailbox, behind any customers, and each barber clocks off.
+#
+#  Events are recorded with an event log, see eventLog.py, by default a TextLog.  runSimulation returns the
+#  waiting, service and sojourn times, barber utilisation and shutdown time as a ShopStatistics, see
+#  shopStatistics.py.  Each barber gets their trim times using randomStreams.trimTimes, see
+#  randomStreams.py.  The pool can be benchmarked against the multiprocessing variant at 1 to 64 barbers
+#  with:
+#
+#    python3 benchmark.py --backends multiprocessing pykka pykka-gevent --barbers 1 2 4 8 16 32 64
+
+import itertools
+import random
+import sys
+import time
+
+import eventLog
+import messages
+import randomStreams
+from shopStatistics import ShopStatistics
+
+leastBusy = 'leastBusy'
+roundRobin = 'roundRobin'
+
+#  Sent to the router and to each barber before anything else, giving them the actor they report to.
+_attach = 'attach'
+
+class Barber(object):
+    def __init__(self, identity, hairTrimTime, log, sleep):
+        super().__init__()
+        self.identity = identity
+        self.trimTime = randomStreams.trimTimes(hairTrimTime, identity)
+        self.log = log
+        self.sleep = sleep
+        self.router = None
+
+    def on_receive(self, message):
+        tag = message[0]
+        if tag == messages.arrives:
+            customer = message[1]
+            if customer == messages.goHome:
+                self.log.flush()
+                self.router.tell((messages.clockedOff, self.identity))
+                return
+            startTime = time.time()
+            self.log.event(self.identity, customer, eventLog.startsTrim, timestamp=startTime)
+            self.sleep(self.trimTime(customer))
+            finishTime = time.time()
+            self.log.event(self.identity, customer, eventLog.finishesTrim, timestamp=finishTime)
+            self.router.tell((messages.trimmed, customer, self.identity, startTime, finishTime))
+        elif tag == _attach:
+            self.router = message[1]
+        else:
+            raise ValueError('Barber got a message with unexpected tag.')
+
+class Router(object):
+    def __init__(self, barbers, numberOfWaitingSeats, routing, log):
+        super().__init__()
+        assert routing in (leastBusy, roundRobin), 'Unknown routing ' + str(routing)
+        self.barbers = barbers
+        self.numberOfWaitingSeats = numberOfWaitingSeats
+        self.routing = routing
+        self.log = log
+        self.shop = None
+        self.customerCounts = [0] * len(barbers)
+        self.waiting = 0
+        self.nextBarber = itertools.cycle(range(len(barbers)))
+
+    def _choose(self):
+        if self.routing == leastBusy:
+            return min(range(len(self.barbers)), key=self.customerCounts.__getitem__)
+        return next(self.nextBarber)
+
+    def on_receive(self, message):
+        tag = message[0]
+        if tag == messages.arrives:
+            customer = message[1]
+            barber = self._choose()
+            if self.customerCounts[barber] > 0:
+                if self.waiting >= self.numberOfWaitingSeats:
+                    self.log.event(eventLog.shop, customer, eventLog.turnedAway)
+                    self.shop.tell((messages.turnedAway, customer))
+                    return
+                self.waiting += 1
+            self.customerCounts[barber] += 1
+            self.log.event(eventLog.shop, customer, eventLog.seated, self.waiting)
+            self.barbers[barber].tell(message)
+        elif tag == messages.trimmed:
+            barber = message[2]
+            self.customerCounts[barber] -= 1
+            if self.customerCounts[barber] > 0:
+                self.waiting -= 1
+            self.shop.tell(message)
+        elif tag == messages.closing:
+            for barber in self.barbers:
+                barber.tell((messages.arrives, messages.goHome))
+        elif tag == messages.clockedOff:
+            self.shop.tell(message)
+        elif tag == _attach:
+            self.shop = message[1]
+        else:
+            raise ValueError('Router got a message with unexpected tag.')
+
+class Shop(object):
+    def __init__(self, router, barberCount, log, results):
+        super().__init__()
+        self.router = router
+        self.barberCount = barberCount
+        self.log = log
+        self.results = results
+        self.eventCount = 0
+        self.customersArrived = 0
+        self.customersTrimmed = 0
+        self.customersTurnedAway = 0
+        self.isOpen = True
+        self.arrivalTimes = {}
+        self.statistics = None
+        self.closedTime = None
+        self.barbersAtWork = barberCount
+
+    def on_receive(self, message):
+        self.eventCount += 1
+        if self.statistics is None:
+            self.statistics = ShopStatistics(self.barberCount, time.time())
+        tag = message[0]
+        if tag == messages.arrives:
+            customer = message[1]
+            if not self.isOpen:
+                self.log.event(eventLog.shop, customer, eventLog.refused)
+            else:
+                self.customersArrived += 1
+                self.arrivalTimes[customer] = time.time()
+                self.router.tell(message)
+        elif tag == messages.turnedAway:
+            self.customersTurnedAway += 1
+            del self.arrivalTimes[message[1]]
+        elif tag == messages.trimmed:
+            _, customer, barber, trimStartTime, trimFinishTime = message
+            self.customersTrimmed += 1
+            self.statistics.trimmed(barber, self.arrivalTimes.pop(customer), trimStartTime, trimFinishTime)
+            self.log.event(eventLog.shop, customer, eventLog.leavesTrimmed)
+        elif tag == messages.closing:
+            self.isOpen = False
+        elif tag == messages.clockedOff:
+            self.barbersAtWork -= 1
+            if self.barbersAtWork == 0:
+                statistics = self.statistics
+                statistics.customersArrived = self.customersArrived
+                statistics.customersTurnedAway = self.customersTurnedAway
+                statistics.close(self.closedTime)
+                statistics.shutdownTime = time.time() - self.closedTime
+                elapsed = statistics.duration
+                self.log.summary('Shop: Handled ' + str(self.eventCount) + ' events in ' + str(elapsed) + 's, ' + str(self.eventCount / elapsed) + ' events/s.')
+                self.log.summary('Shop: All barbers clocked off ' + str(statistics.shutdownTime) + 's after the last customer left.')
+                self.log.summary('\nTrimmed ' + str(self.customersTrimmed) + ' and turned away ' + str(self.customersTurnedAway) + ' today.')
+                self.results.set(statistics)
+            return
+        else:
+            raise ValueError('Shop got a message with unexpected tag.')
+        if self.closedTime is None and not self.isOpen and self.customersTurnedAway + self.customersTrimmed == self.customersArrived:
+            self.closedTime = time.time()
+            self.router.tell(messages.closingMessage)
+
+_actorClasses = {}
+
+def actorClasses(actorKind):
+    '''The Barber, Router and Shop actor classes, the future class and the sleep function for an actor kind, threading or gevent.'''
+    if actorKind not in _actorClasses:
+        if actorKind == 'gevent':
+            import gevent
+            from pykka.gevent import GeventActor as Actor, GeventFuture as Future
+            sleep = gevent.sleep
+        elif actorKind == 'threading':
+            from pykka import ThreadingActor as Actor, ThreadingFuture as Future
+            sleep = time.sleep
+        else:
+            raise ValueError('Unknown actor kind ' + str(actorKind))
+        _actorClasses[actorKind] = (type('Barber', (Barber, Actor), {}), type('Router', (Router, Actor), {}), type('Shop', (Shop, Actor), {}), Future, sleep)
+    return _actorClasses[actorKind]
+
+def runSimulation(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, log=None, routing=leastBusy, actorKind='threading'):
+    assert numberOfWaitingSeats > 0, 'Cannot have 0 or less waiting seats'
+    assert numberOfBarbers > 0, 'Must have some barbers'
+    BarberActor, RouterActor, ShopActor, Future, sleep = actorClasses(actorKind)
+    log = eventLog.TextLog() if log is None else log
+    results = Future()
+    barbers = [BarberActor.start(i, hairTrimTime, log, sleep) for i in range(numberOfBarbers)]
+    router = RouterActor.start(barbers, numberOfWaitingSeats, routing, log)
+    shop = ShopActor.start(router, numberOfBarbers, log, results)
+    router.tell((_attach, shop))
+    for barber in barbers:
+        barber.tell((_attach, router))
+    for i in range(numberOfCustomers):
+        sleep(nextCustomerWaitTime())
+        log.event(eventLog.world, i, eventLog.enters)
+        shop.tell((messages.arrives, i))
+    shop.tell(messages.closingMessage)
+    statistics = results.get()
+    log.flush()
+    for actor in [shop, router] + barbers:
+        actor.stop()
+    return statistics
+
+if __name__ == '__main__':
+    #  Optional command line arguments are the routing, leastBusy or roundRobin, and the actor kind,
+    #  threading or gevent.
+    routing = sys.argv[1] if len(sys.argv) > 1 else leastBusy
+    actorKind = sys.argv[2] if len(sys.argv) > 2 else 'threading'
+    runSimulation(1000, 8, 4, lambda: random.random() * 0.002 + 0.001, lambda: random.random() * 0.008 + 0.001, routing=routing, actorKind=actorKind)
@@ -16,87 +16,110 @@
 #
 #  is that returnValue is the channel ready to be read.  Python-CSP however merges the select and read and
 #  so does the read and returnValue is the datum from the alt.select() (Mount, personal communication).
-#  This means we cannot select on the channel and hence cannot just ship round Customer objects, we have to
-#  box the Customer object in a case class instance so that we can select on the type of the datum.  In this
+#  This means we cannot select on the channel and hence cannot just ship round customers, we have to tag
+#  each message with what it is so that we can select on the tag of the datum, see messages.py.  In this
 #  sense Python-CSP is actually closer to Actor Model semantics that to CSP despite being an implementation
 #  of CSP.
 
+#  Python-CSP cannot select on writing to a channel, so the shop only hands a customer to a barber who has
+#  said they have nothing to do, by sending ready or a trimmed customer, and the hand-off write never blocks.
+#  The day ends with the protocol in messages.py: once closed the shop sends goHome to each barber as they
+#  become idle with no-one left in the seats, each barber clocks off by sending clockedOff, and the shop
+#  reports the time from the last customer leaving to the last barber clocking off.  Events are recorded
+#  with an event log, see eventLog.py, by default a TextLog writing the lines that used to be printed, each
+#  process flushing its log when it finishes.
+
+import collections
 import time
 import random
 
 from csp.os_process import *
 
-class Customer(object):
-    def __init__(self, id):
-        self.id = id
-
-class SuccessfulCustomer(object):
-    def __init__(self, customer):
-        self.customer = customer
+import eventLog
+import messages
 
 @process
-def barber(identity, hairTrimTime, shopChannel):
-    def _message(message):
-        print ('Barber ' + str(identity) + ': ' + str(message))
+def barber(identity, hairTrimTime, fromShop, toShop, log):
+    toShop.write(messages.readyMessage)
     while True:
-        customer = shopChannel.read()
-        assert isinstance(customer, Customer)
-        _message('Starting Customer ' + str(customer.id))
+        customer = fromShop.read()
+        if customer == messages.goHome:
+            log.summary('Barber ' + str(identity) + ': Clocking off.')
+            toShop.write(messages.clockedOffMessage)
+            return
+        log.event(identity, customer, eventLog.startsTrim)
         time.sleep(hairTrimTime())
-        _message('Finished Customer ' + str(customer.id))
-        shopChannel.write(SuccessfulCustomer(customer))
+        log.event(identity, customer, eventLog.finishesTrim)
+        toShop.write((messages.trimmed, customer))
 
 @process
-def shop(numberOfWaitingSeats, worldChannel, barberChannel):
-    seatsTaken = 0
-    customerProcessed = 0
+def shop(numberOfWaitingSeats, numberOfBarbers, fromWorld, toBarber, fromBarber, log):
+    seats = collections.deque()
+    customersTrimmed = 0
     customersTurnedAway = 0
+    idleBarbers = 0
+    barbersAtWork = numberOfBarbers
     isOpen = True
-    while True:
+    lastLeftTime = time.time()
+    while barbersAtWork > 0:
         #  One might have anticipated that alt.select() would return the channel that is ready to read,
-        #  Python-CSP however has the return value being the datum already read.  So we need to use case
-        #  classes to handle decision making.  Still this is how things are done with the Actore Model so no
+        #  Python-CSP however has the return value being the datum already read.  So we need to use tagged
+        #  messages to handle decision making.  Still this is how things are done with the Actore Model so no
         #  real problem.
-        alt = Alt(worldChannel, barberChannel)
+        alt = Alt(fromWorld, fromBarber)
         event = alt.select()
-        if isinstance(event, Customer):
-            if seatsTaken < numberOfWaitingSeats:
-                seatsTaken += 1
-                print('Shop: Customer ' + str(event.id) + ' takes a seat. ' + str(seatTaken) + ' in use.')
-                barberChannel.write(event)
+        tag = event[0]
+        if tag == messages.arrives:
+            customer = event[1]
+            if len(seats) < numberOfWaitingSeats:
+                seats.append(customer)
+                log.event(eventLog.shop, customer, eventLog.seated, len(seats))
             else:
                 customersTurnedAway += 1
-                print('Shop: Customer ' + str(event.id) + ' turned away.')
-        elif isinstance(event, SuccessfulCustomer):
-            customer = event.customer
-            assert isinstance(customer, Customer)
-            self.seatsTaken -= 1
-            self.customersTrimmed += 1
-            print('Shop: Customer ' + str(customer.id) + ' leaving trimmed.')
-            if(not self.isOpen) and(self.seatsTaken == 0):
-                print('\nTrimmed ' + str(self.customersTrimmed) + ' and turned away ' + str(self.customersTurnedAway) + ' today.')
-                self.barber.terminate()
-                return
-        elif isinstance(event, str):
-            self.isOpen = False
+                log.event(eventLog.shop, customer, eventLog.turnedAway)
+        elif tag == messages.trimmed:
+            customersTrimmed += 1
+            idleBarbers += 1
+            lastLeftTime = time.time()
+            log.event(eventLog.shop, event[1], eventLog.leavesTrimmed)
+        elif tag == messages.ready:
+            idleBarbers += 1
+        elif tag == messages.clockedOff:
+            barbersAtWork -= 1
+        elif tag == messages.closing:
+            isOpen = False
         else:
-            raise ValueError('Object of unexpected type received.')
+            raise ValueError('Message with unexpected tag received.')
+        #  Every idle barber is waiting to read so these writes do not block.
+        while seats and idleBarbers > 0:
+            toBarber.write(seats.popleft())
+            idleBarbers -= 1
+        while not isOpen and idleBarbers > 0:
+            toBarber.write(messages.goHome)
+            idleBarbers -= 1
+    log.summary('Shop: All barbers clocked off ' + str(time.time() - lastLeftTime) + 's after the last customer left.')
+    log.summary('\nTrimmed ' + str(customersTrimmed) + ' and turned away ' + str(customersTurnedAway) + ' today.')
 
 @process
-def world(nextCustomerWaitTime, channel):
+def world(numberOfCustomers, nextCustomerWaitTime, channel, log):
     #  In Python 2 would use xrange here but use range for Python 3 compatibility.
-    for i in range(20):
+    for i in range(numberOfCustomers):
         time.sleep(nextCustomerWaitTime())
-        channel.write(Customer(i))
-    channel.write('')
+        log.event(eventLog.world, i, eventLog.enters)
+        channel.write((messages.arrives, i))
+    channel.write(messages.closingMessage)
+    log.flush()
 
-def main(numberOfWaitingSeats, numberOfBarbers, numberOfCustomers, nextCustomerWaitTime, hairTrimTime):
-    barberChannel = Channel()
+def main(numberOfWaitingSeats, numberOfBarbers, numberOfCustomers, nextCustomerWaitTime, hairTrimTime, log=None):
+    if log is None:
+        log = eventLog.TextLog()
     worldChannel = Channel()
+    toBarberChannel = Channel()
+    fromBarberChannel = Channel()
     Par(
-        shop(numberOfWaitingSeats, worldChannel, barberChannel),
-        world(nextCustomerWaitTime, worldChannel),
-        * [barber(i, hairTrimTime, barberChannel) for i in range(numberOfBarbers)]
+        shop(numberOfWaitingSeats, numberOfBarbers, worldChannel, toBarberChannel, fromBarberChannel, log),
+        world(numberOfCustomers, nextCustomerWaitTime, worldChannel, log),
+        * [barber(i, hairTrimTime, toBarberChannel, fromBarberChannel, log) for i in range(numberOfBarbers)]
        ).start()
 
 if __name__ == '__main__':
@@ -0,0 +1,185 @@
+#! /usr/bin/env python3
+
+#  This is a model of the "The Sleeping Barber" problem using Python (http://www.python.org) and the
+#  threading package, cf. http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  This is the same architecture as the multiprocessing variant but with threads rather than processes.  The
+#  barber's shop is a thread with a queue, it receives events from the outside world (new customers
+#  arriving) and from the barbers (customers with fully trimmed barnets).  The waiting chairs are a
+#  queue.Queue(maxsize=waitingSeatCount) to which all the barbers have shared access: put_nowait raising
+#  queue.Full is the shop being full and a customer being turned away.  Barbers are threads getting clients
+#  from the queue – a blocking get models being asleep in the cutting chair.  The messages are the tagged
+#  tuples of messages.py and the day ends with the protocol there, the shop putting a messages.goHome in
+#  the waiting seats for each barber once every seated customer has been trimmed.
+#
+#  Trims are time.sleep calls, which release the GIL, so threads trim in parallel just as processes do but
+#  a barber costs a thread rather than a process: nothing is pickled, nothing is sent down a pipe and there
+#  is no process start up.  Passing spinTrims=True has each barber busy wait for the trim time instead of
+#  sleeping, making trims CPU bound.  With the GIL only one barber can then be trimming at a time, on a
+#  free-threaded build of CPython, see freeThreaded, barbers trim truly in parallel.
+#
+#  Events are recorded with an event log, see eventLog.py, by default a TextLog writing the lines the other
+#  variants print, which is shared by all the threads.  Live metrics are kept as in the multiprocessing
+#  variant when runSimulation is passed a Metrics, see liveMetrics.py.  runSimulation returns the waiting, service and
+#  sojourn times and barber utilisation as a ShopStatistics, see shopStatistics.py, along with the shutdown
+#  time.  Each barber gets their trim times using randomStreams.trimTimes, see randomStreams.py.
+
+import queue
+import random
+import sys
+import threading
+import time
+
+import eventLog
+import liveMetrics
+import messages
+import randomStreams
+from shopStatistics import ShopStatistics
+
+def freeThreaded():
+    '''Whether this is a free-threaded build of CPython running without the GIL.'''
+    return hasattr(sys, '_is_gil_enabled') and not sys._is_gil_enabled()
+
+def spin(duration):
+    '''Busy wait for duration seconds, a CPU bound trim.'''
+    endTime = time.perf_counter() + duration
+    while time.perf_counter() < endTime:
+        pass
+
+class Barber(threading.Thread):
+    def __init__(self, shop, identity, hairTrimTime, spinTrims=False):
+        super().__init__()
+        self.shop = shop
+        self.identity = identity
+        self.hairTrimTime = hairTrimTime
+        self.trim = spin if spinTrims else time.sleep
+        self.start()
+
+    def run(self):
+        log = self.shop.log
+        trim = self.trim
+        trimTime = randomStreams.trimTimes(self.hairTrimTime, self.identity)
+        counters = None if self.shop.metrics is None else self.shop.metrics.counters
+        if counters is not None:
+            base = self.shop.metrics.offset('barber ' + str(self.identity))
+        while True:
+            if counters is not None:
+                waitStartTime = time.time()
+            customer = self.shop.waitingSeats.get()
+            if counters is not None:
+                counters[base + liveMetrics.eventsIn] += 1
+                counters[base + liveMetrics.idleSeconds] += time.time() - waitStartTime
+            if customer == messages.goHome:
+                self.shop.queue.put((messages.clockedOff, self.identity))
+                return
+            startTime = time.time()
+            log.event(self.identity, customer, eventLog.startsTrim, timestamp=startTime)
+            trim(trimTime(customer))
+            finishTime = time.time()
+            log.event(self.identity, customer, eventLog.finishesTrim, timestamp=finishTime)
+            self.shop.queue.put((messages.trimmed, customer, self.identity, startTime, finishTime))
+            if counters is not None:
+                counters[base + liveMetrics.eventsOut] += 1
+                counters[base + liveMetrics.busySeconds] += finishTime - startTime
+
+class BarbersShop(threading.Thread):
+    def __init__(self, waitingSeatCount, barberCount, hairTrimTime, log=None, spinTrims=False, metrics=None):
+        assert waitingSeatCount > 0, 'Cannot have 0 or less waiting seats'
+        assert barberCount > 0, 'Must have some barbers'
+        super().__init__()
+        self.queue = queue.Queue()
+        self.waitingSeats = queue.Queue(waitingSeatCount)
+        self.log = eventLog.TextLog() if log is None else log
+        self.metrics = metrics
+        self.customersArrived = 0
+        self.customersTrimmed = 0
+        self.customersTurnedAway = 0
+        self.isOpen = True
+        self.arrivalTimes = {}
+        self.statistics = ShopStatistics(barberCount, time.time())
+        self.barbers = [Barber(self, i, hairTrimTime, spinTrims) for i in range(barberCount)]
+        self.start()
+
+    def run(self):
+        log = self.log
+        statistics = self.statistics
+        closedTime = None
+        barbersAtWork = len(self.barbers)
+        counters = None if self.metrics is None else self.metrics.counters
+        if counters is not None:
+            base = self.metrics.offset('shop')
+        while True:
+            event = self.queue.get()
+            if counters is not None:
+                counters[base + liveMetrics.eventsIn] += 1
+            tag = event[0]
+            if tag == messages.arrives:
+                customer = event[1]
+                if not self.isOpen:
+                    log.event(eventLog.shop, customer, eventLog.refused)
+                else:
+                    self.customersArrived += 1
+                    arrivalTime = time.time()
+                    try:
+                        self.waitingSeats.put_nowait(customer)
+                        self.arrivalTimes[customer] = arrivalTime
+                        log.event(eventLog.shop, customer, eventLog.seated, self.waitingSeats.qsize())
+                        if counters is not None:
+                            counters[base + liveMetrics.eventsOut] += 1
+                    except queue.Full:
+                        self.customersTurnedAway += 1
+                        log.event(eventLog.shop, customer, eventLog.turnedAway)
+                        if counters is not None:
+                            counters[base + liveMetrics.customersTurnedAway] += 1
+            elif tag == messages.trimmed:
+                _, customer, barber, trimStartTime, trimFinishTime = event
+                self.customersTrimmed += 1
+                statistics.trimmed(barber, self.arrivalTimes.pop(customer), trimStartTime, trimFinishTime)
+                log.event(eventLog.shop, customer, eventLog.leavesTrimmed)
+                if counters is not None:
+                    counters[base + liveMetrics.customersTrimmed] += 1
+            elif tag == messages.closing:
+                self.isOpen = False
+            elif tag == messages.clockedOff:
+                barbersAtWork -= 1
+                if barbersAtWork == 0:
+                    statistics.customersArrived = self.customersArrived
+                    statistics.customersTurnedAway = self.customersTurnedAway
+                    statistics.close(closedTime)
+                    statistics.shutdownTime = time.time() - closedTime
+                    log.summary('Shop: All barbers clocked off ' + str(statistics.shutdownTime) + 's after the last customer left.')
+                    log.summary('\nTrimmed ' + str(self.customersTrimmed) + ' and turned away ' + str(self.customersTurnedAway) + ' today.')
+                    return
+            else:
+                raise ValueError('Message with unexpected tag received.')
+            if closedTime is None and not self.isOpen and self.customersTurnedAway + self.customersTrimmed == self.customersArrived:
+                closedTime = time.time()
+                for _ in self.barbers:
+                    self.waitingSeats.put(messages.goHome)
+
+def runSimulation(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, log=None, spinTrims=False, metrics=None):
+    shop = BarbersShop(numberOfWaitingSeats, numberOfBarbers, hairTrimTime, log, spinTrims, metrics)
+    counters = None
+    if metrics is not None:
+        metrics.gauge('barbershop_mailbox_depth', 'Messages waiting to be taken.', 'shop', shop.queue.qsize)
+        metrics.gauge('barbershop_seats_occupied', 'Customers seated waiting for a barber.', 'shop', shop.waitingSeats.qsize)
+        counters = metrics.counters
+        base = metrics.offset('world')
+    for i in range(numberOfCustomers):
+        time.sleep(nextCustomerWaitTime())
+        shop.log.event(eventLog.world, i, eventLog.enters)
+        shop.queue.put((messages.arrives, i))
+        if counters is not None:
+            counters[base + liveMetrics.eventsOut] += 1
+    shop.queue.put(messages.closingMessage)
+    shop.join()
+    for barber in shop.barbers:
+        barber.join()
+    shop.log.flush()
+    return shop.statistics
+
+if __name__ == '__main__':
+    print(runSimulation(1000, 8, 4, lambda: random.random() * 0.002 + 0.001, lambda: random.random() * 0.008 + 0.001))
+    print('Free-threaded: ' + str(freeThreaded()))
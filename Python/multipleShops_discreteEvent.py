@@ -0,0 +1,214 @@
+#! /usr/bin/env python3
+
+#  This is a model of a city of barber's shops, each shop being a "The Sleeping Barber" problem, using
+#  Python (http://www.python.org) as a discrete event simulation sharded across processes, cf.
+#  http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  The shops of the city are split into shards, each shard being simulated by a worker process of a
+#  ProcessPoolExecutor.  Within a shard the shops share one event calendar and virtual clock, as in
+#  multipleBarbers_discreteEvent.py, and a router sends each arriving customer to one of the shard's shops
+#  according to a policy:
+#
+#    random -- a shop chosen uniformly at random.
+#    shortestQueue -- the shop with the fewest customers in it, being trimmed or waiting.
+#    joinIdleQueue -- a shop with an idle barber if there is one, otherwise a shop chosen at random.
+#
+#  With redirect=True a customer turned away by a full shop tries the neighbouring shop, the next one in
+#  the shard, and is only turned away if that is full too.  A redirected customer counts as arriving at the
+#  shop that trims or turns them away, so the statistics of each shop add up, and the number of customers
+#  each shop redirects is recorded separately.
+#
+#  Shards never communicate, so the city runs as fast as the slowest shard and throughput scales with the
+#  number of cores, the price being that the router only sees the shops of its own shard: a shard is a
+#  district whose customers never cross to another district.  nextCustomerWaitTime is the time between
+#  customers arriving at each shop, as for a single shop, so a shard of n shops has customers arriving n
+#  times as often, the waits being drawn from nextCustomerWaitTime and divided by n.  This is not quite the
+#  same as n independent streams of customers, so the number of shops in a shard makes some difference to
+#  the customers each shop sees, less the more shops there are in each shard.  Each shard draws its
+#  arrivals, and each shop its trim times, from their own streams given seeded time sources, see
+#  randomStreams.substream, and customer ids are unique across the city so replayed trim times, see
+#  traces.py, belong to the customers wherever they go.  As with parameterSweep.py the time sources are
+#  pickled to get to the workers so they must be instances of classes defined at module level rather than
+#  lambdas.
+#
+#  The statistics of every shop are collected in a ShopStatistics, see shopStatistics.py, and the shops are
+#  merged into a CityStatistics for the whole city once all the shards have finished.  No events are logged
+#  but the end of day summary goes to the event log given, see eventLog.py, by default a SummaryLog.
+
+import collections
+import concurrent.futures
+import heapq
+import os
+import random
+import time
+
+import eventLog
+import randomStreams
+from shopStatistics import ShopStatistics
+
+policies = ('random', 'shortestQueue', 'joinIdleQueue')
+
+_arrival = 0
+_trimFinished = 1
+
+class CityStatistics(ShopStatistics):
+    '''The merged statistics of all the shops, with the statistics of each shop and the redirections.'''
+    _stateNames = ShopStatistics._stateNames + ('shops', 'customersRedirected')
+
+    def __init__(self, barberCount):
+        super().__init__(barberCount)
+        self.shops = []
+        self.customersRedirected = 0
+
+    def add(self, shopStatistics, customersRedirected):
+        self.shops.append(shopStatistics)
+        self.merge(shopStatistics)
+        self.customersRedirected += customersRedirected
+
+    def __str__(self):
+        return (str(len(self.shops)) + ' shops, ' + str(self.customersRedirected) + ' customers redirected to a neighbouring shop.\n' +
+                super().__str__())
+
+class District(object):
+    '''The shops of one shard, sharing an event calendar and a router.'''
+    def __init__(self, shopCount, waitingSeatCount, barberCount, hairTrimTime, policy='random', redirect=False, firstShop=0, seed=0):
+        assert shopCount > 0, 'Must have some shops'
+        assert waitingSeatCount > 0, 'Cannot have 0 or less waiting seats'
+        assert barberCount > 0, 'Must have some barbers'
+        if policy not in policies:
+            raise ValueError('Unknown routing policy ' + str(policy) + ', must be one of ' + ', '.join(policies) + '.')
+        self.shopCount = shopCount
+        self.waitingSeatCount = waitingSeatCount
+        self.barberCount = barberCount
+        self.policy = policy
+        self.redirect = redirect and shopCount > 1
+        self.router = random.Random(randomStreams.streamSeed(seed, 'router/shop ' + str(firstShop)))
+        self.trimTimes = [[randomStreams.trimTimes(randomStreams.substream(hairTrimTime, 'shop ' + str(firstShop + shop)), barber)
+                           for barber in range(barberCount)] for shop in range(shopCount)]
+        self.waitingSeats = [collections.deque() for _ in range(shopCount)]
+        self.idleBarbers = [list(range(barberCount)) for _ in range(shopCount)]
+        self.statistics = [ShopStatistics(barberCount) for _ in range(shopCount)]
+        self.customersRedirected = [0] * shopCount
+
+    def _route(self, inShop, idleShops):
+        '''The shop an arriving customer goes to.'''
+        if self.policy == 'shortestQueue':
+            return min(range(self.shopCount), key=inShop.__getitem__)
+        if self.policy == 'joinIdleQueue' and idleShops:
+            return idleShops[self.router.randrange(len(idleShops))]
+        return self.router.randrange(self.shopCount)
+
+    def run(self, numberOfCustomers, nextCustomerWaitTime, firstCustomer=0):
+        '''Run a day with numberOfCustomers customers, with ids from firstCustomer, returning the statistics of each shop.'''
+        #  This is the hot loop so everything used per event is held in a local variable.  inShop is the number
+        #  of customers in each shop and idleShops the shops with an idle barber, kept up to date for the
+        #  router, idlePositions being the index of each shop in idleShops so removing one takes constant time.
+        calendar = []
+        waitingSeats = self.waitingSeats
+        idleBarbers = self.idleBarbers
+        waitingSeatCount = self.waitingSeatCount
+        trimTimes = self.trimTimes
+        statistics = self.statistics
+        customersRedirected = self.customersRedirected
+        redirect = self.redirect
+        shopCount = self.shopCount
+        route = self._route
+        inShop = [0] * shopCount
+        idleShops = list(range(shopCount))
+        idlePositions = list(range(shopCount))
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        nextCustomerWaitTime = randomStreams.sampler(nextCustomerWaitTime)
+        sequence = 0
+        clock = 0.0
+        if numberOfCustomers > 0:
+            heappush(calendar, (nextCustomerWaitTime() / shopCount, sequence, _arrival, 0))
+        while calendar:
+            clock, _, kind, data = heappop(calendar)
+            if kind == _arrival:
+                if data + 1 < numberOfCustomers:
+                    sequence += 1
+                    heappush(calendar, (clock + nextCustomerWaitTime() / shopCount, sequence, _arrival, data + 1))
+                customer = firstCustomer + data
+                shop = route(inShop, idleShops)
+                if redirect and not idleBarbers[shop] and len(waitingSeats[shop]) >= waitingSeatCount:
+                    customersRedirected[shop] += 1
+                    shop = (shop + 1) % shopCount
+                shopStatistics = statistics[shop]
+                shopStatistics.customersArrived += 1
+                if idleBarbers[shop]:
+                    inShop[shop] += 1
+                    barber = idleBarbers[shop].pop()
+                    if not idleBarbers[shop]:
+                        moved = idleShops[-1]
+                        idleShops[idlePositions[shop]] = moved
+                        idlePositions[moved] = idlePositions[shop]
+                        idleShops.pop()
+                    sequence += 1
+                    heappush(calendar, (clock + trimTimes[shop][barber](customer), sequence, _trimFinished, (shop, barber, customer, clock, clock)))
+                elif len(waitingSeats[shop]) < waitingSeatCount:
+                    inShop[shop] += 1
+                    waitingSeats[shop].append((customer, clock))
+                else:
+                    shopStatistics.customersTurnedAway += 1
+            elif kind == _trimFinished:
+                shop, barber, customer, arrivalTime, startTime = data
+                statistics[shop].trimmed(barber, arrivalTime, startTime, clock)
+                inShop[shop] -= 1
+                if waitingSeats[shop]:
+                    customer, arrivalTime = waitingSeats[shop].popleft()
+                    sequence += 1
+                    heappush(calendar, (clock + trimTimes[shop][barber](customer), sequence, _trimFinished, (shop, barber, customer, arrivalTime, clock)))
+                else:
+                    if not idleBarbers[shop]:
+                        idlePositions[shop] = len(idleShops)
+                        idleShops.append(shop)
+                    idleBarbers[shop].append(barber)
+            else:
+                raise ValueError('Event of unexpected kind in the calendar.')
+        for shopStatistics in statistics:
+            shopStatistics.close(clock)
+        return statistics
+
+def _runShard(shard, firstShop, shopCount, firstCustomer, numberOfCustomers, numberOfWaitingSeats, numberOfBarbers,
+              nextCustomerWaitTime, hairTrimTime, policy, redirect, seed):
+    district = District(shopCount, numberOfWaitingSeats, numberOfBarbers, hairTrimTime, policy, redirect, firstShop, seed)
+    statistics = district.run(numberOfCustomers, randomStreams.substream(nextCustomerWaitTime, 'shard ' + str(shard)), firstCustomer)
+    return statistics, district.customersRedirected
+
+def _split(total, sizes):
+    '''total split in proportion to sizes, the parts adding up to total.'''
+    boundaries = [total * sum(sizes[:i]) // sum(sizes) for i in range(len(sizes) + 1)]
+    return [boundaries[i + 1] - boundaries[i] for i in range(len(sizes))], boundaries[:-1]
+
+def runSimulation(numberOfCustomers, numberOfShops, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime,
+                  policy='random', redirect=False, shards=None, seed=0, log=None):
+    '''Run a day in a city of numberOfShops shops on shards worker processes, by default one per core.
+
+    numberOfWaitingSeats and numberOfBarbers are per shop.  Returns the CityStatistics of the day.'''
+    assert numberOfShops > 0, 'Must have some shops'
+    shards = min(numberOfShops, shards or os.cpu_count() or 1)
+    shopCounts, firstShops = _split(numberOfShops, [1] * shards)
+    customerCounts, firstCustomers = _split(numberOfCustomers, shopCounts)
+    city = CityStatistics(0)
+    with concurrent.futures.ProcessPoolExecutor(shards) as executor:
+        futures = [executor.submit(_runShard, shard, firstShops[shard], shopCounts[shard], firstCustomers[shard], customerCounts[shard],
+                                   numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, policy, redirect, seed)
+                   for shard in range(shards)]
+        for future in futures:
+            statistics, customersRedirected = future.result()
+            for shopStatistics, redirected in zip(statistics, customersRedirected):
+                city.add(shopStatistics, redirected)
+    (eventLog.SummaryLog() if log is None else log).summary('\nTrimmed ' + str(city.customersTrimmed) + ' and turned away ' + str(city.customersTurnedAway) +
+                                                            ' today in ' + str(numberOfShops) + ' shops.')
+    return city
+
+if __name__ == '__main__':
+    for policy in policies:
+        startTime = time.time()
+        statistics = runSimulation(1000000, 64, 4, 2, randomStreams.SeededUniform(0.001, 0.003, 1, 'arrivals'),
+                                   randomStreams.SeededUniform(0.001, 0.007, 1, 'trims'), policy, redirect=True)
+        print(policy + ': ' + str(time.time() - startTime) + 's, ' + str(statistics.customersRedirected) + ' redirected, mean wait ' +
+              str(statistics.waitingTime.mean) + ', 99% wait ' + str(statistics.waitingTime.quantile(0.99)) + '.')
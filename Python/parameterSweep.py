@@ -0,0 +1,147 @@
+#! /usr/bin/env python3
+
+#  Running a barber's shop simulation over a range of shop configurations, cf.
+#  http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  A sweep is a list of points, each point being a number of waiting seats, a number of barbers, a customer
+#  arrival time distribution and a hair trim time distribution, and a number of replicates of the
+#  simulation to run at each point.  The points can be a full grid, a uniform random sample or a Latin
+#  hypercube sample.  Each replicate is a call of the runSimulation function of a backend module, by default
+#  the discrete event simulation as it runs a day in a fraction of a second rather than in real time.  The
+#  replicates are run on a ProcessPoolExecutor so the worker processes, with the backend already imported,
+#  are reused from run to run rather than a process being started per run.
+#
+#  Results are appended to a CSV file, one row per replicate, as each replicate finishes, and the file is
+#  flushed after each row so that an interrupted sweep loses at most the runs in progress.  Running the same
+#  sweep again with the same output file skips all the replicates already in the file, so a sweep is resumed
+#  simply by restarting it.  Replicate r of every point draws its times from the 'replicate r' streams of
+#  the time sources, see randomStreams.substream, as replication.py does, and seeds the random number
+#  generator of its worker from the sweep seed, the point index and the replicate number for time sources
+#  without streams, so a replicate gives the same result whenever, and in whichever worker, it is run.
+#
+#  prunePoints uses the queueing theory results, see queueingTheory.py, to drop points whose predicted
+#  fraction of customers turned away is outside a range of interest before any simulation time is spent on
+#  them.
+#
+#  The distributions have to be pickled to get to the workers so they must be instances of classes defined at
+#  module level rather than lambdas, such as those of distributions.py and randomStreams.py.
+
+import concurrent.futures
+import contextlib
+import csv
+import importlib
+import io
+import itertools
+import os
+import random
+import time
+
+import distributions
+import queueingTheory
+import randomStreams
+
+_uniformFamilies = (distributions.Uniform, randomStreams.SeededUniform)
+
+def _aroundMean(family, mean, seed, streamName):
+    '''A family distribution with the given mean, uniform ones spanning half to one and a half times the mean as
+    the scripts do, e.g. random.random() * 0.002 + 0.001 has mean 0.002.'''
+    if family in _uniformFamilies:
+        return family(mean / 2, mean * 3 / 2, seed, streamName)
+    return family(mean, seed, streamName)
+
+columns = ('pointIndex', 'replicate', 'seed', 'numberOfWaitingSeats', 'numberOfBarbers', 'nextCustomerWaitTime',
+           'hairTrimTime', 'numberOfCustomers', 'customersTrimmed', 'customersTurnedAway', 'turnedAwayFraction', 'seconds')
+
+def gridPoints(waitingSeats, barbers, nextCustomerWaitTimes, hairTrimTimes):
+    '''Every combination of the given values.'''
+    return list(itertools.product(waitingSeats, barbers, nextCustomerWaitTimes, hairTrimTimes))
+
+def randomPoints(count, waitingSeatsRange, barbersRange, nextCustomerWaitTimes, hairTrimTimes, seed=0):
+    '''count points chosen uniformly at random, the ranges are inclusive (low, high) pairs.'''
+    generator = random.Random(seed)
+    return [(generator.randint(*waitingSeatsRange), generator.randint(*barbersRange),
+             generator.choice(nextCustomerWaitTimes), generator.choice(hairTrimTimes)) for _ in range(count)]
+
+def latinHypercubePoints(count, waitingSeatsRange, barbersRange, nextCustomerWaitMeanRange, hairTrimMeanRange, family=distributions.Uniform, seed=0):
+    '''count points forming a Latin hypercube sample, the ranges are inclusive (low, high) pairs.
+
+    Each of the four ranges is split into count equal strata and each stratum is used by exactly one point.
+    family is a class from distributions.py or randomStreams.py taking a mean, or a low and a high for the
+    uniform ones, then a seed and a stream name.  The means are turned into distributions of that family seeded
+    with seed on the arrivals and trims streams, as benchmark.py does.'''
+    generator = random.Random(seed)
+
+    def stratified(low, high):
+        values = [low + (high - low) * (i + generator.random()) / count for i in range(count)]
+        generator.shuffle(values)
+        return values
+
+    def stratifiedIntegers(low, high):
+        return [min(high, int(value)) for value in stratified(low, high + 1)]
+
+    return list(zip(stratifiedIntegers(*waitingSeatsRange), stratifiedIntegers(*barbersRange),
+                    [_aroundMean(family, mean, seed, 'arrivals') for mean in stratified(*nextCustomerWaitMeanRange)],
+                    [_aroundMean(family, mean, seed, 'trims') for mean in stratified(*hairTrimMeanRange)]))
+
+def prunePoints(points, minimumTurnedAwayFraction=0.0, maximumTurnedAwayFraction=1.0):
+    '''The points whose analytically predicted fraction of customers turned away is within the given range.'''
+    return [point for point in points if minimumTurnedAwayFraction <= queueingTheory.turnedAwayFraction(*point) <= maximumTurnedAwayFraction]
+
+def _initialiseWorker(backendName):
+    importlib.import_module(backendName)
+
+def _runReplicate(backendName, pointIndex, replicate, seed, point, numberOfCustomers):
+    numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime = point
+    backend = importlib.import_module(backendName)
+    streamName = 'replicate ' + str(replicate)
+    random.seed(seed)
+    startTime = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        statistics = backend.runSimulation(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, randomStreams.substream(nextCustomerWaitTime, streamName),
+                                           randomStreams.substream(hairTrimTime, streamName))
+    seconds = time.time() - startTime
+    customersTrimmed = statistics.customersTrimmed
+    customersTurnedAway = statistics.customersTurnedAway
+    return (pointIndex, replicate, seed, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime,
+            numberOfCustomers, customersTrimmed, customersTurnedAway, customersTurnedAway / numberOfCustomers, seconds)
+
+def _completedReplicates(outputPath):
+    '''The (pointIndex, replicate) pairs already in the output file, discarding any partly written last row.'''
+    if not os.path.exists(outputPath):
+        return set()
+    with open(outputPath, 'rb+') as f:
+        content = f.read()
+        if content and not content.endswith(b'\n'):
+            f.truncate(content.rfind(b'\n') + 1)
+    with open(outputPath, newline='') as f:
+        return set((int(row['pointIndex']), int(row['replicate'])) for row in csv.DictReader(f))
+
+def runSweep(points, replicates, numberOfCustomers, outputPath, backendName='multipleBarbers_discreteEvent', maxWorkers=None, seed=0):
+    '''Run replicates replicates at each of points, appending a row per replicate to the CSV file outputPath.
+
+    Replicates already in outputPath are not run again.  Returns the number of replicates run.'''
+    completed = _completedReplicates(outputPath)
+    tasks = [(pointIndex, replicate, str(seed) + ':' + str(pointIndex) + ':' + str(replicate), point)
+             for pointIndex, point in enumerate(points) for replicate in range(replicates)
+             if (pointIndex, replicate) not in completed]
+    isNewFile = not os.path.exists(outputPath) or os.path.getsize(outputPath) == 0
+    with open(outputPath, 'a', newline='') as output:
+        writer = csv.writer(output)
+        if isNewFile:
+            writer.writerow(columns)
+            output.flush()
+        with concurrent.futures.ProcessPoolExecutor(maxWorkers, initializer=_initialiseWorker, initargs=(backendName,)) as executor:
+            futures = [executor.submit(_runReplicate, backendName, pointIndex, replicate, replicateSeed, point, numberOfCustomers)
+                       for pointIndex, replicate, replicateSeed, point in tasks]
+            for future in concurrent.futures.as_completed(futures):
+                writer.writerow(future.result())
+                output.flush()
+    return len(tasks)
+
+if __name__ == '__main__':
+    points = gridPoints(range(1, 9), range(1, 5), [distributions.Uniform(0.001, 0.003, 0, 'arrivals')],
+                        [distributions.Uniform(0.001, 0.009, 0, 'trims')])
+    count = runSweep(points, 4, 10000, 'sweep.csv')
+    print('Ran ' + str(count) + ' replicates of ' + str(len(points)) + ' shop configurations.')
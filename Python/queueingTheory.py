@@ -0,0 +1,132 @@
+#! /usr/bin/env python3
+
+#  Queueing theory results for the barber's shop, cf. http://en.wikipedia.org/wiki/Sleeping_barber_problem
+#  and http://en.wikipedia.org/wiki/M/M/c_queue.
+#
+#  Copyright © 2026  Russel Winder
+
+#  When customers arrive as a Poisson process and trims take exponentially distributed times the shop is an
+#  M/M/c/K queue: c barbers and room for K = c + waitingSeats customers in the shop.  The probability p(n)
+#  of there being n customers in the shop is proportional to a^n / n! for n < c and a^n / (c! c^(n - c))
+#  for c <= n <= K, where a is the arrival rate divided by the trim rate.  An arriving customer is turned
+#  away with probability p(K) and everything else follows from Little's law.  This is exact and takes
+#  microseconds, so mmck can be used to discard hopeless configurations before any simulation is done.
+#
+#  The scripts draw arrival and trim times from uniform distributions so the shop is really a G/G/c/K
+#  queue for which there is no exact closed form.  ggck uses a heavy traffic approximation: the number of
+#  customers waiting scales with v = (ca² + cs²) / 2, where ca² and cs² are the squared coefficients of
+#  variation of the inter-arrival and trim times (both 1 for the exponential distribution), so a shop with
+#  s seats behaves roughly like an M/M/c/K shop with s / v seats and v times the queue.  Fractional numbers
+#  of seats are handled by interpolating between the neighbouring whole numbers.  This is an approximation,
+#  it is at its best when the shop is busy, and validate runs the discrete event simulation to say how good
+#  it is for any particular shop.
+
+import collections
+import contextlib
+import io
+import math
+
+import multipleBarbers_discreteEvent
+import randomStreams
+
+Solution = collections.namedtuple('Solution', ('turnedAwayFraction', 'meanWaitingTime', 'meanSojournTime', 'meanSeatOccupancy', 'utilisation'))
+
+def mmck(arrivalRate, serviceRate, servers, capacity):
+    '''The M/M/c/K solution for the given rates, c servers and K places in the system, K >= c.'''
+    assert arrivalRate > 0 and serviceRate > 0, 'Rates must be positive.'
+    assert 0 < servers <= capacity, 'Must have at least one server and room in the system for every server.'
+    logOfferedLoad = math.log(arrivalRate / serviceRate)
+    logTerms = [0.0]
+    for n in range(1, capacity + 1):
+        logTerms.append(logTerms[-1] + logOfferedLoad - math.log(min(n, servers)))
+    largest = max(logTerms)
+    terms = [math.exp(logTerm - largest) for logTerm in logTerms]
+    total = sum(terms)
+    probabilities = [term / total for term in terms]
+    blocking = probabilities[capacity]
+    effectiveArrivalRate = arrivalRate * (1 - blocking)
+    inSystem = sum(n * p for n, p in enumerate(probabilities))
+    waiting = sum((n - servers) * p for n, p in enumerate(probabilities) if n > servers)
+    return Solution(blocking, waiting / effectiveArrivalRate, inSystem / effectiveArrivalRate, waiting, effectiveArrivalRate / (servers * serviceRate))
+
+def ggck(meanInterArrivalTime, interArrivalSCV, meanServiceTime, serviceSCV, servers, waitingSeats):
+    '''An approximate G/G/c/K solution given the means and squared coefficients of variation of the times.'''
+    variability = (interArrivalSCV + serviceSCV) / 2
+    arrivalRate = 1 / meanInterArrivalTime
+    serviceRate = 1 / meanServiceTime
+    if variability <= 0:
+        #  Deterministic times: the shop either keeps up and no-one waits or it does not and all the excess is
+        #  turned away.
+        offered = arrivalRate / (servers * serviceRate)
+        turnedAway = max(0.0, 1 - 1 / offered)
+        utilisation = min(1.0, offered)
+        return Solution(turnedAway, 0.0, meanServiceTime, 0.0, utilisation)
+    scaledSeats = waitingSeats / variability
+    fewer = int(math.floor(scaledSeats))
+    weight = scaledSeats - fewer
+    lower = mmck(arrivalRate, serviceRate, servers, servers + fewer)
+    upper = mmck(arrivalRate, serviceRate, servers, servers + fewer + 1) if weight > 0 else lower
+
+    def interpolate(a, b):
+        return a + (b - a) * weight
+
+    def interpolateLogarithmically(a, b):
+        if a <= 0 or b <= 0:
+            return interpolate(a, b)
+        return math.exp(interpolate(math.log(a), math.log(b)))
+
+    turnedAway = interpolateLogarithmically(lower.turnedAwayFraction, upper.turnedAwayFraction)
+    effectiveArrivalRate = arrivalRate * (1 - turnedAway)
+    meanSeatOccupancy = variability * interpolate(lower.meanSeatOccupancy, upper.meanSeatOccupancy)
+    meanWaitingTime = meanSeatOccupancy / effectiveArrivalRate
+    return Solution(turnedAway, meanWaitingTime, meanWaitingTime + meanServiceTime, meanSeatOccupancy, effectiveArrivalRate / (servers * serviceRate))
+
+def moments(times):
+    '''The mean and squared coefficient of variation of a time source with known distribution.
+
+    Time sources with mean and scv attributes, as have the distributions in distributions.py, say what they
+    are.  Otherwise those with low and high attributes are taken to be uniform and those with just a mean
+    attribute to be exponential, as are the distributions in randomStreams.py.'''
+    if hasattr(times, 'mean') and hasattr(times, 'scv'):
+        return times.mean, times.scv
+    if hasattr(times, 'low') and hasattr(times, 'high'):
+        mean = (times.low + times.high) / 2
+        return mean, ((times.high - times.low) ** 2 / 12) / mean ** 2
+    if hasattr(times, 'mean'):
+        return times.mean, 1.0
+    raise ValueError('Cannot tell the distribution of ' + str(times) + '.')
+
+def solve(numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime):
+    '''The solution for a shop configured as for runSimulation, exact when both time sources are exponential.'''
+    meanInterArrivalTime, interArrivalSCV = moments(nextCustomerWaitTime)
+    meanServiceTime, serviceSCV = moments(hairTrimTime)
+    if interArrivalSCV == 1.0 and serviceSCV == 1.0:
+        return mmck(1 / meanInterArrivalTime, 1 / meanServiceTime, numberOfBarbers, numberOfBarbers + numberOfWaitingSeats)
+    return ggck(meanInterArrivalTime, interArrivalSCV, meanServiceTime, serviceSCV, numberOfBarbers, numberOfWaitingSeats)
+
+def turnedAwayFraction(numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime):
+    return solve(numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime).turnedAwayFraction
+
+def validate(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime):
+    '''Compare the analytic solution with a discrete event simulation, returning (analytic, simulated, discrepancy).
+
+    The discrepancy is simulated minus analytic for each field.'''
+    analytic = solve(numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime)
+    with contextlib.redirect_stdout(io.StringIO()):
+        statistics = multipleBarbers_discreteEvent.runSimulation(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime)
+    simulated = Solution(statistics.customersTurnedAway / statistics.customersArrived,
+                         statistics.waitingTime.mean,
+                         statistics.sojournTime.mean,
+                         statistics.meanSeatOccupancy,
+                         sum(statistics.utilisation(barber) for barber in range(numberOfBarbers)) / numberOfBarbers)
+    return analytic, simulated, Solution(*(s - a for s, a in zip(simulated, analytic)))
+
+if __name__ == '__main__':
+    for name, arrivals, trims in (
+            ('Exponential', randomStreams.SeededExponential(0.002, 1, 'arrivals'), randomStreams.SeededExponential(0.005, 1, 'trims')),
+            ('Uniform', randomStreams.SeededUniform(0.001, 0.003, 1, 'arrivals'), randomStreams.SeededUniform(0.001, 0.009, 1, 'trims'))):
+        for seats, barbers in ((8, 4), (2, 2), (4, 1)):
+            analytic, simulated, discrepancy = validate(200000, seats, barbers, arrivals, trims)
+            print(name + ' times, ' + str(seats) + ' seats, ' + str(barbers) + ' barbers: turned away ' +
+                  str(analytic.turnedAwayFraction) + ' analytic, ' + str(simulated.turnedAwayFraction) + ' simulated; mean wait ' +
+                  str(analytic.meanWaitingTime) + ' analytic, ' + str(simulated.meanWaitingTime) + ' simulated.')
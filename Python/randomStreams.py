@@ -0,0 +1,125 @@
+#  Independent, reproducible streams of random times for the barber's shop simulations.
+#
+#  Copyright © 2026  Russel Winder
+
+#  The variants are given zero argument callables such as lambda: random.random() * 0.002 + 0.001 which
+#  draw from the global random module of whichever process calls them.  No run can be reproduced, and with
+#  the multiprocessing variants every barber process is forked with a copy of the same generator state so
+#  all the barbers trim to the same sequence of times.  The seeded distributions here each own a
+#  random.Random seeded from a seed and a stream name, and the stream for each barber is a different named
+#  stream derived from the same seed, so every actor has its own independent stream and a run is
+#  determined entirely by its seed whatever process the actors are in.
+#
+#  The variants get the trim time function for each barber with trimTimes, which also handles plain zero
+#  argument callables so existing lambdas still work:
+#
+#    forBarber(barber) -- if the time source has this method it is called to get the source for the given
+#      barber, otherwise all the barbers share the source.
+#    forStream(streamName) -- if the time source has this method it is called to get an independent source
+#      for some other part of a simulation, such as each shop of a city, see multipleShops_discreteEvent.py,
+#      otherwise the parts share the source.  substream handles sources with and without it.
+#    forCustomer(customerId) -- if the time source has this method the trim time of a customer is looked up
+#      by customer id rather than drawn, as with a replayed trace, see traces.py.
+#    sampler() -- if the time source has this method it is called once to get a faster zero argument
+#      callable drawing the same times, as with the block sampled distributions of distributions.py.
+#      sampler handles sources with and without it.
+#    sample(count) -- if the time source has this method it returns an array of the next count times, which
+#      bulk uses to give the bulk form, called with a numpy.random.Generator and a count, that
+#      singleBarber_numpy.py uses.
+#    getState(), setState(state) -- if the time source has these methods the position of its stream can be
+#      saved and restored, so a checkpointed simulation resumes drawing exactly the times it would have
+#      drawn, see checkpoint.py.  getState and setState handle sources with and without them, sources
+#      without them, such as lambdas using the random module, having no state of their own.
+
+import abc
+import hashlib
+import random
+
+def streamSeed(seed, streamName):
+    '''An integer seed for the named stream derived from seed, different names giving independent streams.'''
+    return int.from_bytes(hashlib.sha256((str(seed) + '/' + streamName).encode()).digest()[:8], 'little')
+
+class _SeededTimes(abc.ABC):
+    def __init__(self, seed, streamName):
+        self.seed = seed
+        self.streamName = streamName
+        self.generator = random.Random(streamSeed(seed, streamName))
+
+    @abc.abstractmethod
+    def _derived(self, streamName):
+        '''A distribution with the same parameters and seed drawing from the named stream.'''
+
+    def forStream(self, streamName):
+        return self._derived(self.streamName + '/' + streamName)
+
+    def forBarber(self, barber):
+        return self.forStream('barber ' + str(barber))
+
+    def getState(self):
+        return self.generator.getstate()
+
+    def setState(self, state):
+        self.generator.setstate(state)
+
+class SeededUniform(_SeededTimes):
+    def __init__(self, low, high, seed=0, streamName='times'):
+        super().__init__(seed, streamName)
+        self.low = low
+        self.high = high
+
+    def _derived(self, streamName):
+        return SeededUniform(self.low, self.high, self.seed, streamName)
+
+    def __call__(self):
+        return self.low + (self.high - self.low) * self.generator.random()
+
+class SeededExponential(_SeededTimes):
+    def __init__(self, mean, seed=0, streamName='times'):
+        super().__init__(seed, streamName)
+        self.mean = mean
+
+    def _derived(self, streamName):
+        return SeededExponential(self.mean, self.seed, streamName)
+
+    def __call__(self):
+        return self.generator.expovariate(1.0 / self.mean)
+
+def substream(times, streamName):
+    '''The named independent stream of the time source if it has them, otherwise the time source itself.'''
+    return times.forStream(streamName) if hasattr(times, 'forStream') else times
+
+def sampler(times):
+    '''The fastest zero argument callable drawing from the time source.'''
+    return times.sampler() if hasattr(times, 'sampler') else times
+
+def bulk(times):
+    '''The time source as a callable from a numpy.random.Generator and a count to an array of times.
+
+    Sources that are already bulk callables are returned unchanged so lambdas such as
+    lambda generator, n: generator.random(n) still work.'''
+    if hasattr(times, 'sample'):
+        return lambda generator, count: times.sample(count)
+    return times
+
+def getState(times):
+    '''The state of the time source from which setState continues its stream, None if it has no state of its own.'''
+    return times.getState() if hasattr(times, 'getState') else None
+
+def setState(times, state):
+    if state is not None:
+        times.setState(state)
+
+def barberTimes(hairTrimTime, barber):
+    '''The time source for the given barber, the source itself if it does not have one for each barber.'''
+    return hairTrimTime.forBarber(barber) if hasattr(hairTrimTime, 'forBarber') else hairTrimTime
+
+def customerTimes(times):
+    '''A function from customer id to time for the time source.'''
+    if hasattr(times, 'forCustomer'):
+        return times.forCustomer
+    times = sampler(times)
+    return lambda customerId: times()
+
+def trimTimes(hairTrimTime, barber):
+    '''A function from customer id to trim time for the given barber.'''
+    return customerTimes(barberTimes(hairTrimTime, barber))
@@ -0,0 +1,182 @@
+#! /usr/bin/env python3
+
+#  Estimating the behaviour of a barber's shop, with confidence intervals, from replicated simulations, cf.
+#  http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  A single run of a simulation gives one noisy value of each statistic.  replicate runs independent
+#  replicates of a shop, replicate r drawing its times from the 'replicate r' streams of the time sources,
+#  see randomStreams.substream, with the random module of its worker seeded from the seed and r for time
+#  sources without streams.  The replicates are run a round at a time on a ProcessPoolExecutor, by default a
+#  round being a replicate per worker, and after each round there is a Student's t confidence interval for
+#  the mean of every statistic.  Replication stops as soon as the half width of every interval is at most
+#  relativeHalfWidth of its mean, so no more replicates are run than are needed.  The statistics are those
+#  of valuesOf, the backend's runSimulation must return a ShopStatistics, see shopStatistics.py.
+#
+#  Each replicate starts with an empty shop so its statistics are biased towards a quieter shop than one
+#  that has been open a while.  Passing warmUp leaves out the first warmUp customers of each replicate, the
+#  backend, by default the discrete event simulation, having to support it.  Alternatively batchMeans
+#  simulates one long day, leaving out the warm up only once, and splits it into batches of customers, the
+#  batches taking the place of the replicates.  Successive batches are not quite independent, the longer the
+#  batches the less it matters.
+#
+#  As with parameterSweep.py the time sources are pickled to get to the workers so they must be instances
+#  of classes defined at module level rather than lambdas.
+
+import collections
+import concurrent.futures
+import contextlib
+import importlib
+import io
+import math
+import os
+import random
+import statistics
+
+import multipleBarbers_discreteEvent
+import randomStreams
+
+class Estimate(collections.namedtuple('Estimate', ('mean', 'halfWidth', 'count'))):
+    __slots__ = ()
+
+    @property
+    def relativeHalfWidth(self):
+        if self.halfWidth == 0:
+            return 0.0
+        return self.halfWidth / abs(self.mean) if self.mean else math.inf
+
+def _tDistribution(t, degreesOfFreedom):
+    '''The probability that Student's t with an integer number of degrees of freedom is below t, t not negative.'''
+    #  Abramowitz and Stegun 26.7.3 and 26.7.4, the probability of |T| < t as a finite series in cos(θ).
+    theta = math.atan(t / math.sqrt(degreesOfFreedom))
+    cosineSquared = math.cos(theta) ** 2
+    term = total = 1.0
+    if degreesOfFreedom % 2 == 0:
+        for k in range(2, degreesOfFreedom, 2):
+            term *= cosineSquared * (k - 1) / k
+            total += term
+        probability = math.sin(theta) * total
+    else:
+        for k in range(3, degreesOfFreedom, 2):
+            term *= cosineSquared * (k - 1) / k
+            total += term
+        probability = 2 / math.pi * (theta + (math.sin(theta) * math.cos(theta) * total if degreesOfFreedom > 1 else 0.0))
+    return (1 + probability) / 2
+
+def _tQuantile(p, degreesOfFreedom):
+    '''The p quantile of Student's t distribution with an integer number of degrees of freedom, found by bisection.'''
+    if p < 0.5:
+        return -_tQuantile(1 - p, degreesOfFreedom)
+    low, high = 0.0, max(1.0, statistics.NormalDist().inv_cdf(p))
+    while _tDistribution(high, degreesOfFreedom) < p:
+        low, high = high, 2 * high
+    while high - low > 1e-12 * high:
+        middle = (low + high) / 2
+        if _tDistribution(middle, degreesOfFreedom) < p:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+def confidenceInterval(values, confidence=0.95):
+    '''The mean of values and the half width of its confidence interval, infinite for fewer than two values.'''
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return Estimate(mean, math.inf, len(values))
+    return Estimate(mean, _tQuantile((1 + confidence) / 2, len(values) - 1) * statistics.stdev(values) / math.sqrt(len(values)), len(values))
+
+def valuesOf(shopStatistics):
+    '''The statistics of a replicate, by name.'''
+    barberCount = len(shopStatistics.barberBusyTime)
+    return {
+        'customersTrimmed': shopStatistics.customersTrimmed,
+        'customersTurnedAway': shopStatistics.customersTurnedAway,
+        'turnedAwayFraction': shopStatistics.customersTurnedAway / shopStatistics.customersArrived if shopStatistics.customersArrived else 0.0,
+        'meanWaitingTime': shopStatistics.waitingTime.mean,
+        'waitingTime99': shopStatistics.waitingTime.quantile(0.99),
+        'meanServiceTime': shopStatistics.serviceTime.mean,
+        'meanSojournTime': shopStatistics.sojournTime.mean,
+        'meanSeatOccupancy': shopStatistics.meanSeatOccupancy,
+        'utilisation': sum(shopStatistics.utilisation(barber) for barber in range(barberCount)) / barberCount,
+    }
+
+class Replication(object):
+    def __init__(self, samples, confidence):
+        self.samples = samples
+        self.confidence = confidence
+        self.estimates = {name: confidenceInterval(values, confidence) for name, values in samples.items()}
+
+    @property
+    def replicates(self):
+        return min(len(values) for values in self.samples.values())
+
+    def __str__(self):
+        return '\n'.join([str(self.replicates) + ' replicates, ' + str(self.confidence) + ' confidence intervals:'] +
+                         [name + ': ' + str(estimate.mean) + ' ± ' + str(estimate.halfWidth) for name, estimate in self.estimates.items()])
+
+def _initialiseWorker(backendName):
+    importlib.import_module(backendName)
+
+def runReplicate(backendName, replicate, seed, numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, warmUp=0):
+    '''The values of the statistics of replicate replicate of a shop, run in the current process.'''
+    backend = importlib.import_module(backendName)
+    streamName = 'replicate ' + str(replicate)
+    random.seed(str(seed) + ':' + str(replicate))
+    warmUpArgument = {'warmUp': warmUp} if warmUp > 0 else {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        shopStatistics = backend.runSimulation(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, randomStreams.substream(nextCustomerWaitTime, streamName),
+                                               randomStreams.substream(hairTrimTime, streamName), **warmUpArgument)
+    return valuesOf(shopStatistics)
+
+def replicate(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, relativeHalfWidth=0.05, confidence=0.95,
+              minimumReplicates=4, maximumReplicates=256, roundSize=None, warmUp=0, stoppingStatistics=None,
+              backendName='multipleBarbers_discreteEvent', maxWorkers=None, seed=0):
+    '''Replicates of a shop run until the confidence intervals of stoppingStatistics, by default all of them, are narrow enough.
+
+    Returns a Replication, stopping at maximumReplicates replicates however wide the intervals.'''
+    assert minimumReplicates > 1, 'Need at least two replicates for a confidence interval'
+    maxWorkers = maxWorkers or os.cpu_count() or 1
+    roundSize = roundSize or maxWorkers
+    samples = collections.defaultdict(list)
+    replicates = 0
+    with concurrent.futures.ProcessPoolExecutor(maxWorkers, initializer=_initialiseWorker, initargs=(backendName,)) as executor:
+        while replicates < maximumReplicates:
+            count = min(max(roundSize, minimumReplicates - replicates), maximumReplicates - replicates)
+            futures = [executor.submit(runReplicate, backendName, replicates + i, seed, numberOfCustomers, numberOfWaitingSeats, numberOfBarbers,
+                                       nextCustomerWaitTime, hairTrimTime, warmUp) for i in range(count)]
+            for future in futures:
+                for name, value in future.result().items():
+                    samples[name].append(value)
+            replicates += count
+            estimates = Replication(samples, confidence).estimates
+            names = stoppingStatistics or estimates.keys()
+            if all(estimates[name].relativeHalfWidth <= relativeHalfWidth for name in names):
+                break
+    return Replication(samples, confidence)
+
+def batchMeans(numberOfCustomers, numberOfWaitingSeats, numberOfBarbers, nextCustomerWaitTime, hairTrimTime, batches=20, warmUp=0, confidence=0.95):
+    '''A Replication of the batches of one long discrete event simulation after the first warmUp customers.'''
+    batchSize = (numberOfCustomers - warmUp) // batches
+    assert batchSize > 0, 'Must have more customers than batches after the warm up'
+    shop = multipleBarbers_discreteEvent.BarbersShop(numberOfWaitingSeats, numberOfBarbers, hairTrimTime)
+    shop.run(warmUp + batches * batchSize, nextCustomerWaitTime, warmUp, batchSize)
+    samples = collections.defaultdict(list)
+    for start, end in zip(shop.snapshots, shop.snapshots[1:]):
+        arrived = end.customersArrived - start.customersArrived
+        trimmed = end.customersTrimmed - start.customersTrimmed
+        duration = end.time - start.time
+        samples['customersTrimmed'].append(trimmed)
+        samples['customersTurnedAway'].append(end.customersTurnedAway - start.customersTurnedAway)
+        samples['turnedAwayFraction'].append((end.customersTurnedAway - start.customersTurnedAway) / arrived if arrived else 0.0)
+        samples['meanWaitingTime'].append((end.totalWaitingTime - start.totalWaitingTime) / trimmed if trimmed else 0.0)
+        samples['meanSojournTime'].append((end.totalSojournTime - start.totalSojournTime) / trimmed if trimmed else 0.0)
+        samples['meanSeatOccupancy'].append((end.totalWaitingTime - start.totalWaitingTime) / duration if duration > 0 else 0.0)
+        samples['utilisation'].append((end.totalBusyTime - start.totalBusyTime) / (duration * numberOfBarbers) if duration > 0 else 0.0)
+    return Replication(samples, confidence)
+
+if __name__ == '__main__':
+    arrivals = randomStreams.SeededExponential(0.002, 1, 'arrivals')
+    trims = randomStreams.SeededExponential(0.007, 1, 'trims')
+    print(replicate(10000, 8, 4, arrivals, trims, warmUp=1000))
+    print(batchMeans(1000000, 8, 4, arrivals, trims, warmUp=1000))
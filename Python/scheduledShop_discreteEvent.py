@@ -0,0 +1,233 @@
+#! /usr/bin/env python3
+
+#  This is a model of a barber's shop with a working day, each day being a "The Sleeping Barber" problem,
+#  using Python (http://www.python.org) as a discrete event simulation, cf.
+#  http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  multipleBarbers_discreteEvent.py has customers arriving at the same rate all day and the same barbers
+#  working all day.  Here a Schedule gives both for each time of day, repeated every day for as many days
+#  as are simulated:
+#
+#    arrivalRates -- the rate at which customers arrive in each of a number of equal slots of the day, e.g.
+#      24 hourly rates, with lunchtime and evening peaks and no-one arriving at night.  The times between
+#      arrivals are drawn from a distributions.TimeOfDayPoisson, so a block of arrivals is drawn at a time
+#      whatever the rates.
+#    roster -- (timeOfDay, numberOfBarbers) pairs, the number of barbers that should be working from that
+#      time of day until the next change, the last change carrying over to the start of the next day.
+#
+#  A roster change is an event in the calendar alongside the arrivals and the ends of trims, each change
+#  scheduling the next, so there are still only a handful of events in the calendar however many days are
+#  simulated.  Barbers coming on shift start on any customers waiting.  Barbers going off shift leave
+#  straight away if idle, but a barber in the middle of a trim finishes the customer in the chair first, so
+#  no customer is abandoned part way through a trim, and only then leaves rather than taking another
+#  customer, the customers still waiting being trimmed by the barbers still on shift.  If the roster has no
+#  barbers at all the shop is closed: arriving customers are turned away and the last barbers out work on
+#  until the seats are empty.
+#
+#  The statistics of the whole run are collected in a ScheduleStatistics, a ShopStatistics, see
+#  shopStatistics.py, which also has the customers arriving, trimmed and turned away and the waiting time of
+#  the customers arriving in each slot of the day, totalled over all the days, so it shows which times of
+#  day customers are turned away and the roster is short.  The barbers are numbered up to the most there
+#  are ever on shift, each getting their trim times using randomStreams.trimTimes, and their utilisation is
+#  of the whole run, including time off shift.  No events are logged but the summary of the run goes to the
+#  event log given, see eventLog.py, by default a SummaryLog.
+
+import bisect
+import collections
+import heapq
+import time
+
+import distributions
+import eventLog
+import randomStreams
+from shopStatistics import ShopStatistics
+
+_arrival = 0
+_trimFinished = 1
+_rosterChange = 2
+
+class Schedule(object):
+    def __init__(self, arrivalRates, roster, period=24.0):
+        assert len(arrivalRates) > 0, 'Must have some arrival rates'
+        assert len(roster) > 0, 'Must have a roster'
+        self.arrivalRates = list(arrivalRates)
+        self.roster = sorted(roster)
+        assert all(0 <= timeOfDay < period and barbers >= 0 for timeOfDay, barbers in self.roster), 'Roster changes must be within the day.'
+        self.period = period
+        self.slotCount = len(self.arrivalRates)
+        self.slotLength = period / self.slotCount
+
+    @property
+    def maximumBarbers(self):
+        return max(barbers for _, barbers in self.roster)
+
+    def barbersAt(self, timeOfDay):
+        '''The number of barbers rostered at the given time of day.'''
+        return self.roster[bisect.bisect_right(self.roster, (timeOfDay, float('inf'))) - 1][1]
+
+    def meanBarbers(self, slot):
+        '''The mean number of barbers rostered through the given slot of the day.'''
+        start = slot * self.slotLength
+        end = start + self.slotLength
+        changes = [start] + [timeOfDay for timeOfDay, _ in self.roster if start < timeOfDay < end] + [end]
+        return sum((changes[i + 1] - changes[i]) * self.barbersAt(changes[i]) for i in range(len(changes) - 1)) / self.slotLength
+
+class ScheduleStatistics(ShopStatistics):
+    _stateNames = ShopStatistics._stateNames + ('schedule', 'days', 'slotArrived', 'slotTrimmed', 'slotTurnedAway', 'slotWaitingTime')
+
+    def __init__(self, barberCount, schedule, days):
+        super().__init__(barberCount)
+        self.schedule = schedule
+        self.days = days
+        self.slotArrived = [0] * schedule.slotCount
+        self.slotTrimmed = [0] * schedule.slotCount
+        self.slotTurnedAway = [0] * schedule.slotCount
+        self.slotWaitingTime = [0.0] * schedule.slotCount
+
+    def slotTurnedAwayFraction(self, slot):
+        return self.slotTurnedAway[slot] / self.slotArrived[slot] if self.slotArrived[slot] else 0.0
+
+    def __str__(self):
+        lines = [super().__str__(), 'Per slot, customers per day: start, barbers, arrived, turned away, fraction turned away, mean wait']
+        for slot in range(self.schedule.slotCount):
+            lines.append(str(slot * self.schedule.slotLength) + ': ' + str(self.schedule.meanBarbers(slot)) + ', ' +
+                         str(self.slotArrived[slot] / self.days) + ', ' + str(self.slotTurnedAway[slot] / self.days) + ', ' +
+                         str(self.slotTurnedAwayFraction(slot)) + ', ' +
+                         str(self.slotWaitingTime[slot] / self.slotTrimmed[slot] if self.slotTrimmed[slot] else 0.0))
+        return '\n'.join(lines)
+
+class ScheduledShop(object):
+    def __init__(self, waitingSeatCount, schedule, hairTrimTime, seed=0):
+        assert waitingSeatCount > 0, 'Cannot have 0 or less waiting seats'
+        assert schedule.maximumBarbers > 0, 'Must have some barbers'
+        self.waitingSeatCount = waitingSeatCount
+        self.schedule = schedule
+        self.barberCount = schedule.maximumBarbers
+        self.trimTimes = [randomStreams.trimTimes(hairTrimTime, barber) for barber in range(self.barberCount)]
+        self.arrivals = distributions.TimeOfDayPoisson(schedule.arrivalRates, schedule.period, seed, 'arrivals')
+
+    def run(self, days):
+        '''Run the given number of days, returning the ScheduleStatistics of them all.'''
+        #  This is the hot loop so everything used per event is held in a local variable.  offShift are the
+        #  barbers not working, rostered the number of barbers that should be and working the number that are,
+        #  which is more than rostered whilst barbers going off shift finish their trims.
+        schedule = self.schedule
+        period = schedule.period
+        slotLength = schedule.slotLength
+        lastSlot = schedule.slotCount - 1
+        roster = schedule.roster
+        endTime = days * period
+        statistics = ScheduleStatistics(self.barberCount, schedule, days)
+        trimmed = statistics.trimmed
+        slotArrived = statistics.slotArrived
+        slotTrimmed = statistics.slotTrimmed
+        slotTurnedAway = statistics.slotTurnedAway
+        slotWaitingTime = statistics.slotWaitingTime
+        waitingSeats = collections.deque()
+        waitingSeatCount = self.waitingSeatCount
+        trimTimes = self.trimTimes
+        nextCustomerWaitTime = randomStreams.sampler(self.arrivals)
+        idleBarbers = []
+        offShift = list(range(self.barberCount - 1, -1, -1))
+        rostered = 0
+        working = 0
+        customersArrived = 0
+        customersTurnedAway = 0
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        calendar = []
+        sequence = 0
+        if roster[0][0] > 0.0:
+            #  The day starts with the barbers of the last change of the day before.
+            rostered = working = roster[-1][1]
+            idleBarbers = [offShift.pop() for _ in range(working)]
+        heappush(calendar, (roster[0][0], sequence, _rosterChange, (0, 0.0)))
+        firstArrival = nextCustomerWaitTime()
+        if firstArrival < endTime:
+            sequence += 1
+            heappush(calendar, (firstArrival, sequence, _arrival, 0))
+        clock = 0.0
+        while calendar:
+            clock, _, kind, data = heappop(calendar)
+            if kind == _arrival:
+                customersArrived += 1
+                nextArrival = clock + nextCustomerWaitTime()
+                if nextArrival < endTime:
+                    sequence += 1
+                    heappush(calendar, (nextArrival, sequence, _arrival, data + 1))
+                slot = min(int(clock % period // slotLength), lastSlot)
+                slotArrived[slot] += 1
+                if idleBarbers:
+                    barber = idleBarbers.pop()
+                    sequence += 1
+                    heappush(calendar, (clock + trimTimes[barber](data), sequence, _trimFinished, (barber, clock, clock)))
+                    slotTrimmed[slot] += 1
+                elif rostered > 0 and len(waitingSeats) < waitingSeatCount:
+                    waitingSeats.append((data, clock))
+                else:
+                    customersTurnedAway += 1
+                    slotTurnedAway[slot] += 1
+            elif kind == _trimFinished:
+                barber, arrivalTime, startTime = data
+                trimmed(barber, arrivalTime, startTime, clock)
+                if working > rostered and (rostered > 0 or not waitingSeats):
+                    working -= 1
+                    offShift.append(barber)
+                elif waitingSeats:
+                    customer, arrivalTime = waitingSeats.popleft()
+                    sequence += 1
+                    heappush(calendar, (clock + trimTimes[barber](customer), sequence, _trimFinished, (barber, arrivalTime, clock)))
+                    slot = min(int(arrivalTime % period // slotLength), lastSlot)
+                    slotTrimmed[slot] += 1
+                    slotWaitingTime[slot] += clock - arrivalTime
+                else:
+                    idleBarbers.append(barber)
+            elif kind == _rosterChange:
+                change, dayStart = data
+                rostered = roster[change][1]
+                while working < rostered:
+                    barber = offShift.pop()
+                    working += 1
+                    if waitingSeats:
+                        customer, arrivalTime = waitingSeats.popleft()
+                        sequence += 1
+                        heappush(calendar, (clock + trimTimes[barber](customer), sequence, _trimFinished, (barber, arrivalTime, clock)))
+                        slot = min(int(arrivalTime % period // slotLength), lastSlot)
+                        slotTrimmed[slot] += 1
+                        slotWaitingTime[slot] += clock - arrivalTime
+                    else:
+                        idleBarbers.append(barber)
+                while working > rostered and idleBarbers:
+                    working -= 1
+                    offShift.append(idleBarbers.pop())
+                change += 1
+                if change == len(roster):
+                    change = 0
+                    dayStart += period
+                if dayStart + roster[change][0] < endTime:
+                    sequence += 1
+                    heappush(calendar, (dayStart + roster[change][0], sequence, _rosterChange, (change, dayStart)))
+            else:
+                raise ValueError('Event of unexpected kind in the calendar.')
+        statistics.customersArrived = customersArrived
+        statistics.customersTurnedAway = customersTurnedAway
+        statistics.close(max(clock, endTime))
+        return statistics
+
+def runSimulation(days, numberOfWaitingSeats, schedule, hairTrimTime, seed=0, log=None):
+    '''Run days days of a shop with the given schedule, returning the ScheduleStatistics of them all.'''
+    statistics = ScheduledShop(numberOfWaitingSeats, schedule, hairTrimTime, seed).run(days)
+    (eventLog.SummaryLog() if log is None else log).summary('\nTrimmed ' + str(statistics.customersTrimmed) + ' and turned away ' + str(statistics.customersTurnedAway) +
+                                                            ' in ' + str(days) + ' days.')
+    return statistics
+
+if __name__ == '__main__':
+    #  A day in hours: open 9 till 9 with lunchtime and evening peaks, a barber in the morning, three over
+    #  lunch, two in the afternoon and four in the evening.
+    arrivalRates = [0.0] * 9 + [4.0, 6.0, 6.0, 14.0, 14.0, 6.0, 5.0, 6.0, 12.0, 16.0, 14.0, 8.0] + [0.0] * 3
+    roster = [(0.0, 0), (9.0, 1), (11.5, 3), (14.0, 2), (17.0, 4), (21.0, 0)]
+    startTime = time.time()
+    print(runSimulation(365, 4, Schedule(arrivalRates, roster), distributions.Lognormal(0.4, 0.15, 1, 'trims')))
+    print('Simulated a year in ' + str(time.time() - startTime) + 's.')
@@ -0,0 +1,101 @@
+#  Waiting seats for the multiprocessing barber's shop held in shared memory.
+#
+#  Copyright © 2026  Russel Winder
+
+#  A multiprocessing.Queue used as the waiting seats pickles each customer, writes it down a pipe via a
+#  feeder thread and guards its capacity with a semaphore, all to pass what is really just a customer id.
+#  Its qsize is approximate and needs a system call.  SharedMemorySeats is a fixed capacity ring buffer of
+#  customer ids in a multiprocessing.shared_memory block: the first two 64-bit words are the head index (the
+#  next seat to be vacated) and the tail index (the next seat to be filled) followed by one word per seat.
+#  The indices only ever increase, the seat is the index modulo the capacity, so the number of seats in use
+#  is exactly tail - head, which is a pair of memory reads.
+#
+#  There is a single producer, the shop, so the tail is only ever written by one process and needs no lock.
+#  There are many consumers, the barbers, so they take a lock to read a seat and advance the head; the seat
+#  is read before the head is advanced so the shop cannot reuse a seat that is still being read.  Barbers
+#  with nothing to do sleep on a semaphore counting the occupied seats, on Linux this is a futex so an idle
+#  barber costs nothing and a barber is woken by the shop's release without any pipe traffic.  Aligned
+#  64-bit reads and writes are atomic on all the platforms of interest and the semaphore operations are full
+#  memory barriers so a barber woken by the semaphore always sees the customer id the shop wrote.
+#
+#  At the end of the day sendHome wakes the given number of barbers with no customer to take, each of whom
+#  gets messages.goHome, see messages.py.  It is only called when all the seats are empty so sending any
+#  number of barbers home needs no seats.
+#
+#  The semaphore and lock are made by the given multiprocessing context, by default that of the start method
+#  in use, so the seats can be shared with processes started by another, see barberPool.py.
+
+import multiprocessing
+import multiprocessing.shared_memory
+
+import messages
+
+#  Must get the Full symbol as multiprocessing does not define it but does use it.
+import queue
+
+_head = 0
+_tail = 1
+_firstSeat = 2
+
+class SharedMemorySeats(object):
+    def __init__(self, capacity, context=multiprocessing):
+        assert capacity > 0, 'Cannot have 0 or less waiting seats'
+        self.capacity = capacity
+        self.memory = multiprocessing.shared_memory.SharedMemory(create=True, size=8 * (_firstSeat + capacity))
+        self._occupied = context.Semaphore(0)
+        self._takeLock = context.Lock()
+        self._words = self.memory.buf.cast('q')
+        self._words[_head] = 0
+        self._words[_tail] = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_words']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._words = self.memory.buf.cast('q')
+
+    def put_nowait(self, customerId):
+        '''Seat a customer, raising queue.Full if all the seats are taken. Only the shop may call this.'''
+        words = self._words
+        tail = words[_tail]
+        if tail - words[_head] >= self.capacity:
+            raise queue.Full
+        words[_firstSeat + tail % self.capacity] = customerId
+        words[_tail] = tail + 1
+        self._occupied.release()
+
+    def get(self):
+        '''Take the customer from the seat occupied longest, sleeping until there is one.'''
+        self._occupied.acquire()
+        words = self._words
+        with self._takeLock:
+            head = words[_head]
+            if words[_tail] == head:
+                return messages.goHome
+            customerId = words[_firstSeat + head % self.capacity]
+            words[_head] = head + 1
+        return customerId
+
+    def sendHome(self, barberCount):
+        '''Wake barberCount barbers to get messages.goHome. Only the shop may call this, when all the seats are empty.'''
+        for _ in range(barberCount):
+            self._occupied.release()
+
+    def qsize(self):
+        words = self._words
+        return words[_tail] - words[_head]
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def close(self):
+        self._words.release()
+        self.memory.close()
+
+    def unlink(self):
+        '''Release the shared memory, to be called once by the creating process when all users are finished.'''
+        self.close()
+        self.memory.unlink()
@@ -0,0 +1,232 @@
+#  Statistics of a barber's shop day, collected in constant memory however many customers there are.
+#
+#  Copyright © 2026  Russel Winder
+
+#  For each customer trimmed there is a waiting time (arrival to starting the trim), a service time (the
+#  trim) and a sojourn time (arrival to leaving trimmed).  Keeping every one of them is out of the question
+#  for a day with millions of customers so each is fed to a LogHistogram, an HDR style histogram whose
+#  buckets are a fixed number of equal divisions of each power of two, giving every quantile to within a
+#  fixed relative error with the number of buckets growing only with the logarithm of the range of values.
+#  The waiting time is also fed to P2Quantile estimators, the P² algorithm of Jain and Chlamtac, which keep
+#  five markers per quantile and so track any single quantile without binning error.
+#
+#  The time-weighted mean number of seats in use is the integral over the day of the number of customers
+#  seated divided by the length of the day.  Each seated customer contributes exactly their waiting time to
+#  that integral so it is the total waiting time divided by the length of the day, there is no need to
+#  track the number of seats in use as the day goes on.  Likewise the utilisation of a barber is the total of
+#  the service times of their customers divided by the length of the day.  The variants with processes or
+#  tasks to shut down record in shutdownTime how long it took from the last customer leaving to every barber
+#  having clocked off, see messages.py.  The variants with processes kept from run to run record in setupTime
+#  how long it took from the start of the run to every process being ready for it, see barberPool.py.
+#
+#  The statistics are pickled to get them back from worker processes and into checkpoints, see
+#  checkpoint.py, part way through a day.  Pickling an object by its __dict__ turns the attributes that
+#  CPython keeps inline in the object into a real dictionary, making every attribute access in record and
+#  trimmed slower for the rest of the day, so each class pickles the attributes named in _stateNames
+#  instead, which subclasses extend with their own.
+
+import math
+
+def _getState(self):
+    return {name: getattr(self, name) for name in self._stateNames}
+
+def _setState(self, state):
+    for name, value in state.items():
+        setattr(self, name, value)
+
+class LogHistogram(object):
+    _stateNames = ('subBucketCount', 'buckets', 'zeroCount', 'count', 'total', 'minimum', 'maximum')
+    __getstate__ = _getState
+    __setstate__ = _setState
+
+    def __init__(self, subBucketCount=64):
+        self.subBucketCount = subBucketCount
+        self.buckets = {}
+        self.zeroCount = 0
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def record(self, value):
+        self.count += 1
+        self.total += value
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        if value <= 0.0:
+            self.zeroCount += 1
+        else:
+            mantissa, exponent = math.frexp(value)
+            index = exponent * self.subBucketCount + int((mantissa - 0.5) * 2 * self.subBucketCount)
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other):
+        assert self.subBucketCount == other.subBucketCount, 'Can only merge histograms with the same buckets.'
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zeroCount += other.zeroCount
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def _bucketMiddle(self, index):
+        exponent, subBucket = divmod(index, self.subBucketCount)
+        return math.ldexp(0.5 + (subBucket + 0.5) / (2 * self.subBucketCount), exponent)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+    def quantile(self, q):
+        '''The value below which a fraction q of the values lie, to within the width of a bucket.'''
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = self.zeroCount
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return min(max(self._bucketMiddle(index), self.minimum), self.maximum)
+        return self.maximum
+
+class P2Quantile(object):
+    _stateNames = ('q', 'heights', 'positions', 'desired', 'increments')
+    __getstate__ = _getState
+    __setstate__ = _setState
+
+    def __init__(self, q):
+        assert 0 < q < 1, 'The quantile must be strictly between 0 and 1.'
+        self.q = q
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5]
+        self.increments = [0, q / 2, q, (1 + q) / 2, 1]
+
+    def record(self, value):
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+        positions = self.positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        desired = self.desired
+        for i in range(5):
+            desired[i] += self.increments[i]
+        for i in (1, 2, 3):
+            difference = desired[i] - positions[i]
+            if (difference >= 1 and positions[i + 1] - positions[i] > 1) or (difference <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if difference > 0 else -1
+                parabolic = heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+                    (positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i]) / (positions[i + 1] - positions[i]) +
+                    (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1]) / (positions[i] - positions[i - 1]))
+                if heights[i - 1] < parabolic < heights[i + 1]:
+                    heights[i] = parabolic
+                else:
+                    heights[i] += step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                positions[i] += step
+
+    def value(self):
+        if not self.heights:
+            return math.nan
+        if len(self.heights) < 5:
+            return self.heights[min(len(self.heights) - 1, int(round(self.q * (len(self.heights) - 1))))]
+        return self.heights[2]
+
+class ShopStatistics(object):
+    _stateNames = ('customersArrived', 'customersTrimmed', 'customersTurnedAway', 'waitingTime', 'serviceTime', 'sojournTime', 'waitingTimeQuantiles',
+                   'barberBusyTime', 'startTime', 'endTime', 'shutdownTime', 'setupTime')
+    __getstate__ = _getState
+    __setstate__ = _setState
+
+    def __init__(self, barberCount, startTime=0.0, quantiles=(0.5, 0.99)):
+        self.customersArrived = 0
+        self.customersTrimmed = 0
+        self.customersTurnedAway = 0
+        self.waitingTime = LogHistogram()
+        self.serviceTime = LogHistogram()
+        self.sojournTime = LogHistogram()
+        self.waitingTimeQuantiles = [P2Quantile(q) for q in quantiles]
+        self.barberBusyTime = [0.0] * barberCount
+        self.startTime = startTime
+        self.endTime = startTime
+        self.shutdownTime = None
+        self.setupTime = None
+
+    def trimmed(self, barber, arrivalTime, startTime, finishTime):
+        self.customersTrimmed += 1
+        waitingTime = startTime - arrivalTime
+        serviceTime = finishTime - startTime
+        self.waitingTime.record(waitingTime)
+        self.serviceTime.record(serviceTime)
+        self.sojournTime.record(finishTime - arrivalTime)
+        for estimator in self.waitingTimeQuantiles:
+            estimator.record(waitingTime)
+        self.barberBusyTime[barber] += serviceTime
+
+    def close(self, time):
+        self.endTime = time
+
+    def merge(self, other):
+        '''Add in the statistics of another shop, whose barbers are appended to the barbers of this one.
+
+        The histograms merge exactly but P² estimators cannot be merged so they are dropped, the histogram
+        quantiles being the ones to use for merged statistics.'''
+        self.customersArrived += other.customersArrived
+        self.customersTrimmed += other.customersTrimmed
+        self.customersTurnedAway += other.customersTurnedAway
+        self.waitingTime.merge(other.waitingTime)
+        self.serviceTime.merge(other.serviceTime)
+        self.sojournTime.merge(other.sojournTime)
+        self.waitingTimeQuantiles = []
+        self.barberBusyTime += other.barberBusyTime
+        self.startTime = min(self.startTime, other.startTime)
+        self.endTime = max(self.endTime, other.endTime)
+        if other.shutdownTime is not None:
+            self.shutdownTime = max(self.shutdownTime or 0.0, other.shutdownTime)
+        if other.setupTime is not None:
+            self.setupTime = max(self.setupTime or 0.0, other.setupTime)
+
+    @property
+    def duration(self):
+        return self.endTime - self.startTime
+
+    @property
+    def meanSeatOccupancy(self):
+        return self.waitingTime.total / self.duration if self.duration > 0 else 0.0
+
+    def utilisation(self, barber):
+        return self.barberBusyTime[barber] / self.duration if self.duration > 0 else 0.0
+
+    def __str__(self):
+        def describe(name, histogram):
+            return (name + ': mean ' + str(histogram.mean) + ', median ' + str(histogram.quantile(0.5)) +
+                    ', 99% ' + str(histogram.quantile(0.99)) + ', max ' + str(histogram.maximum))
+        lines = ['Trimmed ' + str(self.customersTrimmed) + ' and turned away ' + str(self.customersTurnedAway) + ' of ' + str(self.customersArrived) + ' customers.',
+                 describe('Waiting time', self.waitingTime),
+                 describe('Service time', self.serviceTime),
+                 describe('Sojourn time', self.sojournTime)]
+        lines += ['Waiting time ' + str(estimator.q) + ' quantile (P²): ' + str(estimator.value()) for estimator in self.waitingTimeQuantiles]
+        lines.append('Mean seats in use: ' + str(self.meanSeatOccupancy))
+        if self.shutdownTime is not None:
+            lines.append('Shutdown time: ' + str(self.shutdownTime))
+        if self.setupTime is not None:
+            lines.append('Setup time: ' + str(self.setupTime))
+        lines += ['Barber ' + str(barber) + ' utilisation: ' + str(self.utilisation(barber)) for barber in range(len(self.barberBusyTime))]
+        return '\n'.join(lines)
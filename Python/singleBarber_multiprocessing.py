@@ -7,7 +7,14 @@
 
 #  The world, barber's shop and the barber are modelled using processes each with their own queue -- though
 #  the barber queue is actually in the shop.  In effect this is an Actor Model reactor approach with each
-#  process using a blocking read on its queue.  The waiting seats are modelled by the barber's queue.
+#  process using a blocking read on its queue.  The waiting seats are modelled by the barber's queue.  The
+#  messages are tuples tagged with a small integer, see messages.py, each process switching on the tag.  The
+#  shop passes on the closing message through the waiting seats so the barber only gets it once every
+#  seated customer has been trimmed, as in the protocol of messages.py, and the shop reports the time from
+#  the last customer leaving to the barber clocking off.
+#  Events are recorded with an event log, see eventLog.py, by default a TextLog writing the lines that used
+#  to be printed, each process flushing its log when it finishes.  The barber gets their trim times using
+#  randomStreams.trimTimes, see randomStreams.py.
 
 import multiprocessing
 try:
@@ -17,102 +24,110 @@ except:
 import time
 import random
 
-class Customer(object):
-    def __init__(self, id):
-        self.id = id
-
-class SuccessfulCustomer(object):
-    def __init__(self, customer):
-        self.c = customer
-
-_closing = 'closing'
-_clockedOff = 'clockedOff'
-_closed = 'closed'
+import eventLog
+import messages
+import randomStreams
 
 class Barber(multiprocessing.Process):
-    def __init__(self, hairTrimTime):
+    def __init__(self, hairTrimTime, log):
         super().__init__()
         self.shop = None  # This value will be injected after construction.
         self.hairTrimTime = hairTrimTime
+        self.log = log
 
     def run(self):
+        log = self.log
+        trimTime = randomStreams.trimTimes(self.hairTrimTime, 0)
         customersTrimmed = 0
         while True:
-            customer = self.shop.waitingSeats.get()  # Block on the shop's waiting seats queue.
-            if isinstance(customer, Customer):
-                print('Barber: Starting Customer ' + str(customer.id))
-                time.sleep(self.hairTrimTime())
+            message = self.shop.waitingSeats.get()  # Block on the shop's waiting seats queue.
+            tag = message[0]
+            if tag == messages.arrives:
+                customer = message[1]
+                log.event(0, customer, eventLog.startsTrim)
+                time.sleep(trimTime(customer))
                 customersTrimmed += 1
-                print('Barber: Finished Customer ' + str(customer.id))
-                self.shop.queue.put(SuccessfulCustomer(customer))
-            elif isinstance(customer, str) and customer == _closing:
-                print('Barber: Clocking off, trimmed ' + str(customersTrimmed) + 'today.')
-                self.shop.queue.put(_clockedOff)
+                log.event(0, customer, eventLog.finishesTrim)
+                self.shop.queue.put((messages.trimmed, customer))
+            elif tag == messages.closing:
+                log.summary('Barber: Clocking off, trimmed ' + str(customersTrimmed) + ' today.')
+                self.shop.queue.put(messages.clockedOffMessage)
                 break
             else:
-                raise ValueError('Barber: Unexpected object received:' + str(customer) + ' / ' + str(type(customer)))
+                raise ValueError('Barber: Unexpected message received:' + str(message))
 
 class Shop(multiprocessing.Process):
-    def __init__(self, numberOfWaitingSeats, barber, world):
+    def __init__(self, numberOfWaitingSeats, barber, world, log):
         super().__init__()
         self.waitingSeats = multiprocessing.Queue(numberOfWaitingSeats)
         self.barber = barber
         self.world = world
         self.queue = multiprocessing.Queue()
+        self.log = log
 
     def run(self):
+        log = self.log
         customersTrimmed = 0
         customersTurnedAway = 0
+        lastLeftTime = time.time()
         while True:
-            customer = self.queue.get()
-            if isinstance(customer, Customer):
+            message = self.queue.get()
+            tag = message[0]
+            if tag == messages.arrives:
+                customer = message[1]
                 try:
-                    self.waitingSeats.put_nowait(customer)
-                    print('Shop: Customer ' + str(customer.id) + ' takes a seat. ' + str(self.waitingSeats.qsize()) + ' in use.')
+                    self.waitingSeats.put_nowait(message)
+                    log.event(eventLog.shop, customer, eventLog.seated, self.waitingSeats.qsize())
                 except queue.Full:
                     customersTurnedAway += 1
-                    print('Shop: Customer ' + str(customer.id) + ' turned away.')
-                    self.world.queue.put(customer)
-            elif isinstance(customer, SuccessfulCustomer):
-                assert isinstance(customer.c, Customer)
+                    log.event(eventLog.shop, customer, eventLog.turnedAway)
+                    self.world.queue.put((messages.turnedAway, customer))
+            elif tag == messages.trimmed:
                 customersTrimmed += 1
-                print('Shop: Customer ' + str(customer.c.id) + ' leaving trimmed.')
-                self.world.queue.put(customer)
-            elif isinstance(customer, str) and customer == _closing:
-                self.waitingSeats.put(customer)
-            elif isinstance(customer, str) and customer == _clockedOff:
-                print('Shop: Closing --- ' + str(customersTrimmed) + ' trimmed and ' + str(customersTurnedAway) + ' turned away.')
-                self.world.queue.put(_closed)
+                lastLeftTime = time.time()
+                log.event(eventLog.shop, message[1], eventLog.leavesTrimmed)
+                self.world.queue.put(message)
+            elif tag == messages.closing:
+                self.waitingSeats.put(message)
+            elif tag == messages.clockedOff:
+                log.summary('Shop: Closing --- ' + str(customersTrimmed) + ' trimmed and ' + str(customersTurnedAway) + ' turned away, the barber clocked off ' +
+                            str(time.time() - lastLeftTime) + 's after the last customer left.')
+                self.world.queue.put(messages.closedMessage)
                 break
             else:
-                raise ValueError('Shop: Unexpected object received:' + str(customer) + ' / ' + str(type(customer)))
+                raise ValueError('Shop: Unexpected message received:' + str(message))
 
 class World(multiprocessing.Process):
-    def __init__(self):
+    def __init__(self, log):
         super().__init__()
         self.queue = multiprocessing.Queue()
+        self.log = log
 
     def run(self):
+        log = self.log
         customersTrimmed = 0
         customersTurnedAway = 0
         while True:
-            customer = self.queue.get()
-            if isinstance(customer, Customer):
+            message = self.queue.get()
+            tag = message[0]
+            if tag == messages.turnedAway:
                 customersTurnedAway += 1
-                print('World: Customer ' + str(customer.id) + 'exiting the shop, turned away.')
-            elif isinstance(customer, SuccessfulCustomer):
+                log.event(eventLog.world, message[1], eventLog.exitsTurnedAway)
+            elif tag == messages.trimmed:
                 customersTrimmed += 1
-                print('World: Customer ' + str(customer.c.id) + ' exiting the shop, trimmed.')
-            elif isinstance(customer, str) and customer == _closed:
-                print('\nTrimmed ' + str(customersTrimmed) + ' and turned away ' + str(customersTurnedAway) + ' today.')
+                log.event(eventLog.world, message[1], eventLog.exitsTrimmed)
+            elif tag == messages.closed:
+                log.summary('\nTrimmed ' + str(customersTrimmed) + ' and turned away ' + str(customersTurnedAway) + ' today.')
                 break
             else:
-                raise ValueError('World: Unexpected object received:' + str(customer) + ' / ' + str(type(customer)))
+                raise ValueError('World: Unexpected message received:' + str(message))
 
-def runSimulation(numberOfCustomers, numberOfWaitingSeats, nextCustomerWaitTime, hairTrimTime):
-    barber = Barber(hairTrimTime)
-    world = World()
-    shop = Shop(numberOfWaitingSeats, barber, world)
+def runSimulation(numberOfCustomers, numberOfWaitingSeats, nextCustomerWaitTime, hairTrimTime, log=None):
+    if log is None:
+        log = eventLog.TextLog()
+    barber = Barber(hairTrimTime, log)
+    world = World(log)
+    shop = Shop(numberOfWaitingSeats, barber, world, log)
     barber.shop = shop
     barber.start()
     world.start()
@@ -120,9 +135,10 @@ def runSimulation(numberOfCustomers, numberOfWaitingSeats, nextCustomerWaitTime,
     #  In Python 2 would use xrange here but use range for Python 3 compatibility.
     for i in range(numberOfCustomers):
         time.sleep(nextCustomerWaitTime())
-        print('World: Customer ' + str(i) + ' enters the shop.')
-        shop.queue.put(Customer(i))
-    shop.queue.put(_closing)
+        log.event(eventLog.world, i, eventLog.enters)
+        shop.queue.put((messages.arrives, i))
+    shop.queue.put(messages.closingMessage)
+    log.flush()
     #  Wait for the world to end.
     world.join()
 
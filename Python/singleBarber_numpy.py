@@ -0,0 +1,183 @@
+#! /usr/bin/env python3
+
+#  This is a model of the "The Sleeping Barber" problem using Python (http://www.python.org) and NumPy
+#  (http://www.numpy.org), cf. http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  With a single barber and customers served first come first served, the time at which each customer
+#  leaves is given by the Lindley recursion: a customer starts their trim at the later of their arrival and
+#  the departure of the previous customer trimmed.  Without any limit on the number of seats this unrolls
+#  to departure[n] = S[n] + max over k <= n of (arrival[k] - S[k-1]) where S is the cumulative trim time,
+#  which is a cumulative sum and a cumulative maximum, i.e. whole array operations with no per-customer
+#  Python code at all.
+#
+#  The finite number of waiting seats spoils this as whether a customer is turned away depends on who was
+#  turned away before them.  However the departures of the customers trimmed are increasing so the number
+#  of customers in the shop when customer i arrives is the number of earlier customers trimmed whose
+#  departure is later than arrival[i], which for the whole array is a single searchsorted.  So the array of
+#  departures is computed assuming everyone in a window of customers gets a seat, the first customer
+#  arriving to a full shop is found, everyone before them is correct and is committed, they are turned away,
+#  and the computation is restarted with the customer after them.  The window doubles each time it is
+#  committed without anyone being turned away so a lightly loaded shop is processed in big vectorized
+#  steps.  A heavily loaded shop turns customers away every few arrivals and then restarting array
+#  operations for every one of them costs far more than the work done, so after a turn away the next run
+#  of customers is handled one at a time, the run getting longer each time the vectorized attempt that
+#  follows it fails quickly, until a vectorized window gets through without anyone being turned away.
+#
+#  Inter-arrival and trim times are drawn in chunks from a numpy.random.Generator and only the chunk and the
+#  departure times of the customers still in the shop, at most numberOfWaitingSeats + 1 of them, are kept
+#  between chunks so memory use is bounded however many customers there are.  nextCustomerWaitTimes and
+#  hairTrimTimes are the bulk equivalents of the nextCustomerWaitTime and hairTrimTime of the other
+#  variants: they are called with the generator and a count and return an array of that many times.  The
+#  distributions of distributions.py can be used instead, drawing from their own seeded streams, see
+#  randomStreams.bulk.  No events are logged but the end of day summary goes to the event log given, see
+#  eventLog.py, by default a SummaryLog.
+#
+#  runSimulation returns a ShopStatistics, see shopStatistics.py, as the other variants do.  A customer
+#  starts their trim at the later of their arrival and the departure of the customer before them, so the
+#  waiting, service and sojourn times of each window or run of customers committed are recorded in the
+#  histograms a whole array at a time.  There are no P²
+#  estimators as they take one value at a time, the histogram quantiles being the ones to use, as for
+#  merged statistics.
+
+import numpy
+
+import eventLog
+import randomStreams
+from shopStatistics import ShopStatistics
+
+_initialWindow = 64
+_initialOneByOneRun = 256
+_maximumOneByOneRun = 65536
+
+def _record(histogram, values):
+    '''Record an array of values in a LogHistogram, as histogram.record would one at a time.'''
+    if len(values) == 0:
+        return
+    histogram.count += len(values)
+    histogram.total += float(values.sum())
+    histogram.minimum = min(histogram.minimum, float(values.min()))
+    histogram.maximum = max(histogram.maximum, float(values.max()))
+    positive = values[values > 0.0]
+    histogram.zeroCount += len(values) - len(positive)
+    mantissas, exponents = numpy.frexp(positive)
+    indices = exponents * histogram.subBucketCount + ((mantissas - 0.5) * 2 * histogram.subBucketCount).astype(numpy.int64)
+    buckets = histogram.buckets
+    for index, count in zip(*numpy.unique(indices, return_counts=True)):
+        index = int(index)
+        buckets[index] = buckets.get(index, 0) + int(count)
+
+class Shop(object):
+    def __init__(self, numberOfWaitingSeats, hairTrimTimes, generator, collectStatistics=True):
+        assert numberOfWaitingSeats > 0, 'Cannot have 0 or less waiting seats'
+        self.capacity = numberOfWaitingSeats + 1  # The waiting seats plus the barber's chair.
+        self.hairTrimTimes = hairTrimTimes
+        self.generator = generator
+        self.clock = 0.0
+        self.inShop = numpy.empty(0)  # Departure times of the customers trimmed who may still be in the shop.
+        self.customersTrimmed = 0
+        self.customersTurnedAway = 0
+        self.statistics = ShopStatistics(1, quantiles=())
+        self.collectStatistics = collectStatistics
+
+    def _trimmed(self, arrivals, starts, departures):
+        '''Record the customers trimmed arriving, starting their trim and leaving at the given times.'''
+        statistics = self.statistics
+        serviceTimes = departures - starts
+        _record(statistics.waitingTime, starts - arrivals)
+        _record(statistics.serviceTime, serviceTimes)
+        _record(statistics.sojournTime, departures - arrivals)
+        statistics.barberBusyTime[0] += float(serviceTimes.sum())
+
+    def _departures(self, arrivals, trims):
+        '''The departure times if all these customers were trimmed, given the customers already trimmed.'''
+        lastDeparture = self.inShop[-1] if len(self.inShop) else -numpy.inf
+        cumulativeTrims = numpy.cumsum(trims)
+        startOffsets = arrivals - (cumulativeTrims - trims)
+        startOffsets[0] = max(startOffsets[0], lastDeparture)
+        return cumulativeTrims + numpy.maximum.accumulate(startOffsets)
+
+    def _serveOneByOne(self, arrivals, trims):
+        inShop = self.inShop.tolist()
+        left = 0
+        lastDeparture = inShop[-1] if inShop else float('-inf')
+        turnedAway = 0
+        collectStatistics = self.collectStatistics
+        firstDeparture = len(inShop)
+        trimmedArrivals = []
+        starts = []
+        for arrival, trim in zip(arrivals.tolist(), trims.tolist()):
+            while left < len(inShop) and inShop[left] <= arrival:
+                left += 1
+            if len(inShop) - left < self.capacity:
+                start = max(arrival, lastDeparture)
+                lastDeparture = start + trim
+                inShop.append(lastDeparture)
+                if collectStatistics:
+                    trimmedArrivals.append(arrival)
+                    starts.append(start)
+            else:
+                turnedAway += 1
+        if collectStatistics:
+            self._trimmed(numpy.array(trimmedArrivals), numpy.array(starts), numpy.array(inShop[firstDeparture:]))
+        self.customersTrimmed += len(arrivals) - turnedAway
+        self.customersTurnedAway += turnedAway
+        self.inShop = numpy.array(inShop[max(left, len(inShop) - self.capacity):])
+
+    def serveChunk(self, arrivals):
+        '''Trim or turn away the customers arriving at the given increasing times.'''
+        trims = self.hairTrimTimes(self.generator, len(arrivals))
+        position = 0
+        window = _initialWindow
+        oneByOneRun = _initialOneByOneRun
+        while position < len(arrivals):
+            end = min(position + window, len(arrivals))
+            windowArrivals = arrivals[position:end]
+            departures = numpy.concatenate((self.inShop, self._departures(windowArrivals, trims[position:end])))
+            firstInWindow = len(self.inShop)
+            alreadyLeft = numpy.searchsorted(departures, windowArrivals, side='right')
+            inShopOnArrival = numpy.arange(firstInWindow, firstInWindow + len(windowArrivals)) - alreadyLeft
+            full = numpy.flatnonzero(inShopOnArrival >= self.capacity)
+            committed = full[0] if len(full) else len(windowArrivals)
+            self.customersTrimmed += int(committed)
+            if self.collectStatistics and committed > 0:
+                #  A customer starts their trim when they arrive or when the customer before them leaves.
+                previousDepartures = departures[firstInWindow - 1:firstInWindow + committed - 1] if firstInWindow > 0 else numpy.concatenate(((-numpy.inf,), departures[:committed - 1]))
+                self._trimmed(windowArrivals[:committed], numpy.maximum(windowArrivals[:committed], previousDepartures), departures[firstInWindow:firstInWindow + committed])
+            kept = departures[:firstInWindow + committed]
+            self.inShop = kept[max(0, len(kept) - self.capacity):]
+            if len(full):
+                self.customersTurnedAway += 1
+                position += committed + 1
+                end = min(position + oneByOneRun, len(arrivals))
+                self._serveOneByOne(arrivals[position:end], trims[position:end])
+                position = end
+                window = _initialWindow
+                oneByOneRun = min(oneByOneRun * 2, _maximumOneByOneRun)
+            else:
+                position = end
+                window *= 2
+                oneByOneRun = _initialOneByOneRun
+
+def runSimulation(numberOfCustomers, numberOfWaitingSeats, nextCustomerWaitTimes, hairTrimTimes, seed=None, chunkSize=1 << 20, log=None, collectStatistics=True):
+    '''Run a day with numberOfCustomers customers, returning its ShopStatistics.'''
+    generator = numpy.random.default_rng(seed)
+    nextCustomerWaitTimes = randomStreams.bulk(nextCustomerWaitTimes)
+    hairTrimTimes = randomStreams.bulk(hairTrimTimes)
+    shop = Shop(numberOfWaitingSeats, hairTrimTimes, generator, collectStatistics)
+    for chunkStart in range(0, numberOfCustomers, chunkSize):
+        count = min(chunkSize, numberOfCustomers - chunkStart)
+        arrivals = shop.clock + numpy.cumsum(nextCustomerWaitTimes(generator, count))
+        shop.clock = arrivals[-1]
+        shop.serveChunk(arrivals)
+    statistics = shop.statistics
+    statistics.customersArrived = numberOfCustomers
+    statistics.customersTrimmed = shop.customersTrimmed
+    statistics.customersTurnedAway = shop.customersTurnedAway
+    statistics.close(max(shop.clock, float(shop.inShop[-1])) if len(shop.inShop) else shop.clock)
+    (eventLog.SummaryLog() if log is None else log).summary('\nTrimmed ' + str(shop.customersTrimmed) + ' and turned away ' + str(shop.customersTurnedAway) + ' today.')
+    return statistics
+
+if __name__ == '__main__':
+    runSimulation(20, 4, lambda generator, n: generator.random(n) * 0.002 + 0.001, lambda generator, n: generator.random(n) * 0.006 + 0.001)
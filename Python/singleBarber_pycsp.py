@@ -6,120 +6,134 @@
 #
 #  Copyright © 2009–2012 Russel Winder
 
-#  The barber's shop and the barber are modelled with processes.  Channels are used to pass customer objects
-#  from the shop to the barber.  The current arrangement assumes there is only one barber.
+#  The barber's shop and the barber are modelled with processes.  Channels are used to pass customers from
+#  the shop to the barber.  The current arrangement assumes there is only one barber.  The shop knows which
+#  channel each customer came from so just the customer id is sent to it, but the world gets both trimmed
+#  and turned away customers on one channel so they are sent tuples tagged with a small integer, see
+#  messages.py.  The shop selects between the barber finishing, a customer arriving and the barber being ready
+#  for the customer in the seat occupied longest, so hand-offs happen as soon as the barber is free rather
+#  than on a timeout.  The day ends with the protocol in messages.py: the world sends goHome, the shop hands
+#  every seated customer to the barber and then sends the barber goHome, the barber clocks off by sending it
+#  back, and the shop reports the time from the last customer leaving to the barber clocking off before
+#  telling the world it is closed.  Events are recorded with an event log, see eventLog.py, by default a
+#  TextLog writing the lines that used to be printed, each process flushing its log when it finishes.
 
 #  This should work with both Python 2 and Python 3.  Use range everywhere, even where with Python 2 xrange
 #  would be preferred so as to ensure it all works with both versions.
 
+import collections
 import time
 import random
 
-from pycsp.processes import (process, retire, poison, Channel, Parallel, AltSelect,
-                              InputGuard, OutputGuard, TimeoutGuard, ChannelPoisonException)
+from pycsp.processes import process, Channel, Parallel, AltSelect, InputGuard, OutputGuard
 
-class Customer(object):
-    def __init__(self, id):
-        self.id = id
-
-class SuccessfulCustomer(object):
-    def __init__(self, customer):
-        self.c = customer
+import eventLog
+import messages
 
 @process
-def barber(hairTrimTime, fromShop, toShop):
+def barber(hairTrimTime, fromShop, toShop, log):
     customersTrimmed = 0
-    try:
-        while True:
-            customer = fromShop()
-            assert isinstance(customer, Customer)
-            print('Barber: Starting Customer ' + str(customer.id))
-            time.sleep(hairTrimTime())
-            customersTrimmed += 1
-            print('Barber: Finished Customer ' + str(customer.id))
-            toShop(SuccessfulCustomer(customer))
-    except ChannelPoisonException:
-        print('Barber: Clocking off, trimmed ' + str(customersTrimmed) + ' today.')
+    while True:
+        customer = fromShop()
+        if customer == messages.goHome:
+            log.summary('Barber: Clocking off, trimmed ' + str(customersTrimmed) + ' today.')
+            toShop(customer)
+            return
+        log.event(0, customer, eventLog.startsTrim)
+        time.sleep(hairTrimTime())
+        customersTrimmed += 1
+        log.event(0, customer, eventLog.finishesTrim)
+        toShop(customer)
 
 @process
-def shop(numberOfWaitingSeats, fromWorld, toBarber, fromBarber, toWorld):
-    seats = []
+def shop(numberOfWaitingSeats, fromWorld, toBarber, fromBarber, toWorld, log):
+    seats = collections.deque()
     customersTrimmed = 0
     customersTurnedAway = 0
     closing = False
-    while True:
-        try:
-            if closing:
-                channel, customer = fromBarber, fromBarber()
+    sentHome = False
+    barberAtWork = True
+    lastLeftTime = time.time()
+    while barberAtWork:
+        # Order of guards is important here as it defines the priority of the channels.
+        guards = [InputGuard(fromBarber)]
+        if not closing:
+            guards.append(InputGuard(fromWorld))
+        if seats:
+            guards.append(OutputGuard(toBarber, msg=seats[0]))
+        elif closing and not sentHome:
+            guards.append(OutputGuard(toBarber, msg=messages.goHome))
+        channel, customer = AltSelect(*guards)
+        if channel == toBarber:
+            if seats:
+                seats.popleft()
             else:
-                # Order of channels is important here as it defines the priority of the channels.
-                channel, customer = AltSelect(InputGuard(fromBarber), InputGuard(fromWorld))
-            if channel == fromWorld:
-                assert isinstance(customer, Customer)
-                if len(seats) <= numberOfWaitingSeats:
-                    seats.append(customer)
-                    print('Shop: Customer ' + str(customer.id) + ' takes a seat. ' + str(len(seats)) + ' in use.')
-                else:
-                    print('Shop: Customer ' + str(customer.id) + ' turned away.')
-                    customersTurnedAway += 1
-                    toWorld(customer)
-            elif channel == fromBarber:
-                assert isinstance(customer, SuccessfulCustomer)
-                print('Shop: Customer ' + str(customer.c.id) + ' leaving trimmed.')
-                customersTrimmed += 1
-                toWorld(customer)
+                sentHome = True
+        elif channel == fromWorld:
+            if customer == messages.goHome:
+                log.summary('Shop: Beginning the closing sequence.')
+                closing = True
+            elif len(seats) < numberOfWaitingSeats:
+                seats.append(customer)
+                log.event(eventLog.shop, customer, eventLog.seated, len(seats))
             else:
-                raise ValueError('Shop: AltSelect failed.')
-            if len(seats) > 0:
-                channel, message = AltSelect(OutputGuard(toBarber, msg=seats[0]), TimeoutGuard(seconds=0.1))
-                if channel == toBarber:
-                    del(seats[0])
+                log.event(eventLog.shop, customer, eventLog.turnedAway)
+                customersTurnedAway += 1
+                toWorld((messages.turnedAway, customer))
+        elif channel == fromBarber:
+            if customer == messages.goHome:
+                barberAtWork = False
             else:
-                if closing:
-                    poison(toBarber)
-                    print('Shop: Closing -- ' + str(customersTrimmed) + ' trimmed, and ' + str(customersTurnedAway) + ' turned away.')
-                    poison(toWorld)
-                    break
-        except ChannelPoisonException:
-            print('Shop: Beginning the closing sequence.')
-            closing = True
+                lastLeftTime = time.time()
+                log.event(eventLog.shop, customer, eventLog.leavesTrimmed)
+                customersTrimmed += 1
+                toWorld((messages.trimmed, customer))
+        else:
+            raise ValueError('Shop: AltSelect failed.')
+    log.summary('Shop: Closing -- ' + str(customersTrimmed) + ' trimmed, and ' + str(customersTurnedAway) + ' turned away, the barber clocked off ' +
+                str(time.time() - lastLeftTime) + 's after the last customer left.')
+    toWorld(messages.closedMessage)
 
 @process
-def worldSink(fromShop):
+def worldSink(fromShop, log):
     customersTurnedAway = 0
     customersTrimmed = 0
-    try:
-        while True:
-            customer = fromShop()
-            if isinstance(customer, Customer):
-                customersTurnedAway += 1
-                print('World: Customer ' + str(customer.id) + ' exiting the shop, turned away.')
-            elif isinstance(customer, SuccessfulCustomer):
-                customersTrimmed += 1
-                print('World: Customer ' + str(customer.c.id) + ' exiting the shop, trimmed.')
-            else:
-                raise ValueError('Incorrect return from AltSelect.')
-    except ChannelPoisonException:
-        print('\nTrimmed ' + str(customersTrimmed) + ' and turned away ' + str(customersTurnedAway) + ' today.')
+    while True:
+        message = fromShop()
+        tag = message[0]
+        if tag == messages.turnedAway:
+            customersTurnedAway += 1
+            log.event(eventLog.world, message[1], eventLog.exitsTurnedAway)
+        elif tag == messages.trimmed:
+            customersTrimmed += 1
+            log.event(eventLog.world, message[1], eventLog.exitsTrimmed)
+        elif tag == messages.closed:
+            break
+        else:
+            raise ValueError('Incorrect return from AltSelect.')
+    log.summary('\nTrimmed ' + str(customersTrimmed) + ' and turned away ' + str(customersTurnedAway) + ' today.')
 
 @process
-def worldSource(numberOfCustomers, nextCustomerWaitTime, toShop):
+def worldSource(numberOfCustomers, nextCustomerWaitTime, toShop, log):
     for i in range(numberOfCustomers):
         time.sleep(nextCustomerWaitTime())
-        print('World: Customer ' + str(i) + ' enters the shop.')
-        toShop(Customer(i))
-    poison(toShop)
+        log.event(eventLog.world, i, eventLog.enters)
+        toShop(i)
+    toShop(messages.goHome)
+    log.flush()
 
-def runSimulation(numberOfCustomers, numberOfWaitingSeats, nextCustomerWaitTime, hairTrimTime):
+def runSimulation(numberOfCustomers, numberOfWaitingSeats, nextCustomerWaitTime, hairTrimTime, log=None):
+    if log is None:
+        log = eventLog.TextLog()
     worldToShop = Channel()
     shopToBarber = Channel()
     barberToShop = Channel()
     shopToWorld = Channel()
     Parallel(
-        barber(hairTrimTime, shopToBarber.reader(), barberToShop.writer()),
-        shop(numberOfWaitingSeats, worldToShop.reader(), shopToBarber.writer(), barberToShop.reader(), shopToWorld.writer()),
-        worldSink(shopToWorld.reader()),
-        worldSource(numberOfCustomers, nextCustomerWaitTime, worldToShop.writer()))
+        barber(hairTrimTime, shopToBarber.reader(), barberToShop.writer(), log),
+        shop(numberOfWaitingSeats, worldToShop.reader(), shopToBarber.writer(), barberToShop.reader(), shopToWorld.writer(), log),
+        worldSink(shopToWorld.reader(), log),
+        worldSource(numberOfCustomers, nextCustomerWaitTime, worldToShop.writer(), log))
 
 if __name__ == '__main__':
     runSimulation(20,  4, lambda: random.random() * 0.002 + 0.001, lambda: random.random() * 0.006 + 0.001)
@@ -6,47 +6,58 @@
 #
 #  Copyright © 2009–2011 Russel Winder
 
+#  Events are recorded with an event log, see eventLog.py, by default a TextLog writing the lines that used
+#  to be printed.
+
 import random
 import time
 
+import eventLog
+
 #from pykka.actor import ThreadingActor as PykkaActor
 from pykka.gevent import GeventActor as PykkaActor
 
 class Customer(object):
+    __slots__ = ('id',)
+
     def __init__(self, id):
         self.id = id
 
 class SuccessfulCustomer(object):
+    __slots__ = ('customer',)
+
     def __init__(self, customer):
         self.customer = customer
 
 tag = 'customer'
 
 class Barber(PykkaActor):
-    def __init__(self, hairTrimTime):
+    def __init__(self, hairTrimTime, log):
         self.customersTrimmed = 0
         self.shop = None
         self.hairTrimTime = hairTrimTime
+        self.log = log
 
     def on_receive(self, message):
         customer = message[tag]
         if isinstance(customer, Customer):
-            print('Barber: Starting Customer ' + str(customer.id))
+            self.log.event(0, customer.id, eventLog.startsTrim)
             time.sleep(self.hairTrimTime())
-            customersTrimmed += 1
-            print('Barber: Finished Customer ' + str(customer.id))
+            self.customersTrimmed += 1
+            self.log.event(0, customer.id, eventLog.finishesTrim)
             self.shop.send_one_way(SuccessfulCustomer(customer))
         elif isinstance(customer, str) and customer == 'closing':
-            print('Barber: Work over for the day, trimmed ' + str(customersTrimmed) + ' today.')
+            self.log.summary('Barber: Work over for the day, trimmed ' + str(self.customersTrimmed) + ' today.')
             shop.send_one_way({tag: 'clockedOff'})
         else:
             raise ValueError('Barber got a customer of unexpected type ' + type(customer))
 
 class Shop(PykkaActor):
-    def __init__(self, numberOfWaitingSeats, barber, world):
+    def __init__(self, numberOfWaitingSeats, barber, world, log):
         self.numberOfWaitingSeats = numberOfWaitingSeats
         self.barber = barber
         self.world = world
+        self.log = log
         self.seatsTaken = 0
         self.customersTrimmed = 0
         self.customersTurnedAway = 0
@@ -56,56 +67,55 @@ class Shop(PykkaActor):
         if isinstance(customer, Customer):
             if self.seatsTaken < self.numberOfWaitingSeats:
                 self.seatsTaken += 1
-                print('Shop: Customer ' + str(event.id) + ' takes a seat. ' + str(self.seatsTaken) + ' in use.')
+                self.log.event(eventLog.shop, customer.id, eventLog.seated, self.seatsTaken)
                 self.barber.send_one_way({tag: customer})
             else:
                 self.customersTurnedAway += 1
-                print('Shop: Customer ' + str(event.id) + ' turned away.')
+                self.log.event(eventLog.shop, customer.id, eventLog.turnedAway)
                 self.world.send_one_way({tag: customer})
-        elif isinstance(event, SuccessfulCustomer):
+        elif isinstance(customer, SuccessfulCustomer):
             successfulCustomer = customer.customer
             self.seatsTaken -= 1
             self.customersTrimmed += 1
-            print('Shop: Customer ' + str(customer.id) + ' leaving trimmed.')
+            self.log.event(eventLog.shop, successfulCustomer.id, eventLog.leavesTrimmed)
             self.world.send_one_way({tag: customer})
         elif isinstance(customer, str) and customer == 'closing':
             self.barber.send_one_way({tag: 'closing'})
         elif isinstance(customer, str) and customer == 'clockedOff':
-            print('\nTrimmed ' + str(self.customersTrimmed) + ' and turned away ' + str(self.customersTurnedAway) + ' today.')
+            self.log.summary('\nTrimmed ' + str(self.customersTrimmed) + ' and turned away ' + str(self.customersTurnedAway) + ' today.')
             self.world.send_one_way({tag: 'closed'})
         else:
             raise ValueError('shop got an unexpected message of type ' + type(event))
 
 class World(PykkaActor):
-    def __init__(self):
+    def __init__(self, log):
         self.customersTurnedAway = 0
         self.customersTrimmed = 0
+        self.log = log
 
     def on_receive(self, message):
         customer = message[tag]
-
-        def customerExit(identifier):
-            print('World: Customer ' + str(identifier) + ' exits the shop.')
-
         if isinstance(customer, Customer):
             self.customersTurnedAway += 1
-            customerExit(customer.id)
+            self.log.event(eventLog.world, customer.id, eventLog.exitsTurnedAway)
         elif isinstance(customer, SuccessfulCustomer):
             self.customersTrimmed += 1
-            customerExit(customer.customer.id)
+            self.log.event(eventLog.world, customer.customer.id, eventLog.exitsTrimmed)
         elif isinstance(customer, str) and customer == 'closed':
-            print('\nTrimmed {0} and turned away {1} today.'.format(self.customersTrimmed, self.customersTurnedAway))
+            self.log.summary('\nTrimmed ' + str(self.customersTrimmed) + ' and turned away ' + str(self.customersTurnedAway) + ' today.')
         else:
             raise ValueError('World got a message of unexpected type ' + type(customer))
 
-def runSimulation(numberOfCustomers, numberOfWaitingSeats, nextCustomerWaitTime, hairTrimTime):
-    world = World.start()
-    barber = Barber.start(hairTrimTime)
-    shop = Shop.start(numberOfWaitingSeats, barber, world)
+def runSimulation(numberOfCustomers, numberOfWaitingSeats, nextCustomerWaitTime, hairTrimTime, log=None):
+    if log is None:
+        log = eventLog.TextLog()
+    world = World.start(log)
+    barber = Barber.start(hairTrimTime, log)
+    shop = Shop.start(numberOfWaitingSeats, barber, world, log)
     barber.shop = shop
     for i in range(numberOfCustomers):
         time.sleep(nextCustomerWaitTime())
-        print('World: Customer ' + str(i) + ' enters the shop.')
+        log.event(eventLog.world, i, eventLog.enters)
         shop.send_one_way({tag: Customer(i)})
     shop.send_one_way({tag: 'closing'})
 
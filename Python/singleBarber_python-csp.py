@@ -6,115 +6,133 @@
 #
 #  Copyright © 2009–2012 Russel Winder
 
-#  The barber's shop and the barber are modelled with processes.  Channels are used to pass customer objects
-#  from the shop to the barber.  The current arrangement assumes there is only one barber.
+#  The barber's shop and the barber are modelled with processes.  Channels are used to pass customers from
+#  the shop to the barber.  The current arrangement assumes there is only one barber.  Selecting on channels
+#  gives the datum rather than the channel so messages say what they are, they are tuples tagged with a
+#  small integer, see messages.py, and the shop and world switch on the tag.  The barber only ever gets
+#  customers so is sent just the customer id.  Python-CSP cannot select on writing to a channel, so the shop
+#  only hands a customer to the barber once the barber has said they have nothing to do, by sending ready or
+#  a trimmed customer, and the hand-off write never blocks.  The day ends with the protocol in messages.py:
+#  once closed the shop sends goHome to the barber when they are idle with no-one left in the seats, the
+#  barber clocks off by sending clockedOff, and the shop reports the time from the last customer leaving to
+#  the barber clocking off before telling the world it is closed.  Events are recorded with an event log,
+#  see eventLog.py, by default a TextLog writing the lines that used to be printed, each process flushing
+#  its log when it finishes.
 
 #  This should work with both Python 2 and Python 3.  Use range everywhere, even where with Python 2 xrange
 #  would be preferred so as to ensure it all works with both versions.
 
+import collections
 import time
 import random
 
-from csp.os_process import process, Channel, Par, Alt, ChannelPoison
-from csp.guards import Timer
+from csp.os_process import process, Channel, Par
 
-class Customer(object):
-    def __init__(self, id):
-        self.id = id
-
-class SuccessfulCustomer(object):
-    def __init__(self, customer):
-        self.c = customer
+import eventLog
+import messages
 
 @process
-def barber(hairTrimTime, fromShop, toShop):
+def barber(hairTrimTime, fromShop, toShop, log):
     customersTrimmed = 0
-    try:
-        while True:
-            customer = fromShop.read()
-            assert isinstance(customer, Customer)
-            print('Barber: Starting Customer ' + str(customer.id))
-            time.sleep(hairTrimTime())
-            customersTrimmed += 1
-            print('Barber: Finished Customer ' + str(customer.id))
-            toShop.write(SuccessfulCustomer(customer))
-    except ChannelPoison:
-        print('Barber: Finished work for the day, trimmed ' + str(customersTrimmed))
+    toShop.write(messages.readyMessage)
+    while True:
+        customer = fromShop.read()
+        if customer == messages.goHome:
+            log.summary('Barber: Finished work for the day, trimmed ' + str(customersTrimmed))
+            toShop.write(messages.clockedOffMessage)
+            return
+        log.event(0, customer, eventLog.startsTrim)
+        time.sleep(hairTrimTime())
+        customersTrimmed += 1
+        log.event(0, customer, eventLog.finishesTrim)
+        toShop.write((messages.trimmed, customer))
 
 @process
-def shop(numberOfWaitingSeats, fromWorld, toBarber, fromBarber, toWorld):
-    seats = []
+def shop(numberOfWaitingSeats, fromWorld, toBarber, fromBarber, toWorld, log):
+    seats = collections.deque()
     customersTrimmed = 0
     customersTurnedAway = 0
+    barberIsIdle = False
+    barberAtWork = True
     closing = False
-    while True:
-        try:
-            customer = fromBarber | fromWorld
-            if isinstance(customer, Customer):
-                if len(seats) <= numberOfWaitingSeats:
-                    seats.append(customer)
-                    print('Shop: Customer ' + str(customer.id) + ' takes a seat. ' + str(len(seats)) + ' in use.')
-                    toBarber.write(customer)
-                else:
-                    customersTurnedAway += 1
-                    print('Shop: Customer ' + str(customer.id) + ' turned away.')
-                    toWorld.write(customer)
-            elif isinstance(customer, SuccessfulCustomer):
-                seatsTaken -= 1
-                customersTrimmed += 1
-                print('Shop: Customer ' + str(customer.c.id) + ' leaving trimmed.')
-                toWorld.write(customer)
-            else:
-                raise ValueError('Shop: select failed, got a ' + str(customer))
-            if len(seats) > 0:
-                alt = Alt(toBarber, Timer().sleep(0.1))
-                toBarber.write(seats[0])
-                del(seats[0])
+    lastLeftTime = time.time()
+    while barberAtWork:
+        message = fromBarber | fromWorld
+        tag = message[0]
+        if tag == messages.arrives:
+            customer = message[1]
+            if len(seats) < numberOfWaitingSeats:
+                seats.append(customer)
+                log.event(eventLog.shop, customer, eventLog.seated, len(seats))
             else:
-                if closing:
-                    toBarber.poison()
-                    print('Shop: Closing -- ' + str(customersTrimmed) + ' trimmed, and ' + str(customersTurnedAway) + ' turned away.')
-                    toWorld.poison()
-                    break
-        except ChannelPoison:
+                customersTurnedAway += 1
+                log.event(eventLog.shop, customer, eventLog.turnedAway)
+                toWorld.write((messages.turnedAway, customer))
+        elif tag == messages.trimmed:
+            customersTrimmed += 1
+            barberIsIdle = True
+            lastLeftTime = time.time()
+            log.event(eventLog.shop, message[1], eventLog.leavesTrimmed)
+            toWorld.write(message)
+        elif tag == messages.ready:
+            barberIsIdle = True
+        elif tag == messages.clockedOff:
+            barberAtWork = False
+        elif tag == messages.closing:
             closing = True
+        else:
+            raise ValueError('Shop: select failed, got a ' + str(message))
+        #  The barber is only idle when waiting to read so these writes do not block.
+        if barberIsIdle and seats:
+            toBarber.write(seats.popleft())
+            barberIsIdle = False
+        elif barberIsIdle and closing:
+            toBarber.write(messages.goHome)
+            barberIsIdle = False
+    log.summary('Shop: Closing -- ' + str(customersTrimmed) + ' trimmed, and ' + str(customersTurnedAway) + ' turned away, the barber clocked off ' +
+                str(time.time() - lastLeftTime) + 's after the last customer left.')
+    toWorld.write(messages.closedMessage)
 
 @process
-def worldSink(fromShop):
+def worldSink(fromShop, log):
     customersTurnedAway = 0
     customersTrimmed = 0
-    try:
-        while True:
-            customer = fromShop.read()
-            if isinstance(customer, Customer):
-                customersTurnedAway += 1
-                print('World: Customer ' + str(customer.id) + ' exiting the shop, turned away.')
-            elif isinstance(customer, SuccessfulCustomer):
-                customersTrimmed += 1
-                print('World: Customer ' + str(customer.c.id) + ' exiting the shop, trimmed.')
-            else:
-                raise ValueError('Incorrect return from Alt.')
-    except ChannelPoison:
-        print('\nTrimmed ' + str(customersTrimmed) + ' and turned away ' + str(customersTurnedAway) + ' today.')
+    while True:
+        message = fromShop.read()
+        tag = message[0]
+        if tag == messages.turnedAway:
+            customersTurnedAway += 1
+            log.event(eventLog.world, message[1], eventLog.exitsTurnedAway)
+        elif tag == messages.trimmed:
+            customersTrimmed += 1
+            log.event(eventLog.world, message[1], eventLog.exitsTrimmed)
+        elif tag == messages.closed:
+            break
+        else:
+            raise ValueError('Incorrect return from Alt.')
+    log.summary('\nTrimmed ' + str(customersTrimmed) + ' and turned away ' + str(customersTurnedAway) + ' today.')
 
 @process
-def worldSource(numberOfCustomers, nextCustomerWaitTime, toShop):
+def worldSource(numberOfCustomers, nextCustomerWaitTime, toShop, log):
     for i in range(numberOfCustomers):
         time.sleep(nextCustomerWaitTime())
-        print('World: Customer ' + str(i) + ' enters the shop.')
-        toShop.write(Customer(i))
-    toShop.poison()
+        log.event(eventLog.world, i, eventLog.enters)
+        toShop.write((messages.arrives, i))
+    toShop.write(messages.closingMessage)
+    log.flush()
 
-def runSimulation(numberOfCustomers, numberOfWaitingSeats, nextCustomerWaitTime, hairTrimTime):
+def runSimulation(numberOfCustomers, numberOfWaitingSeats, nextCustomerWaitTime, hairTrimTime, log=None):
+    if log is None:
+        log = eventLog.TextLog()
     worldToShop = Channel()
     shopToBarber = Channel()
     barberToShop = Channel()
     shopToWorld = Channel()
     Par(
-        barber(hairTrimTime, shopToBarber, barberToShop),
-        shop(numberOfWaitingSeats, worldToShop, shopToBarber, barberToShop, shopToWorld),
-        worldSink(shopToWorld),
-        worldSource(numberOfCustomers, nextCustomerWaitTime, worldToShop)
+        barber(hairTrimTime, shopToBarber, barberToShop, log),
+        shop(numberOfWaitingSeats, worldToShop, shopToBarber, barberToShop, shopToWorld, log),
+        worldSink(shopToWorld, log),
+        worldSource(numberOfCustomers, nextCustomerWaitTime, worldToShop, log)
         ).start()
 
 if __name__ == '__main__':
@@ -0,0 +1,145 @@
+#! /usr/bin/env python3
+
+#  This is a model of the "The Sleeping Barber" problem using Python and the threading package,
+#  cf. http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  This is the same architecture as the single barber multiprocessing variant but with threads rather than
+#  processes.  The world, barber's shop and the barber are modelled using threads each with their own
+#  queue -- though the barber queue is actually in the shop, a queue.Queue(maxsize=numberOfWaitingSeats)
+#  modelling the waiting seats.  The messages are the tagged tuples of messages.py, the shop passing on the
+#  closing message through the waiting seats so the barber only gets it once every seated customer has been
+#  trimmed.  Trims are time.sleep calls, which release the GIL, so the barber trims whilst the other threads
+#  get on with things, and spinTrims=True makes the trims busy waits as in multipleBarbers_threading.py.
+#  Events are recorded with an event log, see eventLog.py, by default a TextLog writing the lines that the
+#  other variants print.  The barber gets their trim times using randomStreams.trimTimes, see
+#  randomStreams.py.
+
+import queue
+import random
+import threading
+import time
+
+import eventLog
+import messages
+import randomStreams
+from multipleBarbers_threading import spin
+
+class Barber(threading.Thread):
+    def __init__(self, hairTrimTime, log, spinTrims=False):
+        super().__init__()
+        self.shop = None  # This value will be injected after construction.
+        self.hairTrimTime = hairTrimTime
+        self.log = log
+        self.trim = spin if spinTrims else time.sleep
+
+    def run(self):
+        log = self.log
+        trim = self.trim
+        trimTime = randomStreams.trimTimes(self.hairTrimTime, 0)
+        customersTrimmed = 0
+        while True:
+            message = self.shop.waitingSeats.get()  # Block on the shop's waiting seats queue.
+            tag = message[0]
+            if tag == messages.arrives:
+                customer = message[1]
+                log.event(0, customer, eventLog.startsTrim)
+                trim(trimTime(customer))
+                customersTrimmed += 1
+                log.event(0, customer, eventLog.finishesTrim)
+                self.shop.queue.put((messages.trimmed, customer))
+            elif tag == messages.closing:
+                log.summary('Barber: Clocking off, trimmed ' + str(customersTrimmed) + ' today.')
+                self.shop.queue.put(messages.clockedOffMessage)
+                break
+            else:
+                raise ValueError('Barber: Unexpected message received:' + str(message))
+
+class Shop(threading.Thread):
+    def __init__(self, numberOfWaitingSeats, barber, world, log):
+        super().__init__()
+        self.waitingSeats = queue.Queue(numberOfWaitingSeats)
+        self.barber = barber
+        self.world = world
+        self.queue = queue.Queue()
+        self.log = log
+
+    def run(self):
+        log = self.log
+        customersTrimmed = 0
+        customersTurnedAway = 0
+        lastLeftTime = time.time()
+        while True:
+            message = self.queue.get()
+            tag = message[0]
+            if tag == messages.arrives:
+                customer = message[1]
+                try:
+                    self.waitingSeats.put_nowait(message)
+                    log.event(eventLog.shop, customer, eventLog.seated, self.waitingSeats.qsize())
+                except queue.Full:
+                    customersTurnedAway += 1
+                    log.event(eventLog.shop, customer, eventLog.turnedAway)
+                    self.world.queue.put((messages.turnedAway, customer))
+            elif tag == messages.trimmed:
+                customersTrimmed += 1
+                lastLeftTime = time.time()
+                log.event(eventLog.shop, message[1], eventLog.leavesTrimmed)
+                self.world.queue.put(message)
+            elif tag == messages.closing:
+                self.waitingSeats.put(message)
+            elif tag == messages.clockedOff:
+                log.summary('Shop: Closing --- ' + str(customersTrimmed) + ' trimmed and ' + str(customersTurnedAway) + ' turned away, the barber clocked off ' +
+                            str(time.time() - lastLeftTime) + 's after the last customer left.')
+                self.world.queue.put(messages.closedMessage)
+                break
+            else:
+                raise ValueError('Shop: Unexpected message received:' + str(message))
+
+class World(threading.Thread):
+    def __init__(self, log):
+        super().__init__()
+        self.queue = queue.Queue()
+        self.log = log
+
+    def run(self):
+        log = self.log
+        customersTrimmed = 0
+        customersTurnedAway = 0
+        while True:
+            message = self.queue.get()
+            tag = message[0]
+            if tag == messages.turnedAway:
+                customersTurnedAway += 1
+                log.event(eventLog.world, message[1], eventLog.exitsTurnedAway)
+            elif tag == messages.trimmed:
+                customersTrimmed += 1
+                log.event(eventLog.world, message[1], eventLog.exitsTrimmed)
+            elif tag == messages.closed:
+                log.summary('\nTrimmed ' + str(customersTrimmed) + ' and turned away ' + str(customersTurnedAway) + ' today.')
+                break
+            else:
+                raise ValueError('World: Unexpected message received:' + str(message))
+
+def runSimulation(numberOfCustomers, numberOfWaitingSeats, nextCustomerWaitTime, hairTrimTime, log=None, spinTrims=False):
+    if log is None:
+        log = eventLog.TextLog()
+    barber = Barber(hairTrimTime, log, spinTrims)
+    world = World(log)
+    shop = Shop(numberOfWaitingSeats, barber, world, log)
+    barber.shop = shop
+    barber.start()
+    world.start()
+    shop.start()
+    for i in range(numberOfCustomers):
+        time.sleep(nextCustomerWaitTime())
+        log.event(eventLog.world, i, eventLog.enters)
+        shop.queue.put((messages.arrives, i))
+    shop.queue.put(messages.closingMessage)
+    #  Wait for the world to end.
+    world.join()
+    log.flush()
+
+if __name__ == '__main__':
+    runSimulation(20,  4, lambda: random.random() * 0.002 + 0.001, lambda: random.random() * 0.006 + 0.001)
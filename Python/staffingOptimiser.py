@@ -0,0 +1,119 @@
+#! /usr/bin/env python3
+
+#  Finding the cheapest barber's shop that turns away few enough customers, cf.
+#  http://en.wikipedia.org/wiki/Sleeping_barber_problem.
+#
+#  Copyright © 2026  Russel Winder
+
+#  Given a cost per barber, a cost per waiting seat and the largest acceptable fraction of customers turned
+#  away, optimise finds the cheapest numberOfBarbers and numberOfWaitingSeats for which simulation shows the
+#  fraction turned away to be acceptable.  Rather than simulating every shop of a grid the same number of
+#  times it works through the shops in order of cost, stopping at the first acceptable one, and spends on
+#  each shop only as many replicates as it takes to decide:
+#
+#    Sequential testing -- replicates of a shop are run a round at a time and after each round there is a
+#      confidence interval for the mean fraction turned away, see replication.py.  The shop is accepted as
+#      soon as the interval is entirely below the target and rejected as soon as it is entirely above, so
+#      clearly hopeless and clearly good shops are decided after a single round and only shops near the
+#      target need more.  A round is at least four replicates: with fewer the t quantile of the first
+#      interval, 12.7 for two replicates at 95% confidence, makes it too wide to decide any but the most
+#      extreme shops.  A shop still undecided after maximumReplicates replicates has not been shown to be
+#      good enough and is rejected.
+#    Common random numbers -- replicate r of every shop is given the same arrival and trim times, the
+#      'replicate r' streams of the time sources as replication.runReplicate arranges, so the differences
+#      between shops are due to the shops and not to the luck of the draw and fewer replicates are needed to
+#      tell them apart.
+#    Dominance -- a shop with fewer barbers and fewer seats than a rejected shop turns away at least as many
+#      customers, so it is rejected without being simulated.  So is a shop whose barbers cannot keep up,
+#      no more than numberOfBarbers customers being trimmed per mean trim time whatever the number of
+#      seats, when the mean times are known, see queueingTheory.moments.
+#
+#  The replicates are run on a ProcessPoolExecutor.  To keep all the workers busy a round is run for several
+#  of the cheapest undecided shops at once, the answer being the cheapest shop once every cheaper shop has
+#  been rejected.  As with parameterSweep.py the time sources are pickled to get to the workers so they must
+#  be instances of classes defined at module level rather than lambdas.
+
+import collections
+import concurrent.futures
+import heapq
+import importlib
+import os
+
+import queueingTheory
+import replication
+
+Optimum = collections.namedtuple('Optimum', ('numberOfWaitingSeats', 'numberOfBarbers', 'cost', 'turnedAwayFraction', 'halfWidth', 'replicates',
+                                             'shopsSimulated', 'customersSimulated'))
+
+def _maximumThroughputFraction(numberOfBarbers, nextCustomerWaitTime, hairTrimTime):
+    '''The largest fraction of customers numberOfBarbers barbers can trim, or 1 if the mean times are not known.'''
+    try:
+        meanInterArrivalTime, _ = queueingTheory.moments(nextCustomerWaitTime)
+        meanTrimTime, _ = queueingTheory.moments(hairTrimTime)
+    except ValueError:
+        return 1.0
+    return numberOfBarbers * meanInterArrivalTime / meanTrimTime
+
+def optimise(nextCustomerWaitTime, hairTrimTime, costPerBarber, costPerSeat, maximumTurnedAwayFraction, numberOfCustomers=10000,
+             confidence=0.95, roundSize=4, maximumReplicates=64, maximumBarbers=32, maximumSeats=256,
+             backendName='multipleBarbers_discreteEvent', maxWorkers=None, seed=0):
+    '''The cheapest shop shown to turn away at most maximumTurnedAwayFraction of its customers, or None if none is.'''
+    assert roundSize >= 4, 'Need at least four replicates a round'
+    maxWorkers = maxWorkers or os.cpu_count() or 1
+    width = max(1, maxWorkers // roundSize)
+    candidates = [(numberOfBarbers * costPerBarber + costPerSeat, numberOfBarbers, 1) for numberOfBarbers in range(1, maximumBarbers + 1)
+                  if 1 - _maximumThroughputFraction(numberOfBarbers, nextCustomerWaitTime, hairTrimTime) <= maximumTurnedAwayFraction]
+    heapq.heapify(candidates)
+    rejected = []
+    active = []  # (cost, barbers, seats, fractions turned away) of the cheapest undecided shops in order of cost.
+    optimum = None
+    shopsSimulated = 0
+    customersSimulated = 0
+
+    def isDominated(numberOfBarbers, numberOfWaitingSeats):
+        return any(numberOfBarbers <= barbers and numberOfWaitingSeats <= seats for barbers, seats in rejected)
+
+    def isCheaper(cost):
+        return optimum is None or cost < optimum.cost
+
+    with concurrent.futures.ProcessPoolExecutor(maxWorkers, initializer=importlib.import_module, initargs=(backendName,)) as executor:
+        while True:
+            active = [shop for shop in active if isCheaper(shop[0]) and not isDominated(shop[1], shop[2])]
+            while len(active) < width and candidates and isCheaper(candidates[0][0]):
+                cost, numberOfBarbers, numberOfWaitingSeats = heapq.heappop(candidates)
+                if numberOfWaitingSeats < maximumSeats:
+                    heapq.heappush(candidates, (cost + costPerSeat, numberOfBarbers, numberOfWaitingSeats + 1))
+                if not isDominated(numberOfBarbers, numberOfWaitingSeats):
+                    active.append((cost, numberOfBarbers, numberOfWaitingSeats, []))
+                    shopsSimulated += 1
+            if not active:
+                return optimum
+            rounds = [[executor.submit(replication.runReplicate, backendName, len(fractions) + replicate, seed, numberOfCustomers, numberOfWaitingSeats,
+                                       numberOfBarbers, nextCustomerWaitTime, hairTrimTime) for replicate in range(roundSize)]
+                      for _, numberOfBarbers, numberOfWaitingSeats, fractions in active]
+            undecided = []
+            for (cost, numberOfBarbers, numberOfWaitingSeats, fractions), futures in zip(active, rounds):
+                fractions.extend(future.result()['turnedAwayFraction'] for future in futures)
+                customersSimulated += numberOfCustomers * roundSize
+                mean, halfWidth, _ = replication.confidenceInterval(fractions, confidence)
+                if mean + halfWidth <= maximumTurnedAwayFraction:
+                    if isCheaper(cost):
+                        optimum = Optimum(numberOfWaitingSeats, numberOfBarbers, cost, mean, halfWidth, len(fractions), 0, 0)
+                elif mean - halfWidth > maximumTurnedAwayFraction or len(fractions) >= maximumReplicates:
+                    rejected.append((numberOfBarbers, numberOfWaitingSeats))
+                else:
+                    undecided.append((cost, numberOfBarbers, numberOfWaitingSeats, fractions))
+            active = undecided
+            if optimum is not None:
+                optimum = optimum._replace(shopsSimulated=shopsSimulated, customersSimulated=customersSimulated)
+
+if __name__ == '__main__':
+    from distributions import Exponential, Lognormal
+    maximumBarbers = 16
+    maximumSeats = 64
+    maximumReplicates = 64
+    optimum = optimise(Exponential(0.002, 1, 'arrivals'), Lognormal(0.012, 0.006, 1, 'trims'), 100.0, 5.0, 0.01,
+                       maximumReplicates=maximumReplicates, maximumBarbers=maximumBarbers, maximumSeats=maximumSeats)
+    print(optimum)
+    print('A grid of the same shops with as many replicates would have simulated ' +
+          str(maximumBarbers * maximumSeats * maximumReplicates * 10000) + ' customers.')
@@ -0,0 +1,96 @@
+#  Recording and replaying the arrival and trim times of a barber's shop day.
+#
+#  Copyright © 2026  Russel Winder
+
+#  A trace file is a 16 byte header, the magic bytes SBTRACE1 followed by the number of customers as a
+#  little-endian 64-bit unsigned integer, then the time each customer waits after the previous one before
+#  arriving and then the time each customer's trim takes, both as arrays of little-endian 64-bit floats
+#  indexed by customer id.  Replaying a trace memory-maps the file, so a trace of any size can be replayed
+#  without reading it into memory, only the pages being used are resident.
+#
+#  The trim times are those of the customers, not of the barbers, so any variant that looks them up by
+#  customer id using forCustomer, see randomStreams.py, trims every customer in exactly the same time
+#  whichever barber does the trim and whoever else has been turned away.  Variants that just call
+#  hairTrimTime() get the trim times in trace order.
+
+import mmap
+import struct
+from array import array
+
+_magic = b'SBTRACE1'
+_header = struct.Struct('<8sQ')
+_chunkSize = 1 << 16
+
+def writeTrace(path, numberOfCustomers, nextCustomerWaitTime, hairTrimTime):
+    '''Draw the times for numberOfCustomers customers from the zero argument callables and write them to path.'''
+    assert struct.pack('=d', 1.0) == struct.pack('<d', 1.0), 'Traces are written with the native float layout, which must be little-endian.'
+    with open(path, 'wb') as f:
+        f.write(_header.pack(_magic, numberOfCustomers))
+        for times in (nextCustomerWaitTime, hairTrimTime):
+            for chunkStart in range(0, numberOfCustomers, _chunkSize):
+                array('d', (times() for _ in range(min(_chunkSize, numberOfCustomers - chunkStart)))).tofile(f)
+
+class _TraceArrivals(object):
+    def __init__(self, trace):
+        self.trace = trace
+        self.position = 0
+
+    def __call__(self):
+        time = self.trace.waits[self.position]
+        self.position += 1
+        return time
+
+    def getState(self):
+        return self.position
+
+    def setState(self, state):
+        self.position = state
+
+class _TraceTrims(_TraceArrivals):
+    def forCustomer(self, customerId):
+        return self.trace.trims[customerId]
+
+    def __call__(self):
+        time = self.trace.trims[self.position]
+        self.position += 1
+        return time
+
+class Trace(object):
+    def __init__(self, path):
+        self.path = path
+        self._open()
+
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            self._memory = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.numberOfCustomers = _header.unpack_from(self._memory)
+        assert magic == _magic, self.path + ' is not a trace file.'
+        assert len(self._memory) == _header.size + 16 * self.numberOfCustomers, self.path + ' is truncated.'
+        times = memoryview(self._memory)[_header.size:].cast('d')
+        self.waits = times[:self.numberOfCustomers]
+        self.trims = times[self.numberOfCustomers:]
+        self.nextCustomerWaitTime = _TraceArrivals(self)
+        self.hairTrimTime = _TraceTrims(self)
+        self._bulkPositions = [0, 0]
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._open()
+
+    def _bulk(self, which, count):
+        import numpy
+        start = self._bulkPositions[which]
+        self._bulkPositions[which] += count
+        offset = _header.size + 8 * (which * self.numberOfCustomers + start)
+        return numpy.frombuffer(self._memory, numpy.float64, count, offset)
+
+    def nextCustomerWaitTimes(self, generator, count):
+        '''The next count waits as a NumPy array, for singleBarber_numpy, the generator is ignored.'''
+        return self._bulk(0, count)
+
+    def hairTrimTimes(self, generator, count):
+        '''The next count trim times as a NumPy array, for singleBarber_numpy, the generator is ignored.'''
+        return self._bulk(1, count)
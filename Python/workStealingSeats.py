@@ -0,0 +1,148 @@
+#  Waiting seats for the multiprocessing barber's shop with a queue per barber and work stealing.
+#
+#  Copyright © 2026  Russel Winder
+
+#  With a single queue of waiting seats shared by all the barbers, every barber contends for the same lock
+#  every time they take a customer, and that gets worse the more barbers there are.  Here each barber has
+#  their own queue of customer ids, a ring buffer in shared memory as in sharedMemorySeats.py, with its own
+#  lock.  The queues share the shop's seats: a customer is turned away only when the total number of
+#  customers in all the queues is the number of seats.  The shop, the only producer, seats each customer in
+#  the shortest queue.  A barber takes the customer at the head of their own queue, and if their queue is
+#  empty steals the customer at the head of the longest queue, so customers are always taken from the
+#  queue where they are most likely to have been waiting longest.
+#
+#  A barber looks for a customer without taking any lock but that of the queue they take from.  A barber
+#  who finds every queue empty waits on a single condition shared by all the queues, checking again that
+#  there is no customer before waiting so no customer seated in between is missed, and the shop notifies it
+#  as it seats each customer, so an idle barber sleeps until there is a customer somewhere rather than
+#  spinning.  Another barber may get to the customer first, in which case the woken barber waits again.
+#  Each queue's layout is the head index, the tail index and then a seat for every seat in the shop, as any
+#  one queue may end up holding all the customers.  The qsize and empty of the seats are of all the queues
+#  whereas barbers use the view returned by forBarber, which knows which queue is theirs and whose qsize
+#  and empty are of that queue alone.  Unlike SharedMemorySeats, sendHome needs no count of barbers: it
+#  wakes them all and any barber finding every queue empty after it gets messages.goHome, see messages.py,
+#  so the shop may call it as soon as it has seated its last customer.  The synchronisation objects are
+#  made from context, so that the seats can be used with any start method, see multipleBarbers_pycsp.py as
+#  well as multipleBarbers_multiprocessing.py.
+
+import multiprocessing
+import multiprocessing.shared_memory
+
+import messages
+
+#  Must get the Full symbol as multiprocessing does not define it but does use it.
+import queue
+
+_head = 0
+_tail = 1
+_firstSeat = 2
+
+class WorkStealingSeats(object):
+    def __init__(self, capacity, barberCount, context=multiprocessing):
+        assert capacity > 0, 'Cannot have 0 or less waiting seats'
+        assert barberCount > 0, 'Must have some barbers'
+        self.capacity = capacity
+        self.barberCount = barberCount
+        self.queueSize = _firstSeat + capacity
+        self.memory = multiprocessing.shared_memory.SharedMemory(create=True, size=8 * self.queueSize * barberCount)
+        self._seated = context.Condition()
+        self._locks = [context.Lock() for _ in range(barberCount)]
+        self._sentHome = context.RawValue('b', 0)
+        self._words = self.memory.buf.cast('q')
+        for barber in range(barberCount):
+            self._words[barber * self.queueSize + _head] = 0
+            self._words[barber * self.queueSize + _tail] = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_words']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._words = self.memory.buf.cast('q')
+
+    def _length(self, barber):
+        base = barber * self.queueSize
+        return self._words[base + _tail] - self._words[base + _head]
+
+    def qsize(self):
+        return sum(self._length(barber) for barber in range(self.barberCount))
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def put_nowait(self, customerId):
+        '''Seat a customer in the shortest queue, raising queue.Full if all the seats are taken. Only the shop may call this.'''
+        lengths = [self._length(barber) for barber in range(self.barberCount)]
+        if sum(lengths) >= self.capacity:
+            raise queue.Full
+        base = lengths.index(min(lengths)) * self.queueSize
+        words = self._words
+        tail = words[base + _tail]
+        words[base + _firstSeat + tail % self.capacity] = customerId
+        words[base + _tail] = tail + 1
+        with self._seated:
+            self._seated.notify()
+
+    def _take(self, barber):
+        '''The customer at the head of the given barber's queue, or None if the queue is empty.'''
+        base = barber * self.queueSize
+        words = self._words
+        with self._locks[barber]:
+            head = words[base + _head]
+            if words[base + _tail] == head:
+                return None
+            customerId = words[base + _firstSeat + head % self.capacity]
+            words[base + _head] = head + 1
+        return customerId
+
+    def get(self, barber):
+        '''Take a customer for the given barber, from their own queue if possible, sleeping until there is one.'''
+        while True:
+            customerId = self._take(barber)
+            if customerId is not None:
+                return customerId
+            lengths = [self._length(other) for other in range(self.barberCount)]
+            if max(lengths) > 0:
+                customerId = self._take(lengths.index(max(lengths)))
+                if customerId is not None:
+                    return customerId
+                continue
+            with self._seated:
+                while self.empty():
+                    if self._sentHome.value:
+                        return messages.goHome
+                    self._seated.wait()
+
+    def sendHome(self):
+        '''Wake the barbers to get messages.goHome once every queue is empty. Only the shop may call this.'''
+        with self._seated:
+            self._sentHome.value = 1
+            self._seated.notify_all()
+
+    def forBarber(self, barber):
+        return _BarberSeats(self, barber)
+
+    def close(self):
+        self._words.release()
+        self.memory.close()
+
+    def unlink(self):
+        '''Release the shared memory, to be called once by the creating process when all users are finished.'''
+        self.close()
+        self.memory.unlink()
+
+class _BarberSeats(object):
+    def __init__(self, seats, barber):
+        self.seats = seats
+        self.barber = barber
+
+    def get(self):
+        return self.seats.get(self.barber)
+
+    def qsize(self):
+        return self.seats._length(self.barber)
+
+    def empty(self):
+        return self.seats._length(self.barber) == 0